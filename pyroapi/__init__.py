@@ -1,14 +1,31 @@
 # Copyright Contributors to the Pyro project.
 # SPDX-License-Identifier: Apache-2.0
 
-from pyroapi.dispatch import distributions, handlers, infer, ops, optim, pyro, pyro_backend, register_backend
+from pyroapi.dispatch import (
+    clear_cache,
+    distributions,
+    handlers,
+    import_report,
+    import_times,
+    infer,
+    ops,
+    optim,
+    prewarm,
+    pyro,
+    pyro_backend,
+    register_backend,
+)
 
 __all__ = [
+    'clear_cache',
     'distributions',
     'handlers',
+    'import_report',
+    'import_times',
     'infer',
     'ops',
     'optim',
+    'prewarm',
     'pyro',
     'pyro_backend',
     'register_backend',
@@ -0,0 +1,224 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Asynchronous SVI and MCMC for asyncio applications. Blocking steps run on an
+executor while progress is streamed as an async iterator. For example:
+
+.. code-block:: python
+
+    from pyroapi.aio import svi_steps
+
+    async def fit(data):
+        with pyro_backend("numpy"):
+            svi = infer.SVI(model, guide, optim.Adam({"lr": 1e-3}), infer.Trace_ELBO())
+            steps = svi_steps(svi, 1000, model_args=(data,))
+        async with steps:
+            async for loss in steps:
+                report(loss)
+
+Each stream runs in a copy of the context it was created in, so it keeps the
+backends selected by :func:`~pyroapi.dispatch.pyro_backend` at creation time
+regardless of the backends of other tasks. The worker runs at most
+``buffer_size`` steps ahead of the consumer, and stops at the next step once
+the stream is cancelled or closed.
+
+Backends keep their effect handler stack in global state, so jobs using the
+same handlers backend interleave one step (or one MCMC run) at a time, each
+under its own :func:`~pyroapi.dispatch.handlers.seed` . Concurrent jobs also
+share the backend's param store, so they should use distinct param names.
+"""
+
+import asyncio
+import contextvars
+import threading
+
+from pyroapi.dispatch import _current_backends, handlers, infer
+
+_ITEM, _DONE, _ERROR = 'item', 'done', 'error'
+_POLL_INTERVAL = 0.1
+_STEP_LOCKS = {}
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class AsyncStream(object):
+    """
+    Async iterator over the values emitted by a blocking job running on an
+    executor.
+
+    :param callable fn: A blocking function of a single argument ``emit`` ,
+        which it calls with each value to stream. ``emit(value)`` blocks while
+        the buffer is full, unless called with ``block=False`` .
+    :param executor: An optional :class:`concurrent.futures.Executor` . Defaults
+        to the event loop's default executor.
+    :param int buffer_size: Number of values the job may run ahead of the
+        consumer.
+    """
+    def __init__(self, fn, executor=None, buffer_size=1):
+        assert buffer_size >= 1
+        self._fn = fn
+        self._context = contextvars.copy_context()
+        self._executor = executor
+        self._slots = threading.Semaphore(buffer_size)
+        self._cancelled = threading.Event()
+        self._queue = None
+        self._future = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._future is None:
+            if self._cancelled.is_set():
+                raise StopAsyncIteration
+            loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            self._future = loop.run_in_executor(self._executor, self._context.run, self._run, loop)
+        try:
+            kind, value, has_slot = await self._queue.get()
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        if kind == _ITEM:
+            if has_slot:
+                self._slots.release()
+            return value
+        self._queue.put_nowait((kind, value, has_slot))  # later calls see the same end
+        if kind == _ERROR:
+            raise value
+        raise StopAsyncIteration
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    def cancel(self):
+        """
+        Stops the job before its next step. Values already buffered can still
+        be consumed.
+        """
+        self._cancelled.set()
+
+    async def aclose(self):
+        """
+        Cancels the job and waits for its current step to finish.
+        """
+        self.cancel()
+        if self._future is not None:
+            try:
+                await self._future
+            except Exception:
+                pass
+
+    def _deliver(self, loop, kind, value, has_slot=False):
+        try:
+            loop.call_soon_threadsafe(self._queue.put_nowait, (kind, value, has_slot))
+        except RuntimeError:  # the event loop is closed
+            self._cancelled.set()
+
+    def _run(self, loop):
+        def emit(value, block=True):
+            has_slot = self._slots.acquire(blocking=False)
+            while block and not has_slot:
+                if self._cancelled.is_set():
+                    raise _Cancelled
+                has_slot = self._slots.acquire(timeout=_POLL_INTERVAL)
+            if self._cancelled.is_set():
+                raise _Cancelled
+            self._deliver(loop, _ITEM, value, has_slot)
+
+        try:
+            self._fn(emit)
+        except _Cancelled:
+            self._deliver(loop, _DONE, None)
+        except BaseException as e:
+            self._deliver(loop, _ERROR, e)
+        else:
+            self._deliver(loop, _DONE, None)
+
+
+def _step_lock():
+    backend = dict(_current_backends())['handlers']
+    return _STEP_LOCKS.setdefault(backend, threading.Lock())
+
+
+def svi_steps(svi, num_steps, model_args=(), model_kwargs=None, executor=None, buffer_size=1, rng_seed=0):
+    """
+    Streams the losses of ``num_steps`` SVI steps.
+
+    :param svi: An :class:`~pyroapi.dispatch.infer.SVI` or
+        :class:`pyroapi.svi.SVI` instance.
+    :param int num_steps: Number of steps.
+    :param tuple model_args: Positional arguments to the model and guide.
+    :param dict model_kwargs: Keyword arguments to the model and guide.
+    :param executor: An optional :class:`concurrent.futures.Executor` .
+    :param int buffer_size: Number of steps the job may run ahead of the
+        consumer.
+    :param int rng_seed: Base random seed. Step ``i`` is seeded with
+        ``rng_seed + i`` .
+    :rtype: AsyncStream
+    """
+    model_kwargs = model_kwargs or {}
+
+    def run(emit):
+        lock = _step_lock()
+        for i in range(num_steps):
+            with lock, handlers.seed(rng_seed=rng_seed + i):
+                loss = svi.step(*model_args, **model_kwargs)
+            emit(loss)
+
+    return AsyncStream(run, executor, buffer_size)
+
+
+def mcmc_samples(kernel, num_samples, warmup_steps=None, model_args=(), model_kwargs=None, executor=None,
+                 buffer_size=1, rng_seed=0):
+    """
+    Streams the samples of an :class:`~pyroapi.dispatch.infer.MCMC` run as
+    dicts mapping site names to constrained values.
+
+    Samples are streamed as they are drawn if the backend calls the MCMC
+    ``hook_fn`` , as Pyro does, and otherwise after the run has finished.
+    Since a run cannot be paused, samples drawn during the run are buffered
+    regardless of ``buffer_size`` .
+
+    :param kernel: An MCMC kernel, e.g. :class:`~pyroapi.dispatch.infer.NUTS` .
+    :param int num_samples: Number of samples.
+    :param int warmup_steps: Number of warmup steps. Defaults to
+        ``num_samples`` .
+    :param tuple model_args: Positional arguments to the model.
+    :param dict model_kwargs: Keyword arguments to the model.
+    :param executor: An optional :class:`concurrent.futures.Executor` .
+    :param int buffer_size: Number of samples the job may run ahead of the
+        consumer.
+    :param int rng_seed: Random seed.
+    :rtype: AsyncStream
+    """
+    model_kwargs = model_kwargs or {}
+    if warmup_steps is None:
+        warmup_steps = num_samples
+
+    def run(emit):
+        streamed = []
+
+        def hook_fn(kernel, params, stage, i):
+            if stage == 'Sample':
+                transforms = getattr(kernel, 'transforms', None) or {}
+                emit({name: transforms[name].inv(value) if name in transforms else value
+                      for name, value in params.items()}, block=False)
+                streamed.append(i)
+
+        mcmc = infer.MCMC(kernel, num_samples=num_samples, warmup_steps=warmup_steps, hook_fn=hook_fn,
+                          disable_progbar=True)
+        with _step_lock(), handlers.seed(rng_seed=rng_seed):
+            mcmc.run(*model_args, **model_kwargs)
+        if not streamed:
+            samples = mcmc.get_samples()
+            for i in range(num_samples):
+                emit({name: value[i] for name, value in samples.items()})
+
+    return AsyncStream(run, executor, buffer_size)
@@ -0,0 +1,150 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Automatic selection of the fastest backend for a given model. For example:
+
+.. code-block:: python
+
+    from pyroapi.autoselect import autoselect_backend
+
+    with autoselect_backend(model, (x,), {"y": y}, candidates=["pyro", "numpy"]):
+        svi = infer.SVI(model, guide, optim.Adam({"lr": 1e-3}), infer.Trace_ELBO())
+        ...
+
+Each candidate backend is probed by tracing the model once and then timing a
+few SVI steps (or NUTS steps). Backends raising :class:`NotImplementedError` ,
+:class:`ImportError` or :class:`AttributeError` are dropped, whereas other
+errors, e.g. bugs of the model, are raised. The winner is cached per model,
+input shapes and probe settings. Each backend's param store is restored after
+its probe.
+"""
+
+import time
+import warnings
+from collections import OrderedDict
+
+from pyroapi.capabilities import supports
+from pyroapi.dispatch import _ALIASES, handlers, infer, optim, pyro, pyro_backend
+from pyroapi.interchange import to_backend
+from pyroapi.structure import _signature
+from pyroapi.svi import SVI
+
+_SELECTED = {}
+# Errors of backends that do not implement what the model or probe uses.
+_UNSUPPORTED_ERRORS = (NotImplementedError, ImportError, AttributeError)
+
+
+def _empty_guide(*args, **kwargs):
+    pass
+
+
+def _get_param_state():
+    store = pyro.get_param_store()
+    if hasattr(store, 'get_state'):
+        return store.get_state()
+    return dict(store)  # minipyro and NumPyro stores are plain dicts
+
+
+def _set_param_state(state):
+    store = pyro.get_param_store()
+    store.clear()
+    if hasattr(store, 'set_state'):
+        store.set_state(state)
+    else:
+        store.update(state)
+
+
+def _probe(model, args, kwargs, guide, probe, num_steps):
+    args, kwargs = to_backend((args, kwargs))
+    start = time.perf_counter()
+    handlers.trace(model).get_trace(*args, **kwargs)
+    if probe == 'svi':
+        pyro.get_param_store().clear()
+        svi = SVI(model, guide or _empty_guide, optim.Adam({'lr': 1e-3}), 'Trace_ELBO', jit=True)
+        svi.step(*args, **kwargs)  # excluded from timing: may compile
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            svi.step(*args, **kwargs)
+    elif probe == 'nuts':
+        mcmc = infer.MCMC(infer.NUTS(model), num_samples=num_steps, warmup_steps=num_steps)
+        mcmc.run(*args, **kwargs)
+    else:
+        raise ValueError('Unknown probe {}, expected "svi" or "nuts"'.format(probe))
+    return time.perf_counter() - start
+
+
+def probe_backends(model, args=(), kwargs=None, candidates=None, guide=None, probe='svi', num_steps=3):
+    """
+    Times a short probe of the model on each candidate backend.
+
+    :param callable model: A backend-agnostic model.
+    :param tuple args: Positional arguments to the model. Arrays are converted
+        to each backend's tensor type with
+        :func:`~pyroapi.interchange.to_backend` .
+    :param dict kwargs: Keyword arguments to the model.
+    :param list candidates: Backend aliases to try. Defaults to all registered
+        aliases implementing the probe's inference algorithm.
+    :param callable guide: Optional guide for the SVI probe. Defaults to an
+        empty guide.
+    :param str probe: Either "svi" or "nuts".
+    :param int num_steps: Number of SVI steps, or of NUTS warmup steps and
+        samples.
+    :returns: A dict mapping each alias to the probe's time in seconds, or to
+        the exception that disqualified it.
+    :rtype: collections.OrderedDict
+    :raises Exception: any error of a probe other than
+        :class:`NotImplementedError` , :class:`ImportError` or
+        :class:`AttributeError` .
+    """
+    kwargs = kwargs or {}
+    if candidates is None:
+        name = 'infer.NUTS' if probe == 'nuts' else 'infer.SVI'
+        candidates = [alias for alias in list(_ALIASES) if supports(alias, name)]
+    results = OrderedDict()
+    for alias in candidates:
+        try:
+            with pyro_backend(alias), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                state = _get_param_state()
+                try:
+                    results[alias] = _probe(model, args, kwargs, guide, probe, num_steps)
+                finally:
+                    _set_param_state(state)
+        except _UNSUPPORTED_ERRORS as e:
+            results[alias] = e
+    return results
+
+
+def select_backend(model, args=(), kwargs=None, candidates=None, guide=None, probe='svi', num_steps=3):
+    """
+    Returns the alias of the fastest candidate backend for a model, see
+    :func:`probe_backends` for arguments. Results are cached per model, input
+    shapes and probe settings.
+
+    :rtype: str
+    :raises NotImplementedError: if no candidate backend can run the model.
+    """
+    kwargs = kwargs or {}
+    key = (model, _signature(args), _signature(kwargs), None if candidates is None else tuple(candidates),
+           guide, probe, num_steps)
+    try:
+        return _SELECTED[key]
+    except KeyError:
+        pass
+    results = probe_backends(model, args, kwargs, candidates, guide, probe, num_steps)
+    times = {alias: t for alias, t in results.items() if not isinstance(t, Exception)}
+    if not times:
+        causes = ''.join('\n  {}: {}: {}'.format(alias, type(e).__name__, e) for alias, e in results.items())
+        last_error = list(results.values())[-1] if results else None
+        raise NotImplementedError('No candidate backend can run this model' + causes) from last_error
+    _SELECTED[key] = alias = min(times, key=times.get)
+    return alias
+
+
+def autoselect_backend(model, args=(), kwargs=None, candidates=None, guide=None, probe='svi', num_steps=3):
+    """
+    Returns a :func:`~pyroapi.dispatch.pyro_backend` context for the fastest
+    candidate backend, see :func:`select_backend` .
+    """
+    return pyro_backend(select_backend(model, args, kwargs, candidates, guide, probe, num_steps))
@@ -0,0 +1,9 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+from pyroapi.benchmarks.suite import benchmark_model, run_benchmarks
+
+__all__ = [
+    'benchmark_model',
+    'run_benchmarks',
+]
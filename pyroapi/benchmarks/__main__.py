@@ -0,0 +1,61 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Command line interface to the cross-backend benchmarks. For example::
+
+    python -m pyroapi.benchmarks --backend pyro --backend numpy \
+        --model eight_schools --num-steps 100 --output results.json
+
+    python -m pyroapi.benchmarks --model scalable_logistic_regression \
+        --size N=100,10000,1000000 --size dim=3,30 --stage svi
+"""
+
+import argparse
+import json
+import sys
+
+from pyroapi.benchmarks.suite import STAGES, run_benchmarks
+
+
+def _parse_size(arg):
+    key, values = arg.split('=')
+    return key, [int(value) for value in values.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cross-backend benchmarks of pyroapi.testing.MODELS')
+    parser.add_argument('-m', '--model', action='append', dest='models',
+                        help='model name (may be repeated, defaults to all models)')
+    parser.add_argument('-b', '--backend', action='append', dest='backends',
+                        help='backend alias (may be repeated, defaults to all aliases)')
+    parser.add_argument('-s', '--stage', action='append', dest='stages', choices=STAGES,
+                        help='stage to time (may be repeated, defaults to all stages)')
+    parser.add_argument('--size', action='append', type=_parse_size, default=[],
+                        help='sizes of scalable models to sweep over, as key=value[,value...]')
+    parser.add_argument('--num-steps', default=10, type=int)
+    parser.add_argument('--num-warmup', default=10, type=int)
+    parser.add_argument('--num-samples', default=10, type=int)
+    parser.add_argument('--repeats', default=3, type=int)
+    parser.add_argument('--rng-seed', default=0, type=int)
+    parser.add_argument('--cache-dir', help='directory caching the data generated by the models')
+    parser.add_argument('--no-isolate', dest='isolate', action='store_false',
+                        help='run all configurations in this process rather than one worker process each')
+    parser.add_argument('-o', '--output', help='output JSON file (defaults to stdout)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(models=args.models, backends=args.backends,
+                             num_steps=args.num_steps, num_warmup=args.num_warmup,
+                             num_samples=args.num_samples, repeats=args.repeats,
+                             rng_seed=args.rng_seed, size_sweep=dict(args.size), isolate=args.isolate,
+                             stages=tuple(args.stages or STAGES), cache_dir=args.cache_dir)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Cross-backend benchmarks of the models in :data:`pyroapi.testing.MODELS` .
+
+Each model is timed on each backend in separate stages:
+
+- ``model``: a single execution of the model.
+- ``trace``: ``handlers.trace(model).get_trace(...)``.
+- ``svi``: ``num_steps`` SVI steps with a MAP guide, which has one
+  constrained param per latent sample site.
+- ``svi_jit``: the same steps with a compiled ELBO, see :func:`pyroapi.svi.make_elbo` .
+  The compiled path taken is recorded as ``jit_path`` .
+- ``mcmc_warmup`` and ``mcmc_sample``: the warmup and sampling phases of a
+  single NUTS run, split by the MCMC ``hook_fn`` , or by the separate
+  ``warmup`` and ``run`` methods of NumPyro's MCMC.
+
+Each stage is run once untimed before the timed repeats, so that
+compilation and caches are warmed up. By default, :func:`run_benchmarks` runs
+each configuration in a fresh worker process, so that the reported peak memory
+``max_rss`` is not that of earlier configurations.
+"""
+
+import itertools
+import multiprocessing
+import platform
+import sys
+import time
+import warnings
+from collections import OrderedDict
+from contextlib import ExitStack
+
+from pyroapi.dispatch import _ALIASES, distributions as dist, handlers, infer, optim, pyro, pyro_backend
+from pyroapi.svi import SVI, _is_numpyro
+from pyroapi.testing import MODEL_SIZES, MODELS, load_model
+from pyroapi.vectorize import _sample_sites
+from pyroapi.version import __version__
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+STAGES = ('model', 'trace', 'svi', 'svi_jit', 'mcmc_warmup', 'mcmc_sample')
+
+
+def _time(fn, repeats):
+    fn()  # warm up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _map_guide(model, args, kwargs):
+    sites = _sample_sites(handlers.trace(model).get_trace(*args, **kwargs))
+    if not sites:
+        raise NotImplementedError('No latent sample sites were traced')
+
+    def guide(*args, **kwargs):
+        for site in sites:
+            value = pyro.param('{}_map'.format(site['name']), site['value'], constraint=site['fn'].support)
+            pyro.sample(site['name'], dist.Delta(value).to_event(len(site['fn'].event_shape)))
+
+    return guide
+
+
+def _run_mcmc(model, args, kwargs, num_warmup, num_samples):
+    # Returns the wall times of the warmup and sampling phases of a single run.
+    warmup_end = []
+
+    def hook_fn(kernel, samples, stage, i):
+        if stage.startswith('Warmup'):
+            warmup_end[:] = [time.perf_counter()]
+
+    if _is_numpyro():
+        # NumPyro's compatibility MCMC ignores hook_fn, whereas its native MCMC
+        # runs the two phases separately.
+        import numpyro
+        from numpyro.infer import MCMC, NUTS
+
+        mcmc = MCMC(NUTS(model), num_warmup=num_warmup, num_samples=num_samples, progress_bar=False)
+        start = time.perf_counter()
+        mcmc.warmup(numpyro.prng_key(), *args, **kwargs)
+        warmup_end.append(time.perf_counter())
+        mcmc.run(mcmc.post_warmup_state.rng_key, *args, **kwargs)
+    else:
+        mcmc = infer.MCMC(infer.NUTS(model), num_samples=num_samples, warmup_steps=num_warmup, hook_fn=hook_fn)
+        start = time.perf_counter()
+        mcmc.run(*args, **kwargs)
+        if num_warmup and not warmup_end:
+            raise NotImplementedError('The MCMC warmup phase cannot be timed separately')
+    end = time.perf_counter()
+    warmup_end = warmup_end[0] if warmup_end else start
+    return OrderedDict([('mcmc_warmup', warmup_end - start), ('mcmc_sample', end - warmup_end)])
+
+
+def benchmark_model(name, backend, num_steps=10, num_warmup=10, num_samples=10, repeats=3,
+                    rng_seed=0, model_sizes=None, stages=STAGES, cache_dir=None):
+    """
+    Times a single registered model on a single backend.
+
+    :param str name: Name of a model in :data:`pyroapi.testing.MODELS` .
+    :param str backend: A backend alias registered through
+        :func:`~pyroapi.dispatch.register_backend` .
+    :param int num_steps: Number of SVI steps per repeat.
+    :param int num_warmup: Number of NUTS warmup steps per repeat.
+    :param int num_samples: Number of NUTS samples per repeat.
+    :param int repeats: Number of times each stage is timed, after an untimed
+        warm-up run.
+    :param int rng_seed: Seed for inference. Data are generated with the
+        seed the model was registered with.
+    :param dict model_sizes: Optional size parameters forwarded to the model
+        factory, see :func:`~pyroapi.testing.register_scalable` .
+    :param tuple stages: The stages to time, a subset of :data:`STAGES` .
+    :param str cache_dir: Optional directory caching the generated data, see
+        :func:`~pyroapi.testing.load_model` .
+    :returns: A dict mapping stage name to a dict with either the list of
+        ``times`` in seconds and the process' peak resident memory
+        ``max_rss`` in bytes so far, or the ``error`` that interrupted the
+        stage.
+    :rtype: collections.OrderedDict
+    """
+    results = OrderedDict()
+    with ExitStack() as stack:
+        stack.enter_context(pyro_backend(backend))
+        stack.enter_context(handlers.seed(rng_seed=rng_seed))
+        stack.enter_context(warnings.catch_warnings())
+        warnings.simplefilter('ignore')
+        try:
+            # Pyro's validation checks are not timed, and reject the batch dims
+            # of some models outside of plates once a guide is present.
+            stack.enter_context(pyro.validation_enabled(False))
+        except NotImplementedError:
+            pass
+        try:
+            f = load_model(name, cache_dir=cache_dir, **(model_sizes or {}))
+        except Exception as e:
+            return OrderedDict([('setup', {'error': '{}: {}'.format(type(e).__name__, e)})])
+        model, args, kwargs = f['model'], f.get('model_args', ()), f.get('model_kwargs', {})
+
+        svis = {}
+
+        def run_svi(jit=False):
+            # The SVI object is built by the untimed first run, so that compilation is not timed.
+            if jit not in svis:
+                pyro.get_param_store().clear()
+                svis[jit] = SVI(model, _map_guide(model, args, kwargs), optim.Adam({'lr': 1e-3}), 'Trace_ELBO',
+                                jit=jit, ignore_jit_warnings=True)
+            for _ in range(num_steps):
+                svis[jit].step(*args, **kwargs)
+
+        mcmc_times = OrderedDict()
+
+        def time_mcmc(stage):
+            if not mcmc_times:
+                runs = [_run_mcmc(model, args, kwargs, num_warmup, num_samples) for _ in range(repeats + 1)]
+                for phase in runs[0]:
+                    mcmc_times[phase] = [run[phase] for run in runs[1:]]  # the first run warms up
+            return mcmc_times[stage]
+
+        fns = OrderedDict([
+            ('model', lambda: _time(lambda: model(*args, **kwargs), repeats)),
+            ('trace', lambda: _time(lambda: handlers.trace(model).get_trace(*args, **kwargs), repeats)),
+            ('svi', lambda: _time(run_svi, repeats)),
+            ('svi_jit', lambda: _time(lambda: run_svi(jit=True), repeats)),
+            ('mcmc_warmup', lambda: time_mcmc('mcmc_warmup')),
+            ('mcmc_sample', lambda: time_mcmc('mcmc_sample')),
+        ])
+        for stage in stages:
+            try:
+                results[stage] = {'times': fns[stage](), 'max_rss': _max_rss()}
+                if stage.startswith('svi'):
+                    results[stage]['jit_path'] = svis[stage == 'svi_jit'].jit_path
+            except Exception as e:
+                results[stage] = {'error': '{}: {}'.format(type(e).__name__, e)}
+    return results
+
+
+def _max_rss():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else 1024 * max_rss
+
+
+def _size_grid(name, size_sweep):
+    keys = [key for key in size_sweep if key in MODEL_SIZES.get(name, {})]
+    for values in itertools.product(*[size_sweep[key] for key in keys]):
+        yield OrderedDict(zip(keys, values))
+
+
+def run_benchmarks(models=None, backends=None, size_sweep=None, isolate=True, **kwargs):
+    """
+    Times each model on each backend and collects the results in a
+    JSON-serializable dict.
+
+    :param list models: Names of models in :data:`pyroapi.testing.MODELS` .
+        Defaults to all registered models.
+    :param list backends: Backend aliases. Defaults to all registered aliases.
+    :param dict size_sweep: An optional dict mapping size parameter names to
+        lists of values. Models registered with
+        :func:`~pyroapi.testing.register_scalable` are run on every
+        combination of the values of the parameters they accept.
+    :param bool isolate: Whether to run each configuration in a fresh
+        "spawn" worker process, so that ``max_rss`` measures that
+        configuration alone. Models and backends must then be registered
+        when their modules are imported.
+    :param kwargs: Options forwarded to :func:`benchmark_model` .
+    :rtype: dict
+    """
+    models = list(MODELS) if models is None else list(models)
+    backends = list(_ALIASES) if backends is None else list(backends)
+    size_sweep = size_sweep or {}
+    results = []
+    with ExitStack() as stack:
+        pool = None
+        if isolate:
+            # Each worker runs a single configuration.
+            pool = stack.enter_context(multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1))
+        for backend in backends:
+            for name in models:
+                for sizes in _size_grid(name, size_sweep):
+                    try:
+                        if pool is None:
+                            stages = benchmark_model(name, backend, model_sizes=sizes, **kwargs)
+                        else:
+                            stages = pool.apply(benchmark_model, (name, backend), dict(kwargs, model_sizes=sizes))
+                    except ImportError as e:
+                        stages = OrderedDict([('setup', {'error': '{}: {}'.format(type(e).__name__, e)})])
+                    for stage, result in stages.items():
+                        record = OrderedDict([('model', name), ('backend', backend), ('sizes', sizes),
+                                              ('stage', stage)])
+                        record.update(result)
+                        if 'times' in result:
+                            record['min'] = min(result['times'])
+                        results.append(record)
+    return {
+        'pyroapi_version': __version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'argv': sys.argv,
+        'options': dict(kwargs, size_sweep=size_sweep, isolate=isolate),
+        'results': results,
+    }
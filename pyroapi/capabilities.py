@@ -0,0 +1,173 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Registry of the names each backend alias implements, so that jobs can be
+routed to capable backends without importing them or failing midway:
+
+.. code-block:: python
+
+    from pyroapi.capabilities import supports
+
+    if supports("numpy", "infer.JitTrace_ELBO"):
+        ...
+
+Each alias is probed once for all of :data:`API_NAMES` , and for any other
+name when first queried. Results are cached in memory and in a JSON file in
+the directory ``$PYROAPI_CACHE_DIR`` (default ``~/.cache/pyroapi`` ), keyed by
+the alias' backend modules and the versions of their packages. Later
+processes then answer queries without importing the backends.
+"""
+
+import functools
+import importlib
+import json
+import os
+import threading
+
+from pyroapi.dispatch import _ALIASES, GenericModule, _getattr_or_import, _import_backend
+
+# The names used by pyroapi.tests, pyroapi.testing and the pyroapi utilities.
+API_NAMES = [
+    'pyro.sample', 'pyro.param', 'pyro.plate', 'pyro.get_param_store',
+    'distributions.Normal', 'distributions.Bernoulli', 'distributions.Categorical', 'distributions.Binomial',
+    'distributions.Beta', 'distributions.HalfCauchy', 'distributions.TransformedDistribution',
+    'distributions.transforms', 'distributions.constraints',
+    'handlers.seed', 'handlers.trace', 'handlers.condition', 'handlers.scale',
+    'infer.SVI', 'infer.Trace_ELBO', 'infer.JitTrace_ELBO', 'infer.TraceMeanField_ELBO', 'infer.NUTS',
+    'infer.MCMC',
+    'optim.Adam', 'optim.ClippedAdam',
+    'ops.tensor', 'ops.zeros', 'ops.ones', 'ops.arange', 'ops.exp', 'ops.sum', 'ops.randn', 'ops.allclose',
+    'ops.stack', 'ops.cat',
+]
+
+_CAPABILITIES = {}
+_LOCK = threading.RLock()
+
+
+def _cache_file():
+    cache_dir = os.environ.get('PYROAPI_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pyroapi'))
+    return os.path.join(cache_dir, 'capabilities.json')
+
+
+def _backends(alias):
+    backends = GenericModule.current_backend.copy()
+    backends.update(_ALIASES[alias])
+    return backends
+
+
+@functools.lru_cache(maxsize=None)
+def _package_version(backend):
+    package = backend.split('.')[0]
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        metadata = None
+    if metadata is not None:
+        try:
+            distributions = metadata.packages_distributions().get(package, [package])
+        except AttributeError:  # Python < 3.10
+            distributions = [package]
+        for distribution in distributions:
+            try:
+                return metadata.version(distribution)
+            except metadata.PackageNotFoundError:
+                pass
+    try:
+        return getattr(importlib.import_module(package), '__version__', None)
+    except Exception:  # broken backends are reported as unsupported by _probe
+        return None
+
+
+def _cache_key(alias):
+    backends = _backends(alias)
+    versions = {backend: _package_version(backend) for backend in set(backends.values())}
+    return json.dumps({'alias': alias, 'backends': backends, 'versions': versions}, sort_keys=True)
+
+
+def _probe(backends, name):
+    # Names are resolved as by GenericModule, including lazily imported
+    # submodules. Backends that fail to import in any way are not capable.
+    module_name, attr = name.split('.', 1)
+    try:
+        backend = backends[module_name]
+        value = _import_backend(backend, 'capabilities')
+        for part in attr.split('.'):
+            value = _getattr_or_import(value, backend, part, module_name)
+            backend = '{}.{}'.format(backend, part)
+    except Exception:
+        return False
+    return True
+
+
+def _load_disk_cache():
+    try:
+        with open(_cache_file()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_disk_cache(key, capabilities):
+    path = _cache_file()
+    cache = _load_disk_cache()
+    cache[key] = capabilities
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # the disk cache is best effort
+
+
+def capabilities(alias):
+    """
+    Returns a dict mapping each probed name (e.g. "infer.NUTS") to whether
+    the backend alias implements it.
+
+    :param str alias: A backend alias registered through
+        :func:`~pyroapi.dispatch.register_backend` .
+    :rtype: dict
+    """
+    with _LOCK:
+        key = _cache_key(alias)
+        try:
+            return _CAPABILITIES[key]
+        except KeyError:
+            pass
+        result = _load_disk_cache().get(key)
+        if result is None:
+            backends = _backends(alias)
+            result = {name: _probe(backends, name) for name in API_NAMES}
+            _save_disk_cache(key, result)
+        _CAPABILITIES[key] = result
+        return result
+
+
+def supports(alias, name):
+    """
+    Returns whether a backend alias implements a dispatched name.
+
+    :param str alias: A backend alias registered through
+        :func:`~pyroapi.dispatch.register_backend` .
+    :param str name: A dotted name starting with a generic module name, e.g.
+        "infer.JitTrace_ELBO" or "distributions.transforms.AffineTransform".
+    :rtype: bool
+    """
+    with _LOCK:
+        result = capabilities(alias)
+        if name not in result:
+            result[name] = _probe(_backends(alias), name)
+            _save_disk_cache(_cache_key(alias), result)
+        return result[name]
+
+
+def capable_aliases(*names):
+    """
+    Returns the registered backend aliases that implement all the given names.
+
+    :rtype: list
+    """
+    return [alias for alias in list(_ALIASES) if all(supports(alias, name) for name in names)]
@@ -0,0 +1,204 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Parallel runner for the conformance tests in :mod:`pyroapi.tests` . Each
+``(test, backend)`` pair is sharded across worker processes, each of which
+pins a single backend for its whole life, and the results are merged into a
+single report. For example:
+
+.. code-block:: bash
+
+    python -m pyroapi.conformance --backend pyro --backend numpy --backend funsor \\
+        --workers-per-backend 2 --output report.json
+
+As in the recommended ``conftest.py`` , tests raising
+:class:`NotImplementedError` are reported as xfailed.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pytest
+
+import pyroapi.tests
+from pyroapi.dispatch import prewarm, pyro_backend
+
+_BACKEND = None
+_IMPORT_ERROR = None
+_PLUGIN = sys.modules[__name__]
+
+
+@pytest.fixture
+def backend():
+    with pyro_backend(_BACKEND):
+        yield _BACKEND
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.excinfo is not None and call.excinfo.errisinstance(NotImplementedError):
+        report.outcome = 'skipped'
+        report.wasxfail = str(call.excinfo.value)
+
+
+class _Recorder(object):
+    def __init__(self):
+        self.items = []
+        self.reports = []
+
+    def pytest_collection_modifyitems(self, items):
+        self.items.extend(items)
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == 'call' or report.outcome != 'passed':
+            outcome = report.outcome
+            if hasattr(report, 'wasxfail'):
+                outcome = 'xfailed' if report.skipped else 'xpassed'
+            self.reports.append(OrderedDict([
+                ('nodeid', report.nodeid),
+                ('backend', _BACKEND),
+                ('when', report.when),
+                ('outcome', outcome),
+                ('duration', report.duration),
+                ('longrepr', None if report.passed else str(report.longrepr)),
+            ]))
+
+
+def _pytest_args(args):
+    return ['-p', 'no:cacheprovider', '-p', 'no:terminal'] + list(args)
+
+
+def collect_tests(pytest_args=()):
+    """
+    Returns the ids of the tests in :mod:`pyroapi.tests` , as absolute paths
+    that can be passed to pytest.
+
+    :param list pytest_args: Extra arguments to pytest.
+    :rtype: list
+    """
+    recorder = _Recorder()
+    path = os.path.dirname(os.path.abspath(pyroapi.tests.__file__))
+    pytest.main(_pytest_args(['--collect-only', path] + list(pytest_args)),
+                plugins=[_PLUGIN, recorder])
+    test_ids = []
+    for item in recorder.items:
+        item_path = str(getattr(item, 'path', None) or item.fspath)
+        test_ids.append(item_path + '::' + item.nodeid.split('::', 1)[1])
+    return test_ids
+
+
+def _init_worker(alias):
+    global _BACKEND, _IMPORT_ERROR
+    _BACKEND = alias
+    try:
+        if alias == 'funsor':
+            import funsor
+            funsor.set_backend('torch')
+        prewarm(alias)
+    except ImportError as e:
+        _IMPORT_ERROR = '{}: {}'.format(type(e).__name__, e)
+
+
+def _run_shard(test_ids, pytest_args):
+    if _IMPORT_ERROR is not None:
+        return [OrderedDict([
+            ('nodeid', test_id),
+            ('backend', _BACKEND),
+            ('when', 'setup'),
+            ('outcome', 'skipped'),
+            ('duration', 0.),
+            ('longrepr', _IMPORT_ERROR),
+        ]) for test_id in test_ids]
+    recorder = _Recorder()
+    pytest.main(_pytest_args(list(test_ids) + list(pytest_args)), plugins=[_PLUGIN, recorder])
+    return recorder.reports
+
+
+def run_conformance(backends, workers_per_backend=1, pytest_args=(), mp_context=None):
+    """
+    Runs every test in :mod:`pyroapi.tests` on every backend, with
+    ``workers_per_backend`` worker processes per backend running concurrently.
+
+    :param list backends: Backend aliases to test.
+    :param int workers_per_backend: Number of worker processes per backend.
+    :param list pytest_args: Extra arguments to pytest.
+    :param mp_context: An optional :mod:`multiprocessing` context. Defaults to
+        "spawn", since forking a process that has imported a multithreaded
+        backend such as JAX may deadlock.
+    :returns: A report with a ``summary`` of outcome counts per backend and a
+        list of ``results`` per test and backend.
+    :rtype: dict
+    """
+    mp_context = mp_context or multiprocessing.get_context('spawn')
+    start = time.perf_counter()
+    test_ids = collect_tests(pytest_args)
+    shards = [test_ids[i::workers_per_backend] for i in range(workers_per_backend)]
+    executors = []
+    futures = {}
+    results = []
+    try:
+        for alias in backends:
+            executor = ProcessPoolExecutor(max_workers=workers_per_backend, mp_context=mp_context,
+                                           initializer=_init_worker, initargs=(alias,))
+            executors.append(executor)
+            for shard in shards:
+                if shard:
+                    futures[executor.submit(_run_shard, shard, pytest_args)] = alias
+        for future in as_completed(futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:  # e.g. a worker crashed
+                results.append(OrderedDict([
+                    ('nodeid', None),
+                    ('backend', futures[future]),
+                    ('when', 'setup'),
+                    ('outcome', 'error'),
+                    ('duration', 0.),
+                    ('longrepr', '{}: {}'.format(type(e).__name__, e)),
+                ]))
+    finally:
+        for executor in executors:
+            executor.shutdown()
+
+    summary = OrderedDict()
+    for alias in backends:
+        summary[alias] = dict(Counter(result['outcome'] for result in results if result['backend'] == alias))
+    results.sort(key=lambda result: (result['backend'], result['nodeid'] or ''))
+    return {'summary': summary, 'time': time.perf_counter() - start, 'results': results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parallel cross-backend conformance tests')
+    parser.add_argument('-b', '--backend', action='append', dest='backends', required=True,
+                        help='backend alias to test (may be repeated)')
+    parser.add_argument('-j', '--workers-per-backend', default=1, type=int)
+    parser.add_argument('-o', '--output', help='output JSON report')
+    parser.add_argument('pytest_args', nargs='*', help='extra arguments to pytest, after --')
+    args = parser.parse_args(argv)
+
+    report = run_conformance(args.backends, args.workers_per_backend, args.pytest_args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    for result in report['results']:
+        if result['outcome'] in ('failed', 'error'):
+            print('{} [{}]\n{}\n'.format(result['nodeid'], result['backend'], result['longrepr']))
+    for alias, counts in report['summary'].items():
+        print('{}: {}'.format(alias, ', '.join('{} {}'.format(n, outcome) for outcome, n in sorted(counts.items()))))
+    print('finished in {:.1f} seconds'.format(report['time']))
+    return 1 if any(result['outcome'] in ('failed', 'error') for result in report['results']) else 0
+
+
+if __name__ == '__main__':
+    # Run from the importable module, so that workers and pytest share its state.
+    import pyroapi.conformance
+    sys.exit(pyroapi.conformance.main())
@@ -34,41 +34,214 @@ see how to use these by example:
             print("step {} loss = {}".format(step, loss))
 
 """
+import contextvars
 import importlib
+import sys
+import threading
+import time
+from collections.abc import Mapping
 from contextlib import contextmanager
 
 DEFAULT_RNG_SEED = 1
 _ALIASES = {}
 
 
+class _BackendCache(dict):
+    """
+    Attributes resolved from a single backend module.
+    """
+    __slots__ = ('backend',)
+
+    def __init__(self, backend):
+        super(_BackendCache, self).__init__()
+        self.backend = backend
+
+
 class GenericModule(object):
     """
     Wrapper for a module that can be dynamically routed to a custom backend.
+
+    The backend of each module is held in a :class:`contextvars.ContextVar` ,
+    so concurrent threads and asyncio tasks can use different backends.
+    ``GenericModule.current_backend`` is a read-only mapping from module name
+    to the backend of the current thread or asyncio task; use
+    :func:`pyro_backend` to change it.
+
+    Resolved attributes are cached per backend module, so attributes later
+    replaced on a backend module, e.g. monkeypatched ``pyro.infer.SVI`` , are
+    not seen until the caches are invalidated by :func:`clear_cache` or
+    :func:`register_backend` .
     """
-    current_backend = {}
     _modules = {}
+    _backend_vars = {}
+    _caches = {}
+    _epoch = 0
 
     def __init__(self, name, default_backend):
         assert isinstance(name, str)
         assert isinstance(default_backend, str)
         self._name = name
-        GenericModule.current_backend[name] = default_backend
+        backend_var = contextvars.ContextVar('pyroapi_backend_' + name, default=_get_cache(default_backend))
+        self._backend = backend_var
+        GenericModule._backend_vars[name] = backend_var
 
     def __getattribute__(self, name):
-        module_name = super(GenericModule, self).__getattribute__('_name')
-        backend = GenericModule.current_backend[module_name]
+        cache = _getattr(self, '_backend').get()
         try:
-            module = GenericModule._modules[backend]
+            return cache[name]
+        except KeyError:
+            return _getattr(self, '_resolve')(cache, name)
+
+    def _resolve(self, cache, name):
+        epoch = GenericModule._epoch
+        try:
+            module = GenericModule._modules[cache.backend]
         except KeyError:
-            module = importlib.import_module(backend)
-            GenericModule._modules[backend] = module
+            module = _import_backend(cache.backend, '{}.{}'.format(_getattr(self, '_name'), name))
         if name.startswith('__'):
             return getattr(module, name)  # allow magic attributes to return AttributeError
+        value = _getattr_or_import(module, cache.backend, name, _getattr(self, '_name'))
+        if epoch == GenericModule._epoch:
+            cache[name] = value
+        return value
+
+
+class _CurrentBackends(Mapping):
+    """
+    Read-only view of the backend of each module in the current context.
+    """
+    def __getitem__(self, name):
+        return GenericModule._backend_vars[name].get().backend
+
+    def __iter__(self):
+        return iter(GenericModule._backend_vars)
+
+    def __len__(self):
+        return len(GenericModule._backend_vars)
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+GenericModule.current_backend = _CurrentBackends()
+_getattr = object.__getattribute__
+_IMPORT_LOCKS = {}
+_IMPORT_TIMES = {}
+_IMPORT_MODULES = {}
+_IMPORT_TRIGGERS = {}
+_MISSING_SUBMODULES = set()
+
+
+def _get_cache(backend):
+    try:
+        return GenericModule._caches[backend]
+    except KeyError:
+        return GenericModule._caches.setdefault(backend, _BackendCache(backend))
+
+
+def _import_backend(backend, trigger=None):
+    # Concurrent first-touch callers wait on a single import.
+    with _IMPORT_LOCKS.setdefault(backend, threading.Lock()):
+        try:
+            return GenericModule._modules[backend]
+        except KeyError:
+            pass
+        before = set(sys.modules)
+        start = time.perf_counter()
+        module = importlib.import_module(backend)
+        _IMPORT_TIMES[backend] = time.perf_counter() - start
+        _IMPORT_MODULES[backend] = sorted(set(sys.modules) - before)
+        _IMPORT_TRIGGERS[backend] = trigger
+        GenericModule._modules[backend] = module
+    return module
+
+
+def _getattr_or_import(module, backend, name, generic_name):
+    try:
+        return getattr(module, name)
+    except AttributeError:
+        return _import_submodule(module, backend, name, generic_name)
+
+
+def _import_submodule(module, backend, name, generic_name):
+    # Submodules that a backend does not import eagerly are imported on first use.
+    # Only packages have submodules, and failed imports are not retried.
+    submodule = '{}.{}'.format(backend, name)
+    if hasattr(module, '__path__') and submodule not in _MISSING_SUBMODULES:
+        try:
+            return _import_backend(submodule, '{}.{}'.format(generic_name, name))
+        except ModuleNotFoundError as e:
+            if e.name != submodule:
+                raise
+            _MISSING_SUBMODULES.add(submodule)
+    raise NotImplementedError('This Pyro backend does not implement {}.{}'.format(generic_name, name))
+
+
+def clear_cache():
+    """
+    Clears the attributes that generic modules cached from backend modules, so
+    that attributes replaced on a backend module after their first use, e.g.
+    by monkeypatching, are resolved again.
+    """
+    GenericModule._epoch += 1
+    for cache in list(GenericModule._caches.values()):
+        cache.clear()
+
+
+@contextmanager
+def _set_backends(new_backends):
+    tokens = []
+    for name, new_backend in new_backends.items():
+        backend_var = GenericModule._backend_vars[name]
+        tokens.append((backend_var, backend_var.set(_get_cache(new_backend))))
+    try:
+        yield
+    finally:
+        for backend_var, token in reversed(tokens):
+            backend_var.reset(token)
+
+
+def _current_backends():
+    return tuple(sorted((name, backend_var.get().backend)
+                        for name, backend_var in GenericModule._backend_vars.items()))
+
+
+class BackendNamespace(object):
+    """
+    Frozen namespace whose attributes are the backend modules themselves,
+    e.g. ``api.pyro`` , ``api.distributions`` (or ``api.dist`` ) and
+    ``api.ops`` . Modules are imported on first access and then bound as plain
+    instance attributes, so model code written against this namespace
+    bypasses :class:`GenericModule` dispatch entirely.
+
+    :param backends: An iterable of ``(module_name, backend)`` pairs.
+    """
+    _abbreviations = {'dist': 'distributions'}
+
+    def __init__(self, backends):
+        object.__setattr__(self, '_backends', dict(backends))
+
+    def __getattr__(self, name):
+        module_name = BackendNamespace._abbreviations.get(name, name)
+        try:
+            backend = self._backends[module_name]
+        except KeyError:
+            raise AttributeError('No generic module named {}'.format(name))
         try:
-            return getattr(module, name)
-        except AttributeError:
-            raise NotImplementedError('This Pyro backend does not implement {}.{}'
-                                      .format(module_name, name))
+            module = GenericModule._modules[backend]
+        except KeyError:
+            module = _import_backend(backend, 'api.' + name)
+        object.__setattr__(self, name, module)
+        return module
+
+    def __setattr__(self, name, value):
+        raise AttributeError('BackendNamespace is frozen')
+
+    def __repr__(self):
+        return 'BackendNamespace({})'.format(self._backends)
 
 
 @contextmanager
@@ -80,22 +253,28 @@ def pyro_backend(*aliases, **new_backends):
     registered through :func:`register_backend` ) or by providing kwargs
     mapping module name to backend module name.  Standard backends include:
     pyro, minipyro, funsor, and numpy.
+
+    The backend is set only in the current thread or asyncio task. Note that
+    backends keep their effect handler stacks in global state, so concurrent
+    threads or tasks may use different backends, e.g. pyro and numpy, but
+    must not run models of the same backend at the same time, see
+    :mod:`pyroapi.aio` . For hot loops, the context manager yields a :class:`BackendNamespace` bound
+    directly to the selected backend modules::
+
+        with pyro_backend("numpy") as api:
+            x = api.pyro.sample("x", api.dist.Normal(0., 1.))
+
+    The block is run under :func:`~pyroapi.dispatch.handlers.seed` .
     """
     if aliases:
         assert len(aliases) == 1
         assert not new_backends
         new_backends = _ALIASES[aliases[0]]
 
-    old_backends = {}
-    for name, new_backend in new_backends.items():
-        old_backends[name] = GenericModule.current_backend[name]
-        GenericModule.current_backend[name] = new_backend
-    try:
+    with _set_backends(new_backends):
+        api = BackendNamespace(_current_backends())
         with handlers.seed(rng_seed=DEFAULT_RNG_SEED):
-            yield
-    finally:
-        for name, old_backend in old_backends.items():
-            GenericModule.current_backend[name] = old_backend
+            yield api
 
 
 def register_backend(alias, new_backends):
@@ -117,6 +296,76 @@ def register_backend(alias, new_backends):
     assert all(isinstance(key, str) for key in new_backends.keys())
     assert all(isinstance(value, str) for value in new_backends.values())
     _ALIASES[alias] = new_backends.copy()
+    clear_cache()
+
+
+def prewarm(*aliases, background=False):
+    """
+    Import all backend modules of the given aliases ahead of their first use.
+    For example::
+
+        prewarm("pyro", "numpy", background=True)
+
+    :param str aliases: Names of backends registered through
+        :func:`register_backend` .
+    :param bool background: Whether to import in a daemon thread. Import errors
+        are then deferred to the first use of the missing backend.
+    :returns: The started thread if ``background`` is true, else None.
+    :rtype: threading.Thread
+    """
+    backends = []
+    for alias in aliases:
+        for backend in _ALIASES[alias].values():
+            if backend not in backends:
+                backends.append(backend)
+
+    if not background:
+        for backend in backends:
+            _import_backend(backend, 'prewarm')
+        return
+
+    def _prewarm():
+        for backend in backends:
+            try:
+                _import_backend(backend, 'prewarm')
+            except ImportError:
+                pass
+
+    thread = threading.Thread(target=_prewarm, name='pyroapi-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def import_times():
+    """
+    Returns the wall time in seconds spent importing each backend module.
+
+    :rtype: dict
+    """
+    return _IMPORT_TIMES.copy()
+
+
+def import_report(limit=None):
+    """
+    Returns a report of the backend modules imported through the dispatch
+    layer, similar to ``python -X importtime`` , with the wall time of each
+    import, the number of modules it loaded and the first use that
+    triggered it. For example::
+
+        print(import_report())
+
+    :param int limit: Optional maximum number of rows, slowest first.
+    :rtype: str
+    """
+    backends = sorted(_IMPORT_TIMES, key=_IMPORT_TIMES.get, reverse=True)
+    lines = ['{: >10} | {: >7} | {: <32} | {}'.format('time [ms]', 'modules', 'backend', 'first use')]
+    for backend in backends[:limit]:
+        lines.append('{: >10.1f} | {: >7} | {: <32} | {}'.format(
+            1e3 * _IMPORT_TIMES[backend], len(_IMPORT_MODULES.get(backend, ())), backend,
+            _IMPORT_TRIGGERS.get(backend) or ''))
+    lines.append('{: >10.1f} | {: >7} | total'.format(
+        1e3 * sum(_IMPORT_TIMES.values()), sum(len(modules) for modules in _IMPORT_MODULES.values())))
+    return '\n'.join(lines)
 
 
 # These modules can be overridden.
@@ -161,3 +410,11 @@ register_backend('numpy', {
     'optim': 'numpyro.compat.optim',
     'pyro': 'numpyro.compat.pyro',
 })
+register_backend('mock', {
+    'distributions': 'pyroapi.mock.distributions',
+    'handlers': 'pyroapi.mock.handlers',
+    'infer': 'pyroapi.mock.infer',
+    'ops': 'pyroapi.mock.ops',
+    'optim': 'pyroapi.mock.optim',
+    'pyro': 'pyroapi.mock',
+})
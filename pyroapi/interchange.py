@@ -0,0 +1,133 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Conversion of arrays between the tensor types of backends. For example:
+
+.. code-block:: python
+
+    from pyroapi.interchange import to_backend
+
+    f = load_model("logistic_regression")  # torch tensors
+    with pyro_backend("numpy"):
+        args, kwargs = to_backend((f["model_args"], f["model_kwargs"]))  # jax arrays
+
+Arrays are shared through DLPack or the buffer protocol where possible, and
+copied only where the libraries cannot share memory, e.g. across devices or
+for read-only arrays. Gradients are not tracked across backends, so torch
+tensors are detached before conversion.
+"""
+
+import importlib
+
+from pyroapi.dispatch import _ALIASES, GenericModule, _current_backends
+
+# Array library of each ops backend module.
+_ARRAY_LIBRARIES = {
+    'torch': 'torch',
+    'funsor.compat.ops': 'torch',
+    'numpyro.compat.ops': 'jax',
+    'jax.numpy': 'jax',
+    'numpy': 'numpy',
+}
+
+
+def _array_library(value):
+    module = type(value).__module__.split('.')[0]
+    if module == 'jaxlib':
+        return 'jax'
+    if module in ('torch', 'jax', 'numpy'):
+        return module
+    return None
+
+
+def _to_torch(value):
+    import torch
+
+    # Torch tensors are always writable, so read-only arrays such as memmaps
+    # opened with mode "r" are copied rather than shared.
+    flags = getattr(value, 'flags', None)
+    if flags is not None and not flags.writeable:
+        import numpy as np
+
+        return torch.as_tensor(np.array(value))
+    if hasattr(value, '__dlpack__') and hasattr(torch, 'from_dlpack'):
+        try:
+            return torch.from_dlpack(value)
+        except (BufferError, RuntimeError, TypeError):
+            pass
+    import numpy as np
+
+    array = np.asarray(value)
+    if not array.flags.writeable:
+        array = array.copy()
+    return torch.as_tensor(array)
+
+
+def _to_jax(value):
+    import jax.dlpack
+    import jax.numpy as jnp
+
+    if hasattr(value, '__dlpack__'):
+        try:
+            return jax.dlpack.from_dlpack(value)
+        except TypeError:  # older jax only accepts capsules
+            try:
+                return jax.dlpack.from_dlpack(value.__dlpack__())
+            except (BufferError, RuntimeError, TypeError):
+                pass
+        except (BufferError, RuntimeError):
+            pass
+    return jnp.asarray(value)
+
+
+def _to_numpy(value):
+    import numpy as np
+
+    return np.asarray(value)
+
+
+_CONVERTERS = {
+    'torch': _to_torch,
+    'jax': _to_jax,
+    'numpy': _to_numpy,
+}
+
+
+def _convert(value, library, backend):
+    if isinstance(value, dict):
+        return type(value)((key, _convert(item, library, backend)) for key, item in value.items())
+    if isinstance(value, list):
+        return [_convert(item, library, backend) for item in value]
+    if isinstance(value, tuple):
+        items = [_convert(item, library, backend) for item in value]
+        return type(value)(*items) if hasattr(value, '_fields') else tuple(items)
+
+    source = _array_library(value)
+    if source is None or source == library:
+        return value
+    if source == 'torch':
+        value = value.detach()
+    if library is None:
+        return importlib.import_module(backend).tensor(_to_numpy(value))
+    return _CONVERTERS[library](value)
+
+
+def to_backend(value, alias=None):
+    """
+    Converts the arrays in a nested structure of dicts, lists and tuples to
+    the tensor type of a backend. Other values are returned unchanged.
+
+    :param value: An array or a nested structure containing arrays, e.g. the
+        ``model_args`` or ``model_kwargs`` of a model from
+        :func:`~pyroapi.testing.load_model` .
+    :param str alias: Optional backend alias registered through
+        :func:`~pyroapi.dispatch.register_backend` . Defaults to the current
+        backend of :mod:`~pyroapi.dispatch.ops` .
+    :returns: A structure of the same type with converted arrays.
+    """
+    if alias is None:
+        backend = dict(_current_backends())['ops']
+    else:
+        backend = _ALIASES[alias].get('ops', GenericModule.current_backend['ops'])
+    return _convert(value, _ARRAY_LIBRARIES.get(backend), backend)
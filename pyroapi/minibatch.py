@@ -0,0 +1,140 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Backend-agnostic streaming of minibatches from out-of-core data sources.
+For example, to train on memory-mapped arrays:
+
+.. code-block:: python
+
+    import numpy as np
+    from pyroapi.minibatch import Minibatches, subsample_plate
+
+    x = np.load("x.npy", mmap_mode="r")
+    y = np.load("y.npy", mmap_mode="r")
+    batches = Minibatches((x, y), batch_size=1000, shuffle=True)
+
+    def model(x, y):
+        coefs = pyro.sample("coefs", dist.Normal(ops.zeros(x.shape[-1]), 1.))
+        with subsample_plate("data", batches.size, len(y)):
+            pyro.sample("obs", dist.Bernoulli(logits=ops.sum(coefs * x, -1)), obs=y)
+
+    with pyro_backend("numpy"):
+        svi = infer.SVI(model, guide, optim.Adam({"lr": 1e-3}), infer.Trace_ELBO())
+        for epoch in range(10):
+            for x_batch, y_batch in batches:
+                svi.step(x_batch, y_batch)
+"""
+
+import inspect
+import random
+from contextlib import contextmanager
+
+from pyroapi.dispatch import ops, pyro
+
+
+@contextmanager
+def subsample_plate(name, size, subsample_size, dim=None):
+    """
+    A :func:`~pyroapi.dispatch.pyro.plate` over a minibatch of
+    ``subsample_size`` out of ``size`` data points, whose log probabilities
+    are scaled by ``size / subsample_size`` . The data are provided by the
+    caller, so the plate's own subsample indices are ignored.
+
+    Only backends whose plate accepts ``subsample_size`` are supported. Others,
+    such as minipyro whose ELBO ignores scales, raise
+    :class:`NotImplementedError` rather than silently leaving log
+    probabilities unscaled.
+
+    :param str name: Name of the plate.
+    :param int size: Size of the full data set.
+    :param int subsample_size: Size of the minibatch.
+    :param int dim: Optional dimension of the plate.
+    """
+    subsample_size = int(subsample_size)
+    if subsample_size == size:
+        with pyro.plate(name, size, dim=dim) as ind:
+            yield ind
+        return
+    if not _accepts_subsample_size(pyro.plate):
+        raise NotImplementedError('subsample_plate requires a backend whose plate supports subsample_size')
+    with pyro.plate(name, size, subsample_size=subsample_size, dim=dim) as ind:
+        yield ind
+
+
+def _accepts_subsample_size(plate):
+    try:
+        parameters = inspect.signature(plate).parameters
+    except (TypeError, ValueError):
+        return True  # signatures of builtins are unknown, so the plate is tried
+    return 'subsample_size' in parameters or any(
+        param.kind == inspect.Parameter.VAR_KEYWORD for param in parameters.values())
+
+
+class Minibatches(object):
+    """
+    Iterable over minibatches converted to the tensor type of the active
+    backend with :func:`~pyroapi.dispatch.ops.tensor` .
+
+    :param source: Either an array-like supporting ``len()`` and slicing (such
+        as a memory-mapped numpy array), a tuple of such arrays of equal
+        length, or an iterable yielding minibatches (arrays or tuples of
+        arrays). Iterables yield each minibatch as is, and require ``size`` .
+    :param int batch_size: Minibatch size for array sources.
+    :param int size: Total number of data points. Defaults to the length of
+        array sources.
+    :param bool shuffle: Whether to shuffle the order of minibatches of array
+        sources on each pass. Each minibatch is still read contiguously.
+    :param int rng_seed: Optional seed for shuffling.
+    :param bool convert: Whether to convert minibatches with
+        :func:`~pyroapi.dispatch.ops.tensor` . Set to false for sources that
+        already yield backend tensors.
+    """
+    def __init__(self, source, batch_size=None, size=None, shuffle=False, rng_seed=None, convert=True):
+        self.source = source
+        self.convert = convert
+        self._is_array = isinstance(source, tuple) or hasattr(source, '__getitem__') and hasattr(source, '__len__')
+        if self._is_array:
+            arrays = source if isinstance(source, tuple) else (source,)
+            lengths = set(len(array) for array in arrays)
+            if len(lengths) != 1:
+                raise ValueError('Expected arrays of equal length, but got lengths {}'.format(sorted(lengths)))
+            if size is None:
+                size = lengths.pop()
+            if batch_size is None:
+                raise ValueError('batch_size is required for array sources')
+        elif size is None:
+            raise ValueError('size is required for iterable sources')
+        self.size = size
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self._rng = random.Random(rng_seed)
+
+    def __len__(self):
+        if not self._is_array:
+            raise TypeError('The number of minibatches of an iterable source is unknown')
+        return (self.size + self.batch_size - 1) // self.batch_size
+
+    def _convert(self, batch):
+        if not self.convert:
+            return batch
+        if isinstance(batch, tuple):
+            return tuple(ops.tensor(value) for value in batch)
+        return ops.tensor(batch)
+
+    def __iter__(self):
+        if not self._is_array:
+            for batch in self.source:
+                yield self._convert(batch)
+            return
+
+        starts = list(range(0, self.size, self.batch_size))
+        if self.shuffle:
+            self._rng.shuffle(starts)
+        for start in starts:
+            stop = min(start + self.batch_size, self.size)
+            if isinstance(self.source, tuple):
+                batch = tuple(array[start:stop] for array in self.source)
+            else:
+                batch = self.source[start:stop]
+            yield self._convert(batch)
@@ -0,0 +1,157 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+A backend whose tensors only have shapes, registered as the ``"mock"``
+backend. Running a model under it checks broadcasting and plate structure,
+without heavy imports or tensor maths:
+
+.. code-block:: python
+
+    with pyro_backend("mock"):
+        trace = handlers.trace(model).get_trace(*model_args, **model_kwargs)
+
+Sample values are :class:`~pyroapi.mock.ops.ShapeTensor` s, so models whose
+control flow depends on sampled values cannot run under this backend.
+"""
+
+from pyroapi.mock import constraints
+from pyroapi.mock.ops import ShapeTensor, broadcast_shapes, shape_of
+from pyroapi.mock.runtime import MOCK_STACK, PARAM_STORE, CondIndepStackFrame, Messenger, apply_stack
+
+
+def sample(name, fn, *args, obs=None, infer=None, sample_shape=(), **kwargs):
+    """
+    Samples a :class:`~pyroapi.mock.ops.ShapeTensor` of the shape of a sample
+    of ``fn`` , or returns ``obs`` if given.
+    """
+    if not MOCK_STACK:
+        return obs if obs is not None else fn(sample_shape=sample_shape)
+    msg = {
+        'type': 'sample',
+        'name': name,
+        'fn': fn,
+        'args': args,
+        'kwargs': dict(kwargs, sample_shape=sample_shape),
+        'value': obs,
+        'is_observed': obs is not None,
+        'infer': infer or {},
+        'cond_indep_stack': [],
+        'scale': 1.,
+    }
+    return apply_stack(msg)['value']
+
+
+def param(name, init_value=None, constraint=constraints.real, event_dim=None):
+    """
+    Returns the param ``name`` from the param store, initializing it with
+    ``init_value`` if needed.
+    """
+    def fn(init_value, constraint=None):
+        if name not in PARAM_STORE:
+            if init_value is None:
+                raise KeyError('Param {} has not been initialized'.format(name))
+            if callable(init_value):
+                init_value = init_value()
+            PARAM_STORE[name] = ShapeTensor(shape_of(init_value))
+        return PARAM_STORE[name]
+
+    if not MOCK_STACK:
+        return fn(init_value)
+    msg = {
+        'type': 'param',
+        'name': name,
+        'fn': fn,
+        'args': (init_value,),
+        'kwargs': {'constraint': constraint},
+        'value': None,
+    }
+    return apply_stack(msg)['value']
+
+
+def deterministic(name, value, event_dim=None):
+    """
+    Records ``value`` at a deterministic site and returns it.
+    """
+    from pyroapi.mock.distributions import Delta
+
+    event_dim = len(shape_of(value)) if event_dim is None else event_dim
+    return sample(name, Delta(value, event_dim=event_dim), obs=value)
+
+
+def factor(name, log_factor):
+    """
+    Adds ``log_factor`` to the log density of the model.
+    """
+    from pyroapi.mock.distributions import Delta
+
+    value = ShapeTensor(shape_of(log_factor))
+    sample(name, Delta(value), obs=value)
+
+
+def get_param_store():
+    """
+    Returns the param store, a dict mapping names to
+    :class:`~pyroapi.mock.ops.ShapeTensor` s.
+    """
+    return PARAM_STORE
+
+
+def clear_param_store():
+    PARAM_STORE.clear()
+
+
+class plate(Messenger):
+    """
+    Marks conditionally independent sites, expanding the batch shape of their
+    distributions along ``dim`` . Like Pyro, ``dim`` defaults to the rightmost
+    dim not used by an enclosing plate.
+    """
+    def __init__(self, name, size=None, subsample_size=None, subsample=None, dim=None):
+        assert dim is None or dim < 0, 'dim must be negative'
+        if size is None:
+            assert subsample_size is not None or subsample is not None
+            size = subsample_size if subsample is None else shape_of(subsample)[0]
+        self.name = name
+        self.size = size
+        self.subsample_size = size if subsample_size is None else subsample_size
+        self.dim = dim
+        super().__init__()
+
+    def __enter__(self):
+        if self.dim is None:
+            used = {handler.dim for handler in MOCK_STACK if isinstance(handler, plate)}
+            self.dim = -1
+            while self.dim in used:
+                self.dim -= 1
+        elif any(isinstance(handler, plate) and handler.dim == self.dim for handler in MOCK_STACK):
+            raise ValueError('Plate {} reuses dim {} of an enclosing plate'.format(self.name, self.dim))
+        super().__enter__()
+        return ShapeTensor((self.subsample_size,), 'int64')
+
+    def __iter__(self):
+        for i in range(self.subsample_size):
+            yield i
+
+    def process_message(self, msg):
+        if msg['type'] != 'sample':
+            return
+        frame = CondIndepStackFrame(self.name, self.dim, self.subsample_size)
+        msg['cond_indep_stack'].insert(0, frame)
+        fn = msg['fn']
+        batch_shape = [1] * -self.dim
+        batch_shape[self.dim] = self.subsample_size
+        msg['fn'] = fn.expand(broadcast_shapes(fn.batch_shape, batch_shape))
+        if self.subsample_size != self.size:
+            msg['scale'] = msg.get('scale', 1.) * self.size / self.subsample_size
+
+
+__all__ = [
+    'clear_param_store',
+    'deterministic',
+    'factor',
+    'get_param_store',
+    'param',
+    'plate',
+    'sample',
+]
@@ -0,0 +1,83 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Constraints of the mock backend. Class names follow
+:mod:`torch.distributions.constraints` .
+"""
+
+
+class Constraint(object):
+    event_dim = 0
+    is_discrete = False
+
+    def check(self, value):
+        raise NotImplementedError('The mock backend cannot check values')
+
+    def __repr__(self):
+        return type(self).__name__[1:] + '()'
+
+
+class _Real(Constraint):
+    pass
+
+
+class _Boolean(Constraint):
+    is_discrete = True
+
+
+class _IntegerInterval(Constraint):
+    is_discrete = True
+
+    def __init__(self, lower_bound, upper_bound):
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+
+
+class _IntegerGreaterThan(Constraint):
+    is_discrete = True
+
+    def __init__(self, lower_bound):
+        self.lower_bound = lower_bound
+
+
+class _GreaterThan(Constraint):
+    def __init__(self, lower_bound):
+        self.lower_bound = lower_bound
+
+
+class _Interval(Constraint):
+    def __init__(self, lower_bound, upper_bound):
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+
+
+class _RealVector(Constraint):
+    event_dim = 1
+
+
+class _Simplex(Constraint):
+    event_dim = 1
+
+
+class _PositiveDefinite(Constraint):
+    event_dim = 2
+
+
+class _LowerCholesky(Constraint):
+    event_dim = 2
+
+
+real = _Real()
+boolean = _Boolean()
+nonnegative_integer = _IntegerGreaterThan(0)
+positive_integer = _IntegerGreaterThan(1)
+positive = _GreaterThan(0.)
+unit_interval = _Interval(0., 1.)
+real_vector = _RealVector()
+simplex = _Simplex()
+positive_definite = _PositiveDefinite()
+lower_cholesky = _LowerCholesky()
+greater_than = _GreaterThan
+interval = _Interval
+integer_interval = _IntegerInterval
@@ -0,0 +1,313 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Distributions of the mock backend. Distributions compute batch and event
+shapes from the shapes of their parameters, and sample
+:class:`~pyroapi.mock.ops.ShapeTensor` s.
+"""
+
+from pyroapi.mock import constraints, transforms
+from pyroapi.mock.ops import FLOAT, INT, ShapeTensor, broadcast_shapes, shape_of
+
+
+class Distribution(object):
+    """
+    Base class of mock distributions.
+
+    :param tuple batch_shape: The batch shape.
+    :param tuple event_shape: The event shape.
+    """
+    arg_constraints = {}
+    support = constraints.real
+    has_enumerate_support = False
+    has_rsample = True
+    dtype = FLOAT
+
+    def __init__(self, batch_shape=(), event_shape=(), validate_args=None):
+        self.batch_shape = tuple(batch_shape)
+        self.event_shape = tuple(event_shape)
+
+    def __repr__(self):
+        return '{}(batch_shape={}, event_shape={})'.format(type(self).__name__, self.batch_shape, self.event_shape)
+
+    def shape(self, sample_shape=()):
+        return tuple(sample_shape) + self.batch_shape + self.event_shape
+
+    def sample(self, sample_shape=(), key=None):
+        return ShapeTensor(self.shape(sample_shape), self.dtype)
+
+    def rsample(self, sample_shape=()):
+        return self.sample(sample_shape)
+
+    def __call__(self, *args, **kwargs):
+        return self.sample(kwargs.get('sample_shape', ()))
+
+    def log_prob(self, value):
+        event_dim = len(self.event_shape)
+        value_shape = shape_of(value)
+        shape = broadcast_shapes(value_shape[:len(value_shape) - event_dim], self.batch_shape)
+        return ShapeTensor(shape)
+
+    def expand(self, batch_shape):
+        batch_shape = tuple(batch_shape)
+        if batch_shape == self.batch_shape:
+            return self
+        return ExpandedDistribution(self, batch_shape)
+
+    def expand_by(self, sample_shape):
+        return self.expand(tuple(sample_shape) + self.batch_shape)
+
+    def to_event(self, reinterpreted_batch_ndims=None):
+        if reinterpreted_batch_ndims is None:
+            reinterpreted_batch_ndims = len(self.batch_shape)
+        if reinterpreted_batch_ndims == 0:
+            return self
+        return Independent(self, reinterpreted_batch_ndims)
+
+    def mask(self, mask):
+        return MaskedDistribution(self, mask)
+
+    def enumerate_support(self, expand=True):
+        raise NotImplementedError('{} has no enumerable support'.format(type(self).__name__))
+
+    @property
+    def mean(self):
+        return ShapeTensor(self.batch_shape + self.event_shape)
+
+    variance = stddev = mean
+
+
+def _batch_shape(*params):
+    return broadcast_shapes(*[shape_of(param) for param in params if param is not None])
+
+
+class Normal(Distribution):
+    support = constraints.real
+
+    def __init__(self, loc=0., scale=1., validate_args=None):
+        self.loc, self.scale = loc, scale
+        super().__init__(_batch_shape(loc, scale))
+
+
+class Cauchy(Normal):
+    pass
+
+
+class LogNormal(Normal):
+    support = constraints.positive
+
+
+class HalfNormal(Distribution):
+    support = constraints.positive
+
+    def __init__(self, scale=1., validate_args=None):
+        self.scale = scale
+        super().__init__(_batch_shape(scale))
+
+
+class HalfCauchy(HalfNormal):
+    pass
+
+
+class Exponential(Distribution):
+    support = constraints.positive
+
+    def __init__(self, rate=1., validate_args=None):
+        self.rate = rate
+        super().__init__(_batch_shape(rate))
+
+
+class Gamma(Distribution):
+    support = constraints.positive
+
+    def __init__(self, concentration, rate=1., validate_args=None):
+        self.concentration, self.rate = concentration, rate
+        super().__init__(_batch_shape(concentration, rate))
+
+
+class Beta(Distribution):
+    support = constraints.unit_interval
+
+    def __init__(self, concentration1, concentration0, validate_args=None):
+        self.concentration1, self.concentration0 = concentration1, concentration0
+        super().__init__(_batch_shape(concentration1, concentration0))
+
+
+class Uniform(Distribution):
+    def __init__(self, low=0., high=1., validate_args=None):
+        self.low, self.high = low, high
+        self.support = constraints.interval(low, high)
+        super().__init__(_batch_shape(low, high))
+
+
+class Delta(Distribution):
+    has_rsample = True
+
+    def __init__(self, v=0., log_density=0., event_dim=0, validate_args=None):
+        self.v = v
+        shape = shape_of(v)
+        super().__init__(shape[:len(shape) - event_dim], shape[len(shape) - event_dim:])
+
+
+class _Discrete(Distribution):
+    has_rsample = False
+    dtype = INT
+
+
+class Bernoulli(_Discrete):
+    support = constraints.boolean
+    has_enumerate_support = True
+    dtype = FLOAT
+
+    def __init__(self, probs=None, logits=None, validate_args=None):
+        assert (probs is None) != (logits is None), 'Either probs or logits must be specified'
+        self.probs, self.logits = probs, logits
+        super().__init__(_batch_shape(probs, logits))
+
+    def enumerate_support(self, expand=True):
+        shape = (2,) + (self.batch_shape if expand else (1,) * len(self.batch_shape))
+        return ShapeTensor(shape, self.dtype)
+
+
+class Categorical(_Discrete):
+    has_enumerate_support = True
+
+    def __init__(self, probs=None, logits=None, validate_args=None):
+        assert (probs is None) != (logits is None), 'Either probs or logits must be specified'
+        self.probs, self.logits = probs, logits
+        shape = _batch_shape(probs, logits)
+        self.num_categories = shape[-1]
+        self.support = constraints.integer_interval(0, self.num_categories - 1)
+        super().__init__(shape[:-1])
+
+    def enumerate_support(self, expand=True):
+        shape = (self.num_categories,) + (self.batch_shape if expand else (1,) * len(self.batch_shape))
+        return ShapeTensor(shape, self.dtype)
+
+
+class Poisson(_Discrete):
+    support = constraints.nonnegative_integer
+
+    def __init__(self, rate, validate_args=None):
+        self.rate = rate
+        super().__init__(_batch_shape(rate))
+
+
+class Binomial(_Discrete):
+    def __init__(self, total_count=1, probs=None, logits=None, validate_args=None):
+        assert (probs is None) != (logits is None), 'Either probs or logits must be specified'
+        self.total_count, self.probs, self.logits = total_count, probs, logits
+        self.support = constraints.integer_interval(0, total_count)
+        super().__init__(_batch_shape(total_count, probs, logits))
+
+
+class Dirichlet(Distribution):
+    support = constraints.simplex
+
+    def __init__(self, concentration, validate_args=None):
+        self.concentration = concentration
+        shape = shape_of(concentration)
+        super().__init__(shape[:-1], shape[-1:])
+
+
+class MultivariateNormal(Distribution):
+    support = constraints.real_vector
+
+    def __init__(self, loc=0., covariance_matrix=None, precision_matrix=None, scale_tril=None,
+                 validate_args=None):
+        matrix = [m for m in (covariance_matrix, precision_matrix, scale_tril) if m is not None]
+        assert len(matrix) == 1, 'Exactly one of covariance_matrix, precision_matrix or scale_tril must be specified'
+        self.loc = loc
+        matrix_shape = shape_of(matrix[0])
+        loc_shape = shape_of(loc) or matrix_shape[-1:]
+        event_shape = broadcast_shapes(loc_shape[-1:], matrix_shape[-1:])
+        super().__init__(broadcast_shapes(loc_shape[:-1], matrix_shape[:-2]), event_shape)
+
+
+class ExpandedDistribution(Distribution):
+    def __init__(self, base_dist, batch_shape):
+        broadcast = broadcast_shapes(base_dist.batch_shape, batch_shape)
+        if broadcast != tuple(batch_shape):
+            raise ValueError('Cannot expand batch shape {} to {}'.format(base_dist.batch_shape, batch_shape))
+        self.base_dist = base_dist
+        self.support = base_dist.support
+        self.has_enumerate_support = base_dist.has_enumerate_support
+        self.dtype = base_dist.dtype
+        super().__init__(batch_shape, base_dist.event_shape)
+
+    def enumerate_support(self, expand=True):
+        support = self.base_dist.enumerate_support(expand=False)
+        if expand:
+            return ShapeTensor(support.shape[:1] + self.batch_shape, support.dtype)
+        return ShapeTensor(support.shape[:1] + (1,) * len(self.batch_shape), support.dtype)
+
+
+class Independent(Distribution):
+    def __init__(self, base_dist, reinterpreted_batch_ndims, validate_args=None):
+        if reinterpreted_batch_ndims > len(base_dist.batch_shape):
+            raise ValueError('Cannot reinterpret {} batch dims of batch shape {}'
+                             .format(reinterpreted_batch_ndims, base_dist.batch_shape))
+        self.base_dist = base_dist
+        self.reinterpreted_batch_ndims = reinterpreted_batch_ndims
+        self.support = base_dist.support
+        self.dtype = base_dist.dtype
+        shape = base_dist.batch_shape + base_dist.event_shape
+        event_dim = reinterpreted_batch_ndims + len(base_dist.event_shape)
+        super().__init__(shape[:len(shape) - event_dim], shape[len(shape) - event_dim:])
+
+
+class MaskedDistribution(Distribution):
+    def __init__(self, base_dist, mask):
+        self.base_dist = base_dist
+        self.support = base_dist.support
+        self.has_enumerate_support = base_dist.has_enumerate_support
+        self.dtype = base_dist.dtype
+        batch_shape = base_dist.batch_shape
+        if not isinstance(mask, bool):
+            batch_shape = broadcast_shapes(batch_shape, shape_of(mask))
+        super().__init__(batch_shape, base_dist.event_shape)
+
+    def enumerate_support(self, expand=True):
+        return self.base_dist.enumerate_support(expand)
+
+
+class TransformedDistribution(Distribution):
+    def __init__(self, base_distribution, transforms, validate_args=None):
+        if not isinstance(transforms, (list, tuple)):
+            transforms = [transforms]
+        self.base_dist = base_distribution
+        self.transforms = list(transforms)
+        shape = base_distribution.batch_shape + base_distribution.event_shape
+        event_dim = len(base_distribution.event_shape)
+        for transform in self.transforms:
+            shape = transform.forward_shape(shape)
+            event_dim = max(event_dim, transform.event_dim)
+        super().__init__(shape[:len(shape) - event_dim], shape[len(shape) - event_dim:])
+
+
+__all__ = [
+    'Bernoulli',
+    'Beta',
+    'Binomial',
+    'Categorical',
+    'Cauchy',
+    'Delta',
+    'Dirichlet',
+    'Distribution',
+    'ExpandedDistribution',
+    'Exponential',
+    'Gamma',
+    'HalfCauchy',
+    'HalfNormal',
+    'Independent',
+    'LogNormal',
+    'MaskedDistribution',
+    'MultivariateNormal',
+    'Normal',
+    'Poisson',
+    'TransformedDistribution',
+    'Uniform',
+    'constraints',
+    'transforms',
+]
@@ -0,0 +1,116 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Effect handlers of the mock backend.
+"""
+
+from collections import OrderedDict
+
+from pyroapi.mock.runtime import Messenger
+
+
+class trace(Messenger):
+    """
+    Records the messages of sample and param sites.
+    """
+    def __enter__(self):
+        super().__enter__()
+        self.trace = OrderedDict()
+        return self.trace
+
+    def postprocess_message(self, msg):
+        assert msg['type'] != 'sample' or msg['name'] not in self.trace, \
+            'Multiple sample sites named {}'.format(msg['name'])
+        self.trace[msg['name']] = msg.copy()
+
+    def get_trace(self, *args, **kwargs):
+        self(*args, **kwargs)
+        return self.trace
+
+
+class seed(Messenger):
+    """
+    Accepts a random seed for compatibility. Mock samples have no values, so
+    the seed has no effect.
+    """
+    def __init__(self, fn=None, rng_seed=None):
+        self.rng_seed = rng_seed
+        super().__init__(fn)
+
+
+class replay(Messenger):
+    """
+    Reuses the values of sites recorded in ``guide_trace`` .
+    """
+    def __init__(self, fn=None, guide_trace=None):
+        assert guide_trace is not None
+        self.guide_trace = guide_trace
+        super().__init__(fn)
+
+    def process_message(self, msg):
+        if msg['name'] in self.guide_trace:
+            msg['value'] = self.guide_trace[msg['name']]['value']
+
+
+class block(Messenger):
+    """
+    Hides sites for which ``hide_fn`` returns true from outer handlers.
+    """
+    def __init__(self, fn=None, hide_fn=lambda msg: True):
+        self.hide_fn = hide_fn
+        super().__init__(fn)
+
+    def process_message(self, msg):
+        if self.hide_fn(msg):
+            msg['stop'] = True
+
+
+class condition(Messenger):
+    """
+    Observes sample sites at the values in ``data`` .
+    """
+    def __init__(self, fn=None, data=None):
+        self.data = data or {}
+        super().__init__(fn)
+
+    def process_message(self, msg):
+        if msg['type'] == 'sample' and msg['name'] in self.data:
+            msg['value'] = self.data[msg['name']]
+            msg['is_observed'] = True
+
+
+class substitute(Messenger):
+    """
+    Sets the values of sites in ``data`` without observing them.
+    """
+    def __init__(self, fn=None, data=None):
+        self.data = data or {}
+        super().__init__(fn)
+
+    def process_message(self, msg):
+        if msg['name'] in self.data:
+            msg['value'] = self.data[msg['name']]
+
+
+class scale(Messenger):
+    """
+    Scales the log densities of sample sites by ``scale`` .
+    """
+    def __init__(self, fn=None, scale=1.):
+        self.scale = scale
+        super().__init__(fn)
+
+    def process_message(self, msg):
+        msg['scale'] = self.scale * msg.get('scale', 1.)
+
+
+__all__ = [
+    'block',
+    'condition',
+    'replay',
+    'scale',
+    'seed',
+    'substitute',
+    'trace',
+]
@@ -0,0 +1,7 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+The mock backend has no values to infer from, so it provides no inference
+algorithms.
+"""
@@ -0,0 +1,451 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Shape-only tensors and tensor operations of the mock backend. Operations
+check broadcasting and compute result shapes, but no values.
+"""
+
+import math
+
+FLOAT, INT, BOOL = 'float32', 'int64', 'bool'
+
+
+def broadcast_shapes(*shapes):
+    """
+    Returns the broadcast of shapes, following numpy's rules.
+
+    :raises ValueError: if the shapes cannot be broadcast.
+    """
+    result = []
+    for shape in shapes:
+        shape = tuple(shape)
+        if len(shape) > len(result):
+            result = [1] * (len(shape) - len(result)) + result
+        for i, size in enumerate(shape, len(result) - len(shape)):
+            if result[i] == 1:
+                result[i] = size
+            elif size != 1 and size != result[i]:
+                raise ValueError('Shapes {} cannot be broadcast together'.format(shapes))
+    return tuple(result)
+
+
+def shape_of(value):
+    """
+    Returns the shape of a tensor, array, nested list or scalar.
+    """
+    shape = getattr(value, 'shape', None)
+    if shape is not None:
+        return tuple(shape)
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return (0,)
+        return (len(value),) + shape_of(value[0])
+    return ()
+
+
+def dtype_of(value):
+    dtype = getattr(value, 'dtype', None)
+    if dtype is not None:
+        return str(dtype).replace('torch.', '')
+    while isinstance(value, (list, tuple)) and value:
+        value = value[0]
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, int):
+        return INT
+    return FLOAT
+
+
+def _size(args):
+    if len(args) == 1 and isinstance(args[0], (tuple, list)):
+        args = args[0]
+    return tuple(int(size) for size in args)
+
+
+def _dim(dim, axis):
+    return axis if dim is None else dim
+
+
+def _normalize_dim(dim, ndim):
+    if not -ndim <= dim < max(ndim, 1):
+        raise IndexError('Dimension {} out of range for {} dims'.format(dim, ndim))
+    return dim % ndim if ndim else 0
+
+
+class ShapeTensor(object):
+    """
+    A tensor that only has a shape and a dtype.
+    """
+    __slots__ = ('shape', 'dtype')
+    __array_priority__ = 1000
+
+    def __init__(self, shape=(), dtype=FLOAT):
+        self.shape = tuple(int(size) for size in shape)
+        self.dtype = dtype
+
+    def __repr__(self):
+        return 'ShapeTensor(shape={}, dtype={})'.format(self.shape, self.dtype)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def dim(self):
+        return len(self.shape)
+
+    def numel(self):
+        return _prod(self.shape)
+
+    def size(self, dim=None):
+        return self.shape if dim is None else self.shape[dim]
+
+    def __len__(self):
+        if not self.shape:
+            raise TypeError('len() of a 0-d tensor')
+        return self.shape[0]
+
+    def __bool__(self):
+        raise TypeError('ShapeTensor has no values; the mock backend cannot trace value-dependent control flow')
+
+    def __float__(self):
+        raise TypeError('ShapeTensor has no values')
+
+    def item(self):
+        raise TypeError('ShapeTensor has no values')
+
+    __hash__ = object.__hash__
+
+    # Elementwise operations.
+    def _binary(self, other, dtype=None):
+        if dtype is None:
+            dtype = self.dtype if dtype_of(other) == self.dtype else FLOAT
+        return ShapeTensor(broadcast_shapes(self.shape, shape_of(other)), dtype)
+
+    def _unary(self, dtype=None):
+        return ShapeTensor(self.shape, dtype or self.dtype)
+
+    def __add__(self, other):
+        return self._binary(other)
+
+    __radd__ = __sub__ = __rsub__ = __mul__ = __rmul__ = __mod__ = __rmod__ = __add__
+
+    def __truediv__(self, other):
+        return self._binary(other, FLOAT)
+
+    __rtruediv__ = __pow__ = __rpow__ = __truediv__
+
+    def __floordiv__(self, other):
+        return self._binary(other)
+
+    __rfloordiv__ = __floordiv__
+
+    def __lt__(self, other):
+        return self._binary(other, BOOL)
+
+    __le__ = __gt__ = __ge__ = __eq__ = __ne__ = __and__ = __rand__ = __or__ = __ror__ = __xor__ = __lt__
+
+    def __neg__(self):
+        return self._unary()
+
+    __pos__ = __abs__ = __neg__
+
+    def __invert__(self):
+        return self._unary(BOOL)
+
+    def __matmul__(self, other):
+        return matmul(self, other)
+
+    def __rmatmul__(self, other):
+        return matmul(other, self)
+
+    def exp(self):
+        return self._unary(FLOAT)
+
+    log = log1p = expm1 = sqrt = sigmoid = tanh = sin = cos = exp
+
+    def abs(self):
+        return self._unary()
+
+    def float(self):
+        return self._unary(FLOAT)
+
+    def long(self):
+        return self._unary(INT)
+
+    def bool(self):
+        return self._unary(BOOL)
+
+    def detach(self):
+        return self
+
+    clone = contiguous = detach
+
+    def to(self, *args, **kwargs):
+        return self
+
+    def all(self, *args, **kwargs):
+        return _reduce(self, kwargs.get('dim', kwargs.get('axis')), kwargs.get('keepdim', kwargs.get('keepdims')),
+                       BOOL)
+
+    any = all
+
+    def sum(self, dim=None, keepdim=False, axis=None, keepdims=False):
+        return _reduce(self, _dim(dim, axis), keepdim or keepdims)
+
+    mean = prod = max = min = sum
+
+    # Shape operations.
+    def reshape(self, *shape):
+        shape = list(_size(shape))
+        if -1 in shape:
+            known = _prod(size for size in shape if size != -1)
+            shape[shape.index(-1)] = self.numel() // known if known else 0
+        if _prod(shape) != self.numel():
+            raise ValueError('Cannot reshape {} to {}'.format(self.shape, tuple(shape)))
+        return ShapeTensor(shape, self.dtype)
+
+    view = reshape
+
+    def expand(self, *shape):
+        shape = _size(shape)
+        shape = tuple(old if new == -1 else new
+                      for new, old in zip(shape, (1,) * (len(shape) - self.ndim) + self.shape))
+        return ShapeTensor(broadcast_shapes(self.shape, shape), self.dtype)
+
+    def unsqueeze(self, dim):
+        dim = _normalize_dim(dim, self.ndim + 1)
+        return ShapeTensor(self.shape[:dim] + (1,) + self.shape[dim:], self.dtype)
+
+    def squeeze(self, dim=None):
+        if dim is None:
+            return ShapeTensor([size for size in self.shape if size != 1], self.dtype)
+        dim = _normalize_dim(dim, self.ndim)
+        if self.shape[dim] != 1:
+            return self
+        return ShapeTensor(self.shape[:dim] + self.shape[dim + 1:], self.dtype)
+
+    def transpose(self, dim0=-2, dim1=-1):
+        shape = list(self.shape)
+        dim0, dim1 = _normalize_dim(dim0, self.ndim), _normalize_dim(dim1, self.ndim)
+        shape[dim0], shape[dim1] = shape[dim1], shape[dim0]
+        return ShapeTensor(shape, self.dtype)
+
+    @property
+    def T(self):
+        return ShapeTensor(self.shape[::-1], self.dtype)
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+        num_indexed = _builtin_sum(1 for i in index if i is not None and i is not Ellipsis)
+        ellipsis = [pos for pos, i in enumerate(index) if i is Ellipsis]
+        if ellipsis:
+            pos = ellipsis[0]
+            index = index[:pos] + (slice(None),) * (self.ndim - num_indexed) + index[pos + 1:]
+        else:
+            index = index + (slice(None),) * (self.ndim - num_indexed)
+        shape = []
+        advanced = []
+        advanced_pos = None
+        dim = 0
+        for i in index:
+            if i is None:
+                shape.append(1)
+                continue
+            if dim >= self.ndim:
+                raise IndexError('Too many indices for a tensor of shape {}'.format(self.shape))
+            size = self.shape[dim]
+            dim += 1
+            if isinstance(i, slice):
+                shape.append(len(range(*i.indices(size))))
+            elif isinstance(i, int):
+                if not -size <= i < size:
+                    raise IndexError('Index {} out of range for size {}'.format(i, size))
+            else:
+                if dtype_of(i) == BOOL:
+                    raise NotImplementedError('The mock backend does not support boolean masks')
+                if advanced_pos is None:
+                    advanced_pos = len(shape)
+                advanced.append(shape_of(i))
+        if advanced:
+            shape[advanced_pos:advanced_pos] = broadcast_shapes(*advanced)
+        return ShapeTensor(shape, self.dtype)
+
+
+def _prod(sizes):
+    result = 1
+    for size in sizes:
+        result *= size
+    return result
+
+
+def _reduce(x, dim=None, keepdim=False, dtype=None):
+    x = tensor(x)
+    dtype = dtype or x.dtype
+    if dim is None:
+        return ShapeTensor((1,) * x.ndim if keepdim else (), dtype)
+    dims = dim if isinstance(dim, (tuple, list)) else (dim,)
+    dims = set(_normalize_dim(d, x.ndim) for d in dims)
+    shape = [1 if i in dims else size for i, size in enumerate(x.shape) if keepdim or i not in dims]
+    return ShapeTensor(shape, dtype)
+
+
+# Tensor creation.
+def tensor(data, dtype=None, **kwargs):
+    if isinstance(data, ShapeTensor) and dtype is None:
+        return data
+    return ShapeTensor(shape_of(data), str(dtype) if dtype is not None else dtype_of(data))
+
+
+as_tensor = asarray = array = tensor
+
+
+def zeros(*shape, dtype=FLOAT, **kwargs):
+    return ShapeTensor(_size(shape), dtype)
+
+
+ones = empty = randn = rand = zeros
+
+
+def full(shape, fill_value, dtype=FLOAT, **kwargs):
+    return ShapeTensor(_size((shape,)), dtype)
+
+
+def zeros_like(x, dtype=None, **kwargs):
+    x = tensor(x)
+    return ShapeTensor(x.shape, dtype or x.dtype)
+
+
+ones_like = empty_like = randn_like = zeros_like
+
+
+def full_like(x, fill_value, dtype=None, **kwargs):
+    return zeros_like(x, dtype)
+
+
+def arange(start, end=None, step=1, dtype=None, **kwargs):
+    if end is None:
+        start, end = 0, start
+    if dtype is None:
+        dtype = INT if all(isinstance(x, int) for x in (start, end, step)) else FLOAT
+    return ShapeTensor((max(0, math.ceil((end - start) / step)),), dtype)
+
+
+def eye(n, m=None, dtype=FLOAT, **kwargs):
+    return ShapeTensor((n, n if m is None else m), dtype)
+
+
+# Elementwise and reduction operations.
+def _unary(name):
+    def op(x, *args, **kwargs):
+        return getattr(tensor(x), name)()
+
+    op.__name__ = name
+    return op
+
+
+exp = _unary('exp')
+log = _unary('log')
+log1p = _unary('log1p')
+expm1 = _unary('expm1')
+sqrt = _unary('sqrt')
+sigmoid = _unary('sigmoid')
+tanh = _unary('tanh')
+sin = _unary('sin')
+cos = _unary('cos')
+abs = _unary('abs')
+
+
+def _binary(name):
+    def op(x, y, *args, **kwargs):
+        return getattr(tensor(x), name)(y)
+
+    op.__name__ = name
+    return op
+
+
+add = _binary('__add__')
+sub = subtract = _binary('__sub__')
+mul = multiply = _binary('__mul__')
+div = divide = true_divide = _binary('__truediv__')
+pow = power = _binary('__pow__')
+maximum = minimum = _binary('__add__')
+
+
+def sum(x, dim=None, keepdim=False, axis=None, keepdims=False):
+    return _reduce(x, _dim(dim, axis), keepdim or keepdims)
+
+
+mean = prod = amax = amin = logsumexp = sum
+
+
+def clamp(x, min=None, max=None):
+    return tensor(x)._unary()
+
+
+clip = clamp
+
+
+def where(condition, x, y):
+    return ShapeTensor(broadcast_shapes(shape_of(condition), shape_of(x), shape_of(y)), dtype_of(x))
+
+
+def matmul(x, y):
+    x_shape, y_shape = shape_of(x), shape_of(y)
+    if len(x_shape) == 1:
+        x_shape = (1,) + x_shape
+    if len(y_shape) == 1:
+        y_shape = y_shape + (1,)
+    if x_shape[-1] != y_shape[-2]:
+        raise ValueError('Cannot multiply matrices of shapes {} and {}'.format(shape_of(x), shape_of(y)))
+    shape = broadcast_shapes(x_shape[:-2], y_shape[:-2]) + (x_shape[-2], y_shape[-1])
+    if len(shape_of(y)) == 1:
+        shape = shape[:-1]
+    if len(shape_of(x)) == 1:
+        shape = shape[:-2] + shape[-1:]
+    return ShapeTensor(shape, FLOAT)
+
+
+def allclose(x, y, *args, **kwargs):
+    broadcast_shapes(shape_of(x), shape_of(y))
+    return True
+
+
+# Joining and reshaping.
+def stack(tensors, dim=None, axis=None):
+    tensors = [tensor(x) for x in tensors]
+    shape = broadcast_shapes(*[x.shape for x in tensors])
+    if any(x.shape != shape for x in tensors):
+        raise ValueError('Cannot stack tensors of shapes {}'.format([x.shape for x in tensors]))
+    dim = _normalize_dim(_dim(dim, axis) or 0, len(shape) + 1)
+    return ShapeTensor(shape[:dim] + (len(tensors),) + shape[dim:], tensors[0].dtype)
+
+
+def cat(tensors, dim=None, axis=None):
+    tensors = [tensor(x) for x in tensors]
+    first = tensors[0]
+    dim = _normalize_dim(_dim(dim, axis) or 0, first.ndim)
+    for x in tensors:
+        if x.ndim != first.ndim or x.shape[:dim] + x.shape[dim + 1:] != first.shape[:dim] + first.shape[dim + 1:]:
+            raise ValueError('Cannot concatenate tensors of shapes {}'.format([x.shape for x in tensors]))
+    size = _builtin_sum(x.shape[dim] for x in tensors)
+    return ShapeTensor(first.shape[:dim] + (size,) + first.shape[dim + 1:], first.dtype)
+
+
+concatenate = cat
+
+
+def reshape(x, *shape):
+    return tensor(x).reshape(*shape)
+
+
+def broadcast_to(x, shape):
+    return tensor(x).expand(shape)
+
+
+def _builtin_sum(values):
+    result = 0
+    for value in values:
+        result += value
+    return result
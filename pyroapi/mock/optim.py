@@ -0,0 +1,6 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+The mock backend has no values to optimize, so it provides no optimizers.
+"""
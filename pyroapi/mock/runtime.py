@@ -0,0 +1,58 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Effect handler stack of the mock backend, following
+:mod:`pyro.contrib.minipyro` .
+"""
+
+from collections import namedtuple
+
+CondIndepStackFrame = namedtuple('CondIndepStackFrame', ['name', 'dim', 'size'])
+
+MOCK_STACK = []
+PARAM_STORE = {}
+
+
+class Messenger(object):
+    """
+    Base class of mock effect handlers, usable as context managers or as
+    wrappers of a function.
+    """
+    def __init__(self, fn=None):
+        self.fn = fn
+
+    def __enter__(self):
+        MOCK_STACK.append(self)
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        assert MOCK_STACK[-1] is self
+        MOCK_STACK.pop()
+
+    def process_message(self, msg):
+        pass
+
+    def postprocess_message(self, msg):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        with self:
+            return self.fn(*args, **kwargs)
+
+
+def apply_stack(msg):
+    """
+    Passes a message through the handler stack, innermost handler first, and
+    computes its value if no handler set one.
+    """
+    pointer = 0
+    for pointer, handler in enumerate(reversed(MOCK_STACK)):
+        handler.process_message(msg)
+        if msg.get('stop'):
+            break
+    if msg['value'] is None:
+        msg['value'] = msg['fn'](*msg['args'], **msg['kwargs'])
+    for handler in MOCK_STACK[len(MOCK_STACK) - pointer - 1:]:
+        handler.postprocess_message(msg)
+    return msg
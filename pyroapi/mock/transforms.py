@@ -0,0 +1,88 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Transforms of the mock backend. Transforms preserve shapes, so they only
+broadcast their parameters against their inputs.
+"""
+
+from pyroapi.mock import constraints
+from pyroapi.mock.ops import ShapeTensor, broadcast_shapes, shape_of
+
+
+class Transform(object):
+    domain = constraints.real
+    codomain = constraints.real
+    event_dim = 0
+
+    def __call__(self, x):
+        return ShapeTensor(shape_of(x))
+
+    @property
+    def inv(self):
+        return _InverseTransform(self)
+
+    def log_abs_det_jacobian(self, x, y):
+        shape = broadcast_shapes(shape_of(x), shape_of(y))
+        return ShapeTensor(shape[:len(shape) - self.event_dim])
+
+    def forward_shape(self, shape):
+        return tuple(shape)
+
+    inverse_shape = forward_shape
+
+
+class _InverseTransform(Transform):
+    def __init__(self, transform):
+        self._inv = transform
+        self.domain = transform.codomain
+        self.codomain = transform.domain
+        self.event_dim = transform.event_dim
+
+    @property
+    def inv(self):
+        return self._inv
+
+
+class AffineTransform(Transform):
+    def __init__(self, loc, scale, event_dim=0):
+        self.loc = loc
+        self.scale = scale
+        self.event_dim = event_dim
+
+    def __call__(self, x):
+        return ShapeTensor(broadcast_shapes(shape_of(x), shape_of(self.loc), shape_of(self.scale)))
+
+    def forward_shape(self, shape):
+        return broadcast_shapes(shape, shape_of(self.loc), shape_of(self.scale))
+
+
+class ExpTransform(Transform):
+    codomain = constraints.positive
+
+
+class SigmoidTransform(Transform):
+    codomain = constraints.unit_interval
+
+
+class ComposeTransform(Transform):
+    def __init__(self, parts):
+        self.parts = list(parts)
+        self.event_dim = max([part.event_dim for part in self.parts] or [0])
+
+    def __call__(self, x):
+        for part in self.parts:
+            x = part(x)
+        return x
+
+    def forward_shape(self, shape):
+        for part in self.parts:
+            shape = part.forward_shape(shape)
+        return shape
+
+
+def biject_to(constraint):
+    """
+    Returns a transform from unconstrained space to ``constraint`` .
+    """
+    return Transform()
@@ -0,0 +1,374 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Data-parallel SVI across a pool of local processes. Observed data are split
+into shards along a plate, each worker computes ELBO gradients on its shard
+under the current backend, and the gradients are summed through shared memory
+before every worker takes the same optimizer step. For example:
+
+.. code-block:: python
+
+    from pyroapi.minibatch import subsample_plate
+    from pyroapi.parallel import DataParallelSVI
+    from pyroapi.params import restore_params
+
+    def model(size, x=None, y=None):
+        coefs = pyro.sample("coefs", dist.Normal(ops.zeros(x.shape[-1]), 1.).to_event(1))
+        with subsample_plate("data", size, len(y)):
+            pyro.sample("obs", dist.Bernoulli(logits=ops.sum(coefs * x, -1)), obs=y)
+
+    with pyro_backend("pyro"):
+        with DataParallelSVI(model, guide, "Adam", {"lr": 1e-2}, data={"x": x, "y": y}, plate="data",
+                             model_args=(len(y),), num_workers=4) as svi:
+            losses = svi.run(1000)
+            restore_params(svi.get_params())
+
+The sites of the sharded plate must be scaled by ``size / shard_size`` , as
+:func:`~pyroapi.minibatch.subsample_plate` does. The weighted sum of the shard
+ELBOs is then the full data ELBO, so training matches a single process up to
+numerical noise. Params are replicated on every worker, so they must not be
+local to the sharded plate. Models and guides must be picklable, e.g. defined
+at module level.
+"""
+
+import multiprocessing
+import secrets
+import traceback
+import warnings
+from collections import OrderedDict, namedtuple
+from multiprocessing.connection import wait
+
+from pyroapi.dispatch import _current_backends, handlers, infer, ops, optim, pyro, pyro_backend
+from pyroapi.interchange import _convert, to_backend
+from pyroapi.params import snapshot_params
+from pyroapi.svi import make_elbo
+
+_Job = namedtuple('_Job', ['model', 'guide', 'optim', 'optim_args', 'loss', 'loss_kwargs', 'model_args',
+                           'model_kwargs', 'rng_seed'])
+
+
+class _AllReduce(object):
+    """
+    Weighted sum of flat float64 arrays across workers, through a shared
+    memory buffer with one row per worker.
+    """
+    def __init__(self, rank, weights, name, barrier):
+        self.rank = rank
+        self.weights = weights
+        self.name = name
+        self.barrier = barrier
+        self._shm = None
+        self._buffer = None
+
+    def _open(self, size):
+        import numpy as np
+        from multiprocessing.shared_memory import SharedMemory
+
+        nbytes = max(1, len(self.weights) * size * 8)
+        if self.rank == 0:
+            self._shm = SharedMemory(self.name, create=True, size=nbytes)
+        self.barrier.wait()
+        if self.rank != 0:
+            self._shm = SharedMemory(self.name)
+        self._buffer = np.ndarray((len(self.weights), size), np.float64, buffer=self._shm.buf)
+
+    def __call__(self, flat):
+        if self._buffer is None:
+            self._open(flat.size)
+        if flat.size != self._buffer.shape[1]:
+            raise ValueError('Expected {} gradient elements, but got {}. Params must be the same on every worker '
+                             'and step'.format(self._buffer.shape[1], flat.size))
+        self._buffer[self.rank] = self.weights[self.rank] * flat
+        self.barrier.wait()
+        total = self._buffer.sum(0)  # summed in the same order on every worker
+        self.barrier.wait()
+        return total
+
+    def close(self):
+        if self._shm is not None:
+            self._buffer = None
+            self._shm.close()
+            if self.rank == 0:
+                self._shm.unlink()
+            self._shm = None
+
+
+def _pyro_stepper(job, shard, reduce):
+    import torch
+
+    # Share the cores between workers rather than oversubscribing them.
+    torch.set_num_threads(max(1, multiprocessing.cpu_count() // len(reduce.weights)))
+    kwargs = dict(to_backend(job.model_kwargs), **to_backend(shard))
+    elbo, _ = make_elbo(job.loss, **job.loss_kwargs)
+    optimizer = getattr(optim, job.optim)(dict(job.optim_args))
+    store = pyro.get_param_store()
+
+    def step():
+        with handlers.trace(param_only=True) as param_capture:
+            loss = elbo.loss_and_grads(job.model, job.guide, *job.model_args, **kwargs)
+        names = {id(param): name for name, param in store.named_parameters()}
+        params = sorted(set(site['value'].unconstrained() for site in param_capture.trace.nodes.values()),
+                        key=lambda param: names[id(param)])
+        grads = [torch.zeros_like(param) if param.grad is None else param.grad for param in params]
+        flat = torch.cat([grad.detach().reshape(-1).double().cpu() for grad in grads] or [torch.zeros(0)])
+        flat = torch.as_tensor(reduce(flat.numpy()))
+        offset = 0
+        for param in params:
+            param.grad = flat[offset:offset + param.numel()].view_as(param).to(param)
+            offset += param.numel()
+        optimizer(params)
+        for param in params:
+            param.grad = None
+        return float(loss)
+
+    return step
+
+
+def _numpyro_stepper(job, shard, reduce):
+    import jax
+    import numpy as np
+    from jax.flatten_util import ravel_pytree
+
+    model_kwargs = to_backend(job.model_kwargs)
+    shard = to_backend(shard)
+    elbo, _ = make_elbo(job.loss, **job.loss_kwargs)
+    svi = infer.SVI(job.model, job.guide, getattr(optim, job.optim)(dict(job.optim_args)), elbo)
+    svi.svi_state = svi.init(jax.random.PRNGKey(job.rng_seed), *job.model_args, **model_kwargs, **shard)
+
+    _, unravel = ravel_pytree(svi.optim.get_params(svi.svi_state.optim_state))
+
+    # Data shards are arguments rather than constants of the compiled function.
+    @jax.jit
+    def value_and_grad(optim_state, rng_key, shard):
+        rng_key, rng_key_step = jax.random.split(rng_key)
+
+        def loss_fn(params):
+            return elbo.loss(rng_key_step, svi.constrain_fn(params), svi.model, svi.guide, *job.model_args,
+                             **model_kwargs, **shard)
+
+        loss, grads = jax.value_and_grad(loss_fn)(svi.optim.get_params(optim_state))
+        return loss, ravel_pytree(grads)[0], rng_key
+
+    @jax.jit
+    def update(optim_state, flat):
+        return svi.optim.update(unravel(flat), optim_state)
+
+    def step():
+        state = svi.svi_state
+        loss, flat, rng_key = value_and_grad(state.optim_state, state.rng_key, shard)
+        flat = reduce(np.asarray(flat, np.float64)).astype(flat.dtype)
+        svi.svi_state = state._replace(optim_state=update(state.optim_state, flat), rng_key=rng_key)
+        return float(loss)
+
+    def sync_params():
+        pyro.get_param_store().update(svi.get_params())
+
+    step.sync_params = sync_params
+    return step
+
+
+_STEPPERS = {
+    'pyro.infer': _pyro_stepper,
+    'numpyro.compat.infer': _numpyro_stepper,
+}
+
+
+def _worker(rank, backends, job, shard, weights, shm_name, barrier, conn):
+    reduce = _AllReduce(rank, weights, shm_name, barrier)
+    try:
+        with pyro_backend(**dict(backends)), handlers.seed(rng_seed=job.rng_seed), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            pyro.get_param_store().clear()
+            step = _STEPPERS[dict(backends)['infer']](job, shard, reduce)
+            conn.send(('ok', None))
+            while True:
+                command, arg = conn.recv()
+                if command == 'run':
+                    conn.send(('ok', [step() for _ in range(arg)]))
+                elif command == 'params':
+                    getattr(step, 'sync_params', lambda: None)()
+                    conn.send(('ok', snapshot_params()))
+                else:
+                    break
+    except BaseException as e:
+        barrier.abort()
+        conn.send(('error', '{}: {}\n{}'.format(type(e).__name__, e, traceback.format_exc())))
+    finally:
+        reduce.close()
+        conn.close()
+
+
+def _check_plate(model, model_args, model_kwargs, plate, size, shard_size):
+    trace = handlers.trace(handlers.seed(model, rng_seed=0)).get_trace(*model_args, **model_kwargs)
+    sites = [site for site in getattr(trace, 'nodes', trace).values()
+             if site['type'] == 'sample' and type(site['fn']).__name__ != '_Subsample'
+             and any(getattr(frame, 'name', None) == plate for frame in site.get('cond_indep_stack') or ())]
+    if not sites:
+        raise ValueError('The model has no sample sites in plate {}'.format(plate))
+    for site in sites:
+        scale = float(1. if site.get('scale') is None else site['scale'])
+        if abs(scale * shard_size / size - 1.) > 1e-6:
+            raise ValueError('Site {} in plate {} is scaled by {}, but shards of {} out of {} data points must be '
+                             'scaled by {}, e.g. with pyroapi.minibatch.subsample_plate'
+                             .format(site['name'], plate, scale, shard_size, size, size / shard_size))
+
+
+class DataParallelSVI(object):
+    """
+    SVI on shards of the observed data across a pool of worker processes,
+    under the backend current at construction. Supports the "pyro" and
+    "numpy" backends.
+
+    :param callable model: A picklable backend-agnostic model.
+    :param callable guide: A picklable backend-agnostic guide.
+    :param str optim: Name of an optimizer in :mod:`~pyroapi.dispatch.optim` ,
+        e.g. "Adam".
+    :param dict optim_args: Arguments to the optimizer.
+    :param dict data: Observed data, a dict mapping model keyword arguments to
+        arrays, which are split into shards along ``shard_dim`` .
+    :param str plate: Name of the plate of the model over the data. Its sites
+        must be scaled by ``size / shard_size`` .
+    :param str loss: Name of the ELBO class, see
+        :func:`~pyroapi.svi.make_elbo` .
+    :param tuple model_args: Positional arguments to the model and guide,
+        which are replicated on all workers.
+    :param dict model_kwargs: Keyword arguments to the model and guide, which
+        are replicated on all workers.
+    :param int num_workers: Number of worker processes. Defaults to the number
+        of CPUs, and is at most the number of data points.
+    :param int shard_dim: Dimension of the data arrays along ``plate`` .
+    :param int rng_seed: Random seed of all workers.
+    :param mp_context: An optional :mod:`multiprocessing` context. Defaults to
+        "spawn", since forking a process that has imported a multithreaded
+        backend such as JAX may deadlock.
+    :param loss_kwargs: Keyword arguments to the ELBO class.
+
+    :ivar list weights: The fraction of the data in each shard.
+    """
+    def __init__(self, model, guide, optim, optim_args, data, plate, loss='Trace_ELBO', model_args=(),
+                 model_kwargs=None, num_workers=None, shard_dim=0, rng_seed=0, mp_context=None, **loss_kwargs):
+        import numpy as np
+
+        backends = _current_backends()
+        if dict(backends)['infer'] not in _STEPPERS:
+            raise NotImplementedError('DataParallelSVI is not implemented for the {} backend'
+                                      .format(dict(backends)['infer']))
+        model_kwargs = model_kwargs or {}
+        data = OrderedDict((name, _convert(value, 'numpy', 'numpy')) for name, value in data.items())
+        sizes = set(value.shape[shard_dim] for value in data.values())
+        if len(sizes) != 1:
+            raise ValueError('Expected data of equal size along dim {}, but got sizes {}'
+                             .format(shard_dim, sorted(sizes)))
+        size = sizes.pop()
+        num_workers = min(num_workers or multiprocessing.cpu_count(), size)
+        bounds = [size * rank // num_workers for rank in range(num_workers + 1)]
+        shards = [OrderedDict((name, np.take(value, np.arange(start, stop), axis=shard_dim))
+                              for name, value in data.items())
+                  for start, stop in zip(bounds[:-1], bounds[1:])]
+        self.weights = [(stop - start) / size for start, stop in zip(bounds[:-1], bounds[1:])]
+        _check_plate(model, model_args, dict(model_kwargs, **to_backend(shards[0])), plate, size,
+                     bounds[1] - bounds[0])
+
+        mp_context = mp_context or multiprocessing.get_context('spawn')
+        job = _Job(model, guide, optim, dict(optim_args), loss, loss_kwargs, _convert(model_args, 'numpy', 'numpy'),
+                   _convert(model_kwargs, 'numpy', 'numpy'), rng_seed)
+        self._barrier = mp_context.Barrier(num_workers)
+        self._conns = []
+        self._processes = []
+        shm_name = 'pyroapi-{}'.format(secrets.token_hex(8))
+        for rank, shard in enumerate(shards):
+            conn, child_conn = mp_context.Pipe()
+            process = mp_context.Process(target=_worker, daemon=True,
+                                         args=(rank, backends, job, shard, self.weights, shm_name, self._barrier,
+                                               child_conn))
+            process.start()
+            child_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+        try:
+            self._recv_all()
+        except Exception:
+            self.close()
+            raise
+
+    def _recv(self, rank):
+        conn, process = self._conns[rank], self._processes[rank]
+        if conn not in wait([conn, process.sentinel]):
+            self._barrier.abort()
+            process.join(timeout=1)
+            raise RuntimeError('Worker {} exited with code {}'.format(rank, process.exitcode))
+        status, value = conn.recv()
+        if status == 'error':
+            raise RuntimeError('Worker {} failed: {}'.format(rank, value))
+        return value
+
+    def _recv_all(self):
+        results = []
+        errors = []
+        for rank in range(len(self._conns)):
+            try:
+                results.append(self._recv(rank))
+            except (EOFError, RuntimeError) as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+        return results
+
+    def run(self, num_steps):
+        """
+        Takes ``num_steps`` SVI steps and returns their losses on the full
+        data as a 1-dimensional array of the current backend.
+
+        :param int num_steps: Number of steps.
+        """
+        for conn in self._conns:
+            conn.send(('run', num_steps))
+        shard_losses = self._recv_all()
+        return ops.tensor([sum(weight * losses[i] for weight, losses in zip(self.weights, shard_losses))
+                           for i in range(num_steps)])
+
+    def step(self):
+        """
+        Takes a single SVI step and returns the loss on the full data.
+
+        :rtype: float
+        """
+        return float(self.run(1)[0])
+
+    def get_params(self):
+        """
+        Returns the constrained values of the params, which are the same on all
+        workers.
+
+        :returns: A dict mapping param names to numpy arrays, which can be
+            loaded with :func:`~pyroapi.params.restore_params` .
+        :rtype: collections.OrderedDict
+        """
+        self._conns[0].send(('params', None))
+        return self._recv(0)
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                try:
+                    conn.send(('close', None))
+                except OSError:
+                    pass
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,179 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Backend-neutral snapshots and checkpoints of the param store returned by
+:func:`~pyroapi.dispatch.pyro.get_param_store` . For example:
+
+.. code-block:: python
+
+    from pyroapi.params import load_params, restore_params, save_params
+
+    with pyro_backend("pyro"):
+        for step in range(1000):
+            svi.step(data)
+            if step % 100 == 0:
+                save_params("checkpoint")  # writes only the changed params
+
+    with pyro_backend("minipyro"):  # e.g. in another process
+        restore_params(load_params("checkpoint"))
+
+Snapshots map param names to constrained values as numpy arrays. On disk,
+each param is stored in its own ``.npy`` file, listed in an ``index.json``
+file with a digest of its contents, so that files can be memory-mapped by
+many processes and incremental checkpoints skip unchanged params.
+
+Note that NumPyro keeps params in the SVI state rather than in a global store,
+so only params copied into its compatibility param store are seen there.
+Requires numpy.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from pyroapi.dispatch import _current_backends, distributions, pyro
+from pyroapi.interchange import _convert, to_backend
+
+# Backends whose param store maps names to (unconstrained value, constraint).
+_TUPLE_STORES = ('pyro.contrib.minipyro', 'funsor.minipyro')
+_INDEX = 'index.json'
+
+
+def _digest(array):
+    # Shape and dtype are hashed too, so reshaped or recast params with equal
+    # bytes are not mistaken for unchanged ones.
+    h = hashlib.blake2b(digest_size=16)
+    h.update('{}{}'.format(array.dtype.str, array.shape).encode())
+    h.update(array.tobytes())
+    return h.hexdigest()
+
+
+def snapshot_params():
+    """
+    Returns a copy of the constrained values of all params of the current
+    backend's param store.
+
+    :returns: A dict mapping param names to numpy arrays.
+    :rtype: collections.OrderedDict
+    """
+    import numpy as np
+
+    store = pyro.get_param_store()
+    snapshot = OrderedDict()
+    for name in list(store.keys()):
+        value = store[name]
+        if isinstance(value, tuple):
+            value = pyro.param(name)
+        snapshot[name] = np.array(_convert(value, 'numpy', 'numpy'))
+    return snapshot
+
+
+def restore_params(snapshot, clear=False):
+    """
+    Sets params of the current backend's param store from a snapshot. The
+    constraints of params already in the store are kept, other params are
+    unconstrained.
+
+    :param dict snapshot: A dict mapping param names to arrays, e.g. from
+        :func:`snapshot_params` or :func:`load_params` . Values are copied.
+    :param bool clear: Whether to clear the param store first.
+    """
+    import numpy as np
+
+    store = pyro.get_param_store()
+    if clear:
+        store.clear()
+    tuple_store = dict(_current_backends())['pyro'] in _TUPLE_STORES
+    for name, value in snapshot.items():
+        # Optimizers update params in place, so params must not alias the
+        # snapshot, e.g. read-only memory-mapped checkpoint files.
+        value = to_backend(np.array(_convert(value, 'numpy', 'numpy')))
+        if tuple_store:
+            _, constraint = store.pop(name, (None, distributions.constraints.real))
+            pyro.param(name, value, constraint=constraint)
+        else:
+            store[name] = value
+
+
+def save_params(path, snapshot=None, incremental=True):
+    """
+    Saves a snapshot to a checkpoint directory.
+
+    :param str path: The checkpoint directory, created if needed.
+    :param dict snapshot: Optional snapshot to save. Defaults to
+        :func:`snapshot_params` .
+    :param bool incremental: Whether to skip params whose contents are
+        unchanged since the last save to ``path`` .
+    :returns: The names of the params that were written.
+    :rtype: list
+    """
+    import numpy as np
+
+    if snapshot is None:
+        snapshot = snapshot_params()
+    os.makedirs(path, exist_ok=True)
+    old_index = _load_index(path)
+    index = OrderedDict()
+    written = []
+    for name, value in snapshot.items():
+        value = np.asarray(value)
+        entry = old_index.get(name)
+        digest = _digest(value)
+        if (incremental and entry is not None and entry['digest'] == digest
+                and os.path.exists(os.path.join(path, entry['file']))):
+            index[name] = entry
+            continue
+        # Files are never overwritten in place, so readers of the old index
+        # still see consistent params.
+        filename = '{}-{}.npy'.format(hashlib.sha1(name.encode()).hexdigest()[:16], digest)
+        tmp_path = os.path.join(path, '{}.{}.tmp'.format(filename, os.getpid()))
+        with open(tmp_path, 'wb') as f:
+            np.save(f, value)
+        os.replace(tmp_path, os.path.join(path, filename))
+        index[name] = {'file': filename, 'shape': list(value.shape), 'dtype': value.dtype.str, 'digest': digest}
+        written.append(name)
+
+    # The index is replaced last and superseded files are removed only
+    # afterwards, so readers never see a partial checkpoint.
+    tmp_path = os.path.join(path, '{}.{}.tmp'.format(_INDEX, os.getpid()))
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, os.path.join(path, _INDEX))
+    current = set(entry['file'] for entry in index.values())
+    for entry in old_index.values():
+        if entry['file'] not in current:
+            try:
+                os.remove(os.path.join(path, entry['file']))
+            except OSError:
+                pass
+    return written
+
+
+def _load_index(path):
+    try:
+        with open(os.path.join(path, _INDEX)) as f:
+            return json.load(f, object_pairs_hook=OrderedDict)
+    except (OSError, ValueError):
+        return OrderedDict()
+
+
+def load_params(path, mmap=True):
+    """
+    Loads a snapshot from a checkpoint directory written by
+    :func:`save_params` .
+
+    :param str path: The checkpoint directory.
+    :param bool mmap: Whether to memory-map the arrays read-only rather than
+        reading them into memory.
+    :returns: A dict mapping param names to numpy arrays.
+    :rtype: collections.OrderedDict
+    """
+    import numpy as np
+
+    index = _load_index(path)
+    if not index and not os.path.exists(os.path.join(path, _INDEX)):
+        raise FileNotFoundError('No checkpoint found at {}'.format(path))
+    return OrderedDict((name, np.load(os.path.join(path, entry['file']), mmap_mode='r' if mmap else None))
+                       for name, entry in index.items())
@@ -0,0 +1,100 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Backend-agnostic posterior predictive sampling. For example:
+
+.. code-block:: python
+
+    from pyroapi.predictive import Predictive
+
+    with pyro_backend("numpy"):
+        predictive = Predictive(model, guide=guide, num_samples=100000, chunk_size=1000)
+        for chunk in predictive.iter_chunks(x):
+            update_statistics(chunk["obs"])  # shape (1000,) + the shape of site "obs"
+
+Samples are drawn with :func:`~pyroapi.vectorize.vectorized_sample` , so every
+supported backend returns values of shape ``(num_samples,) + site_shape`` .
+Native predictive utilities are not used since their signatures and output
+shapes differ across backends. The minipyro and funsor backends raise
+:class:`NotImplementedError` .
+"""
+
+from collections import OrderedDict
+
+from pyroapi.dispatch import ops
+from pyroapi.vectorize import vectorized_sample
+
+
+def _concatenate(values):
+    try:
+        return ops.cat(values)
+    except NotImplementedError:
+        return ops.concatenate(values)
+
+
+class Predictive(object):
+    """
+    Draws samples from the posterior predictive distribution of a model,
+    given either posterior samples or a guide. Without either, samples are
+    drawn from the prior predictive distribution.
+
+    :param callable model: A backend-agnostic model.
+    :param dict posterior_samples: Optional dict mapping latent site names to
+        values with a leading sample dimension.
+    :param callable guide: Optional guide to draw latent samples from.
+    :param int num_samples: Number of samples. Defaults to the leading
+        dimension of ``posterior_samples`` .
+    :param list return_sites: Optional names of sites to return. Defaults to
+        all sample sites that are not in ``posterior_samples`` .
+    :param int chunk_size: Optional number of samples drawn per vectorized
+        call, bounding memory use.
+    :param str method: The vectorization method, see
+        :func:`~pyroapi.vectorize.vectorized_sample` .
+    :param int rng_seed: Base random seed.
+    """
+    def __init__(self, model, posterior_samples=None, guide=None, num_samples=None, return_sites=None,
+                 chunk_size=None, method=None, rng_seed=0):
+        if posterior_samples is not None and guide is not None:
+            raise ValueError('Expected at most one of posterior_samples and guide')
+        if num_samples is None:
+            if not posterior_samples:
+                raise ValueError('num_samples is required without posterior_samples')
+            num_samples = len(next(iter(posterior_samples.values())))
+        self.model = model
+        self.posterior_samples = posterior_samples or {}
+        self.guide = guide
+        self.num_samples = num_samples
+        self.return_sites = return_sites
+        self.chunk_size = chunk_size or num_samples
+        self.method = method
+        self.rng_seed = rng_seed
+
+    def iter_chunks(self, *args, **kwargs):
+        """
+        Yields dicts of samples with leading dimension at most ``chunk_size`` .
+        Arguments are passed to the model and guide.
+        """
+        for start in range(0, self.num_samples, self.chunk_size):
+            size = min(self.chunk_size, self.num_samples - start)
+            rng_seed = self.rng_seed + start
+            if self.guide is not None:
+                data = vectorized_sample(self.guide, size, args, kwargs, rng_seed + self.num_samples, self.method)
+            else:
+                data = OrderedDict((name, value[start:start + size])
+                                   for name, value in self.posterior_samples.items())
+            samples = vectorized_sample(self.model, size, args, kwargs, rng_seed, self.method, data=data)
+            if self.return_sites is not None:
+                samples.update(data)
+                samples = OrderedDict((name, samples[name]) for name in self.return_sites)
+            yield samples
+
+    def __call__(self, *args, **kwargs):
+        """
+        Returns a dict of samples with leading dimension ``num_samples`` .
+        Arguments are passed to the model and guide.
+        """
+        chunks = list(self.iter_chunks(*args, **kwargs))
+        if len(chunks) == 1:
+            return chunks[0]
+        return OrderedDict((name, _concatenate([chunk[name] for chunk in chunks])) for name in chunks[0])
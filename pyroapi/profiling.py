@@ -0,0 +1,166 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Opt-in profiling of the dispatch layer. For example:
+
+.. code-block:: python
+
+    from pyroapi.profiling import profile_dispatch
+
+    with pyro_backend("pyro"), profile_dispatch(time_calls=True) as prof:
+        for step in range(100):
+            inference.step(data)
+    print(prof.report())
+
+While no profile is active :class:`~pyroapi.dispatch.GenericModule` uses its
+uninstrumented attribute lookup, so profiling costs nothing when disabled.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from pyroapi.dispatch import GenericModule, _getattr
+
+_GENERIC_GETATTRIBUTE = GenericModule.__getattribute__
+_ACTIVE = []
+_LOCK = threading.Lock()
+
+
+class DispatchProfile(object):
+    """
+    Statistics collected by :func:`profile_dispatch` , keyed by
+    ``(module_name, backend, attribute)``.
+
+    :param bool time_calls: Whether to also time calls to resolved functions.
+    """
+    def __init__(self, time_calls=False):
+        self.time_calls = time_calls
+        self.stats = {}
+
+    def _get(self, key):
+        try:
+            return self.stats[key]
+        except KeyError:
+            return self.stats.setdefault(key, [0, 0., 0, 0.])
+
+    def _record(self, key, resolve_time):
+        stats = self._get(key)
+        stats[0] += 1
+        stats[1] += resolve_time
+
+    def _record_call(self, key, call_time):
+        stats = self._get(key)
+        stats[2] += 1
+        stats[3] += call_time
+
+    def rows(self, sort_by='resolve_time'):
+        """
+        Returns the statistics as a list of dicts sorted in descending order.
+
+        :param str sort_by: One of "count", "resolve_time", "call_count" or
+            "call_time".
+        :rtype: list
+        """
+        rows = []
+        for (module_name, backend, name), stats in self.stats.items():
+            rows.append(OrderedDict([
+                ('module', module_name),
+                ('backend', backend),
+                ('attribute', name),
+                ('count', stats[0]),
+                ('resolve_time', stats[1]),
+                ('call_count', stats[2]),
+                ('call_time', stats[3]),
+            ]))
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows
+
+    def backend_totals(self):
+        """
+        Returns the total resolution and call time spent in each backend.
+
+        :rtype: dict
+        """
+        totals = {}
+        for (_, backend, _), stats in self.stats.items():
+            total = totals.setdefault(backend, {'count': 0, 'resolve_time': 0., 'call_time': 0.})
+            total['count'] += stats[0]
+            total['resolve_time'] += stats[1]
+            total['call_time'] += stats[3]
+        return totals
+
+    def report(self, sort_by='resolve_time', limit=None):
+        """
+        Formats the statistics as a human readable table.
+
+        :param str sort_by: The column to sort by, see :meth:`rows` .
+        :param int limit: Optional maximum number of rows.
+        :rtype: str
+        """
+        lines = ['{: <14} {: <32} {: <24} {: >10} {: >12} {: >10} {: >12}'.format(
+            'module', 'backend', 'attribute', 'count', 'resolve (s)', 'calls', 'call (s)')]
+        for row in self.rows(sort_by)[:limit]:
+            lines.append('{: <14} {: <32} {: <24} {: >10d} {: >12.6f} {: >10d} {: >12.6f}'.format(
+                row['module'], row['backend'], row['attribute'], row['count'], row['resolve_time'],
+                row['call_count'], row['call_time']))
+        return '\n'.join(lines)
+
+
+def _wrap_call(fn, key):
+    @functools.wraps(fn)
+    def wrapped(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            for profile in _ACTIVE:
+                if profile.time_calls:
+                    profile._record_call(key, elapsed)
+
+    return wrapped
+
+
+def _profiled_getattribute(self, name):
+    start = time.perf_counter()
+    value = _GENERIC_GETATTRIBUTE(self, name)
+    elapsed = time.perf_counter() - start
+    key = (_getattr(self, '_name'), _getattr(self, '_backend').get().backend, name)
+    time_calls = False
+    for profile in _ACTIVE:
+        profile._record(key, elapsed)
+        time_calls = time_calls or profile.time_calls
+    # Classes are not wrapped, so that isinstance() checks keep working.
+    if time_calls and callable(value) and not inspect.isclass(value):
+        value = _wrap_call(value, key)
+    return value
+
+
+@contextmanager
+def profile_dispatch(time_calls=False):
+    """
+    Context manager to record, for each generic module, backend and attribute,
+    the number of resolutions and the time spent resolving. Profiles are
+    process wide and may be nested.
+
+    :param bool time_calls: Whether to also time calls to resolved functions.
+        Classes such as distributions are counted but not timed.
+    :returns: The profile being collected.
+    :rtype: DispatchProfile
+    """
+    profile = DispatchProfile(time_calls)
+    with _LOCK:
+        _ACTIVE.append(profile)
+        GenericModule.__getattribute__ = _profiled_getattribute
+    try:
+        yield profile
+    finally:
+        with _LOCK:
+            _ACTIVE.remove(profile)
+            if not _ACTIVE:
+                GenericModule.__getattribute__ = _GENERIC_GETATTRIBUTE
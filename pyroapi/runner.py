@@ -0,0 +1,103 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Parallel execution of many models from :data:`pyroapi.testing.MODELS` across
+a pool of worker processes. For example:
+
+.. code-block:: python
+
+    from pyroapi.runner import run_models
+
+    jobs = [(name, backend, seed)
+            for name in MODELS
+            for backend in ["pyro", "numpy", "funsor"]
+            for seed in range(10)]
+    for result in run_models(jobs, num_workers=8):
+        print(result["model"], result["backend"], result["seed"], result["status"])
+"""
+
+import multiprocessing
+import time
+import traceback
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pyroapi.dispatch import handlers, prewarm, pyro_backend
+from pyroapi.testing import load_model
+
+
+def trace_model(f):
+    """
+    Default job: runs the model once under :func:`~pyroapi.dispatch.handlers.trace` .
+
+    :param dict f: The output of a model factory in :data:`pyroapi.testing.MODELS` .
+    """
+    model, args, kwargs = f['model'], f.get('model_args', ()), f.get('model_kwargs', {})
+    handlers.trace(model).get_trace(*args, **kwargs)
+
+
+def _init_worker(backends):
+    for backend in backends:
+        try:
+            prewarm(backend)
+        except ImportError:
+            pass  # the error is reported by each job using this backend
+
+
+def run_job(name, backend, seed, fn=trace_model, cache_dir=None):
+    """
+    Runs a single ``(model_name, backend, seed)`` job in the current process.
+    The model's data are loaded with :func:`~pyroapi.testing.load_model` , so
+    they are generated once per process, or once per ``cache_dir`` .
+
+    :returns: A dict with the job, its ``status`` ("ok", "not_implemented" or
+        "error"), the elapsed ``time`` in seconds and an optional ``error``.
+    :rtype: collections.OrderedDict
+    """
+    result = OrderedDict([('model', name), ('backend', backend), ('seed', seed)])
+    start = time.perf_counter()
+    try:
+        with pyro_backend(backend), handlers.seed(rng_seed=seed), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            fn(load_model(name, cache_dir=cache_dir))
+    except NotImplementedError as e:
+        result['status'] = 'not_implemented'
+        result['error'] = str(e)
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = '{}: {}\n{}'.format(type(e).__name__, e, traceback.format_exc())
+    else:
+        result['status'] = 'ok'
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def run_models(jobs, num_workers=None, fn=trace_model, mp_context=None, cache_dir=None):
+    """
+    Runs ``(model_name, backend, seed)`` jobs across a process pool and yields
+    their results as they finish. Each worker imports all backends used by the
+    jobs once, and is reused across jobs.
+
+    :param list jobs: A list of ``(model_name, backend, seed)`` tuples.
+    :param int num_workers: Number of worker processes. Defaults to the number
+        of CPUs.
+    :param callable fn: A picklable function applied to the output of each
+        model factory. Defaults to :func:`trace_model` .
+    :param mp_context: An optional :mod:`multiprocessing` context. Defaults to
+        "spawn", since forking a process that has imported a multithreaded
+        backend such as JAX may deadlock.
+    :param str cache_dir: Optional directory in which workers share the data
+        generated by the models, see :func:`~pyroapi.testing.load_model` .
+    :returns: An iterator over dicts as returned by :func:`run_job` , in
+        completion order.
+    """
+    mp_context = mp_context or multiprocessing.get_context('spawn')
+    jobs = list(jobs)
+    backends = sorted(set(backend for _, backend, _ in jobs))
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=mp_context,
+                             initializer=_init_worker, initargs=(backends,)) as executor:
+        futures = [executor.submit(run_job, name, backend, seed, fn, cache_dir) for name, backend, seed in jobs]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,330 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Backend-neutral record of the site structure of a model, cached per model,
+backends and input signature. For example:
+
+.. code-block:: python
+
+    from pyroapi.structure import trace_structure
+
+    with pyro_backend("numpy"):
+        structure = trace_structure(model, data)  # runs the model once
+        structure = trace_structure(model, data)  # cached
+    structure.latent_sites()  # ["loc", "x"]
+    structure.sites["x"].plates  # ("plate",)
+    structure.check_shapes(posterior_samples, batch_ndim=1)  # [] if consistent
+    structure.check_guide(trace_structure(guide, data))  # [] if consistent
+
+To check a model and guide for structural mismatches before running any
+inference, and to estimate the cost of inference:
+
+.. code-block:: python
+
+    from pyroapi.structure import analyze
+
+    print(analyze(model, guide, model_args=(data,)).report())
+
+Input signatures consist of the type and shape of array arguments and the
+value of scalar arguments, so repeated calls with new data of the same shape
+reuse the recorded structure. Values are not recorded, so callers that need
+them still run :func:`~pyroapi.dispatch.handlers.trace` .
+"""
+
+from collections import OrderedDict, namedtuple
+
+from pyroapi.dispatch import _current_backends, handlers
+
+STRUCTURE_CACHE_SIZE = 128
+
+Site = namedtuple('Site', ['name', 'dist_type', 'shape', 'batch_shape', 'event_shape', 'plates', 'is_observed',
+                           'enumerate', 'support_size'])
+Site.__doc__ = """
+Structure of a sample site. ``plates`` are the names of the enclosing plates,
+outermost first, and ``dist_type`` is the name of the distribution class,
+unwrapping expanded, independent and masked distributions. ``enumerate`` is
+the site's enumeration strategy, if any, and ``support_size`` the size of its
+enumerable support, if known.
+"""
+Param = namedtuple('Param', ['name', 'shape', 'constraint'])
+Param.__doc__ = """
+Structure of a param site. ``constraint`` is the name of the constraint class
+or None if unconstrained.
+"""
+Plate = namedtuple('Plate', ['name', 'size', 'dim'])
+Plate.__doc__ = """
+Structure of a vectorized plate.
+"""
+
+_STRUCTURES = OrderedDict()
+_WRAPPERS = ('ExpandedDistribution', 'Independent', 'MaskedDistribution')
+
+
+def _signature(value):
+    if hasattr(value, 'shape'):
+        return (type(value).__name__, tuple(value.shape))
+    if isinstance(value, (bool, int, float, str, type(None))):
+        return value
+    if isinstance(value, (tuple, list)):
+        return (type(value).__name__,) + tuple(_signature(item) for item in value)
+    if isinstance(value, dict):
+        return (type(value).__name__,) + tuple(sorted((key, _signature(item)) for key, item in value.items()))
+    return type(value).__name__
+
+
+def _shape(value):
+    return tuple(getattr(value, 'shape', ()))
+
+
+def _dist_type(fn):
+    while type(fn).__name__ in _WRAPPERS:
+        fn = fn.base_dist
+    return type(fn).__name__
+
+
+def _support_size(fn):
+    if not getattr(fn, 'has_enumerate_support', False):
+        return None
+    try:
+        return int(fn.enumerate_support(expand=False).shape[0])
+    except Exception:
+        return None
+
+
+def _numel(shape):
+    result = 1
+    for size in shape:
+        result *= size
+    return result
+
+
+class ModelStructure(object):
+    """
+    Site structure of a single model execution.
+
+    :ivar collections.OrderedDict sites: :class:`Site` s by name, in execution
+        order.
+    :ivar collections.OrderedDict params: :class:`Param` s by name.
+    :ivar collections.OrderedDict plates: :class:`Plate` s by name.
+    :ivar list errors: Messages describing inconsistent plates within the
+        model.
+    """
+    def __init__(self, trace):
+        self.sites = OrderedDict()
+        self.params = OrderedDict()
+        self.plates = OrderedDict()
+        self.errors = []
+        for site in getattr(trace, 'nodes', trace).values():
+            if site['type'] == 'param':
+                constraint = site.get('kwargs', {}).get('constraint')
+                if constraint is not None and type(constraint).__name__ == '_Real':
+                    constraint = None
+                self.params[site['name']] = Param(site['name'], _shape(site['value']),
+                                                  None if constraint is None else type(constraint).__name__)
+            elif site['type'] == 'sample' and type(site['fn']).__name__ != '_Subsample':
+                frames = [frame for frame in site.get('cond_indep_stack') or ()
+                          if getattr(frame, 'dim', None) is not None]
+                frames.sort(key=lambda frame: frame.dim)
+                fn = site['fn']
+                enumerate_ = (site.get('infer') or {}).get('enumerate')
+                self.sites[site['name']] = Site(
+                    site['name'], _dist_type(fn), _shape(site['value']), tuple(getattr(fn, 'batch_shape', ())),
+                    tuple(getattr(fn, 'event_shape', ())), tuple(frame.name for frame in frames),
+                    bool(site.get('is_observed', False)), enumerate_,
+                    _support_size(fn) if enumerate_ else None)
+                self._add_plates(self.sites[site['name']], frames)
+
+    def _add_plates(self, site, frames):
+        dims = {}
+        for frame in frames:
+            plate = self.plates.setdefault(frame.name, Plate(frame.name, frame.size, frame.dim))
+            if (plate.size, plate.dim) != (frame.size, frame.dim):
+                self.errors.append('Plate {} has size {} and dim {} at site {}, but size {} and dim {} before'
+                                   .format(frame.name, frame.size, frame.dim, site.name, plate.size, plate.dim))
+            if frame.dim in dims:
+                self.errors.append('Plates {} and {} share dim {} at site {}'
+                                   .format(dims[frame.dim], frame.name, frame.dim, site.name))
+            dims[frame.dim] = frame.name
+            batch_shape = site.batch_shape
+            if len(batch_shape) < -frame.dim or batch_shape[frame.dim] not in (1, frame.size):
+                self.errors.append('Site {} has batch shape {}, inconsistent with plate {} of size {} at dim {}'
+                                   .format(site.name, batch_shape, frame.name, frame.size, frame.dim))
+
+    def latent_sites(self):
+        """
+        Returns the names of unobserved sample sites.
+
+        :rtype: list
+        """
+        return [name for name, site in self.sites.items() if not site.is_observed]
+
+    def observed_sites(self):
+        """
+        Returns the names of observed sample sites.
+
+        :rtype: list
+        """
+        return [name for name, site in self.sites.items() if site.is_observed]
+
+    def check_shapes(self, values, batch_ndim=0):
+        """
+        Checks the shapes of values for sample sites, e.g. data to condition
+        on or posterior samples.
+
+        :param dict values: A dict mapping site names to values.
+        :param int batch_ndim: Number of leading batch dimensions of each
+            value, e.g. 1 for a dict of samples.
+        :returns: A list of messages describing mismatches, empty if none.
+        :rtype: list
+        """
+        errors = []
+        for name, value in values.items():
+            if name not in self.sites:
+                errors.append('Unknown site {}'.format(name))
+                continue
+            shape = _shape(value)[batch_ndim:]
+            if shape != self.sites[name].shape:
+                errors.append('Site {} has shape {}, expected {}'.format(name, shape, self.sites[name].shape))
+        return errors
+
+    def check_guide(self, guide):
+        """
+        Checks that a guide's structure matches this model's: the guide must
+        sample every latent site with the same shape and plates, and no other
+        sites.
+
+        :param ModelStructure guide: The structure of the guide.
+        :returns: A list of messages describing mismatches, empty if none.
+        :rtype: list
+        """
+        errors = []
+        for name in self.latent_sites():
+            if name not in guide.sites:
+                errors.append('Latent site {} is missing from the guide'.format(name))
+        for name, site in guide.sites.items():
+            if name not in self.sites:
+                errors.append('Guide site {} is not in the model'.format(name))
+                continue
+            model_site = self.sites[name]
+            if model_site.is_observed:
+                errors.append('Guide site {} is observed in the model'.format(name))
+            if site.shape != model_site.shape:
+                errors.append('Site {} has shape {} in the guide, but {} in the model'
+                              .format(name, site.shape, model_site.shape))
+            if set(site.plates) != set(model_site.plates):
+                errors.append('Site {} is in plates {} in the guide, but {} in the model'
+                              .format(name, list(site.plates), list(model_site.plates)))
+        for name, plate in guide.plates.items():
+            model_plate = self.plates.get(name)
+            if model_plate is not None and (plate.size, plate.dim) != (model_plate.size, model_plate.dim):
+                errors.append('Plate {} has size {} and dim {} in the guide, but size {} and dim {} in the model'
+                              .format(name, plate.size, plate.dim, model_plate.size, model_plate.dim))
+        return errors
+
+
+class Analysis(object):
+    """
+    Result of :func:`analyze` .
+
+    :ivar ModelStructure model: The model's structure.
+    :ivar ModelStructure guide: The guide's structure, or None.
+    :ivar list errors: Messages describing structural mismatches.
+    :ivar collections.OrderedDict cost: Cost estimates: the number of latent
+        and observed sites and elements, ``max_plate_nesting`` , the size of
+        each plate in ``batch_sizes`` , the ``enumerated_sites`` and the
+        ``enumeration_size`` , i.e. the product of their support sizes.
+    """
+    def __init__(self, model, guide=None):
+        self.model = model
+        self.guide = guide
+        self.errors = list(model.errors)
+        if guide is not None:
+            self.errors.extend('Guide: ' + error for error in guide.errors)
+            self.errors.extend(model.check_guide(guide))
+            for name, param in guide.params.items():
+                model_param = model.params.get(name)
+                if model_param is not None and model_param != param:
+                    self.errors.append('Param {} has shape {} and constraint {} in the guide, but shape {} and '
+                                       'constraint {} in the model'.format(name, param.shape, param.constraint,
+                                                                           model_param.shape, model_param.constraint))
+
+        plates = OrderedDict(model.plates)
+        if guide is not None:
+            for name, plate in guide.plates.items():
+                plates.setdefault(name, plate)
+        enumerated = [site for structure in (model, guide) if structure is not None
+                      for site in structure.sites.values() if site.enumerate]
+        latent = [model.sites[name] for name in model.latent_sites()]
+        observed = [model.sites[name] for name in model.observed_sites()]
+        self.cost = OrderedDict([
+            ('num_latent_sites', len(latent)),
+            ('num_latent_elements', sum(_numel(site.shape) for site in latent)),
+            ('num_observed_sites', len(observed)),
+            ('num_observed_elements', sum(_numel(site.shape) for site in observed)),
+            ('max_plate_nesting', max([-plate.dim for plate in plates.values()], default=0)),
+            ('batch_sizes', OrderedDict((name, plate.size) for name, plate in plates.items())),
+            ('enumerated_sites', [site.name for site in enumerated]),
+            ('enumeration_size', _numel(site.support_size or 1 for site in enumerated)),
+        ])
+
+    def report(self):
+        """
+        Formats the errors and cost estimates as human readable text.
+
+        :rtype: str
+        """
+        lines = ['errors:'] + ['  ' + error for error in self.errors] if self.errors else ['no errors']
+        lines.append('cost:')
+        lines.extend('  {: <22} {}'.format(name, value) for name, value in self.cost.items())
+        return '\n'.join(lines)
+
+
+def analyze(model, guide=None, model_args=(), model_kwargs=None):
+    """
+    Checks the structure of a model, and of a guide if provided, by tracing
+    each once with :func:`trace_structure` , without computing any loss.
+
+    :param callable model: A backend-agnostic model.
+    :param callable guide: An optional backend-agnostic guide.
+    :param tuple model_args: Positional arguments to the model and guide.
+    :param dict model_kwargs: Keyword arguments to the model and guide.
+    :rtype: Analysis
+    """
+    model_kwargs = model_kwargs or {}
+    model_structure = trace_structure(model, *model_args, **model_kwargs)
+    guide_structure = None if guide is None else trace_structure(guide, *model_args, **model_kwargs)
+    return Analysis(model_structure, guide_structure)
+
+
+def trace_structure(model, *args, **kwargs):
+    """
+    Returns the :class:`ModelStructure` of a model under the current
+    backends, running the model once per input signature.
+
+    :param callable model: A backend-agnostic model.
+    :param args: Positional arguments to the model.
+    :param kwargs: Keyword arguments to the model.
+    :rtype: ModelStructure
+    """
+    key = (model, _current_backends(), _signature(args), _signature(kwargs))
+    try:
+        structure = _STRUCTURES[key]
+    except KeyError:
+        pass
+    else:
+        _STRUCTURES.move_to_end(key)
+        return structure
+    trace = handlers.trace(handlers.seed(model, rng_seed=0)).get_trace(*args, **kwargs)
+    structure = ModelStructure(trace)
+    _STRUCTURES[key] = structure
+    while len(_STRUCTURES) > STRUCTURE_CACHE_SIZE:
+        _STRUCTURES.popitem(last=False)
+    return structure
+
+
+def clear_structure_cache():
+    """
+    Clears the cache of :func:`trace_structure` .
+    """
+    _STRUCTURES.clear()
@@ -0,0 +1,176 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Backend-neutral SVI with a uniform ``jit`` flag. For example:
+
+.. code-block:: python
+
+    from pyroapi.svi import SVI
+
+    with pyro_backend("pyro"):
+        svi = SVI(model, guide, optim.Adam({"lr": 1e-3}), "Trace_ELBO", jit=True)
+        print(svi.jit_path)  # "torch.jit"
+        for step in range(1000):
+            svi.step(data)
+
+The compiled path of the ELBO that was built is reported as ``"torch.jit"`` ,
+``"jax.jit"`` or None. Note that NumPyro always compiles SVI steps with
+:func:`jax.jit` , so ``jit=False`` has no effect there.
+
+:meth:`SVI.run` takes many steps per call, returning an array of losses:
+
+.. code-block:: python
+
+    losses = svi.run(1000, data, chunk_size=100)
+"""
+
+import warnings
+
+from pyroapi.dispatch import _current_backends, handlers, infer, ops, pyro
+
+
+def _is_numpyro():
+    return dict(_current_backends())['infer'].startswith('numpyro')
+
+
+def make_elbo(name='Trace_ELBO', jit=False, **kwargs):
+    """
+    Creates an ELBO of the current backend, using its JIT-compiled variant
+    ``"Jit" + name`` if requested and available.
+
+    :param str name: Name of the ELBO class in :mod:`~pyroapi.dispatch.infer` ,
+        e.g. "Trace_ELBO" or "TraceMeanField_ELBO".
+    :param bool jit: Whether to compile the ELBO. If the backend does not
+        implement the compiled variant, a warning is emitted and the eager
+        ELBO is returned.
+    :param kwargs: Keyword arguments to the ELBO class.
+    :returns: A tuple of the ELBO and the compiled path of its class, see
+        :class:`SVI` .
+    :rtype: tuple
+    """
+    Elbo = getattr(infer, name)
+    if jit and not _is_numpyro():
+        try:
+            Elbo = getattr(infer, 'Jit' + name)
+        except NotImplementedError as e:
+            warnings.warn('{}, falling back to {}'.format(e, name), RuntimeWarning)
+    elbo = Elbo(**kwargs)
+    return elbo, _jit_path(elbo)
+
+
+def _jit_path(elbo):
+    # The path is read off the ELBO that was built rather than the request,
+    # since backends may fall back to or alias Jit* names to eager classes.
+    if type(elbo).__module__.startswith('numpyro'):
+        return 'jax.jit'
+    if type(elbo).__name__.startswith('Jit'):
+        return 'torch.jit'
+    return None
+
+
+class SVI(object):
+    """
+    Wrapper around :class:`~pyroapi.dispatch.infer.SVI` of the current backend
+    with a uniform ``jit`` flag.
+
+    :param callable model: A backend-agnostic model.
+    :param callable guide: A backend-agnostic guide.
+    :param optim: An optimizer from :mod:`~pyroapi.dispatch.optim` .
+    :param str loss: Name of the ELBO class, see :func:`make_elbo` .
+    :param bool jit: Whether to compile the ELBO.
+    :param loss_kwargs: Keyword arguments to the ELBO class.
+
+    :ivar str jit_path: The compiled path of the ELBO that was built,
+        "torch.jit", "jax.jit" or None.
+    :ivar str fused_path: How :meth:`run` fuses steps: "jax.lax.scan" to
+        compile each chunk of steps into one call, "torch" to keep losses on
+        the device until the end of each chunk, or None to call :meth:`step`
+        in a loop.
+    """
+    def __init__(self, model, guide, optim, loss='Trace_ELBO', jit=False, **loss_kwargs):
+        self.loss, self.jit_path = make_elbo(loss, jit, **loss_kwargs)
+        self.svi = infer.SVI(model, guide, optim, self.loss)
+        if _is_numpyro():
+            self.fused_path = 'jax.lax.scan'
+        elif hasattr(self.loss, 'loss_and_surrogate_loss'):
+            # Pyro's compiled ELBOs compute the loss as a tensor, whereas its
+            # eager ELBOs convert each site's log density to a float.
+            self.fused_path = 'torch'
+        else:
+            self.fused_path = None
+        self._scan_fns = {}
+
+    def step(self, *args, **kwargs):
+        """
+        Takes a single SVI step and returns the loss.
+        """
+        return self.svi.step(*args, **kwargs)
+
+    def run(self, num_steps, *args, chunk_size=100, callback=None, **kwargs):
+        """
+        Takes ``num_steps`` SVI steps in chunks of ``chunk_size`` steps and
+        returns the losses as a 1-dimensional array of the current backend.
+
+        Losses stay on the device within a chunk, and the param store is only
+        updated at the end of each chunk.
+
+        :param int num_steps: Number of steps.
+        :param args: Positional arguments to the model and guide.
+        :param int chunk_size: Number of steps per chunk.
+        :param callable callback: An optional function ``callback(step, losses)``
+            called after each chunk with the number of steps taken so far and
+            the chunk's losses. Returning True stops the run early.
+        :param kwargs: Keyword arguments to the model and guide.
+        :returns: The losses of the steps taken.
+        """
+        assert chunk_size >= 1
+        chunks = []
+        step = 0
+        while step < num_steps:
+            size = min(chunk_size, num_steps - step)
+            if self.fused_path == 'jax.lax.scan':
+                losses = self._scan_steps(size, args, kwargs)
+            elif self.fused_path == 'torch':
+                losses = self._torch_steps(size, args, kwargs)
+            else:
+                losses = [self.svi.step(*args, **kwargs) for _ in range(size)]
+            chunks.append(losses)
+            step += size
+            if callback is not None and callback(step, losses):
+                break
+        if self.fused_path is None:
+            return ops.tensor([loss for losses in chunks for loss in losses])
+        return ops.concatenate(chunks) if chunks else ops.zeros(0)
+
+    def _scan_steps(self, num_steps, args, kwargs):
+        import jax
+        import numpyro
+
+        svi = self.svi
+        if svi.svi_state is None:
+            svi.svi_state = svi.init(numpyro.prng_key(), *args, **kwargs)
+        scan_fn = self._scan_fns.get(num_steps)
+        if scan_fn is None:
+            def scan_fn(svi_state, args, kwargs):
+                return jax.lax.scan(lambda state, _: svi.update(state, *args, **kwargs),
+                                    svi_state, None, length=num_steps)
+
+            scan_fn = self._scan_fns[num_steps] = jax.jit(scan_fn)
+        svi.svi_state, losses = scan_fn(svi.svi_state, args, kwargs)
+        pyro.get_param_store().update(svi.get_params())
+        return losses
+
+    def _torch_steps(self, num_steps, args, kwargs):
+        svi = self.svi
+        losses = []
+        for _ in range(num_steps):
+            with handlers.trace(param_only=True) as param_capture:
+                loss, surrogate_loss = self.loss.loss_and_surrogate_loss(svi.model, svi.guide, *args, **kwargs)
+                surrogate_loss.backward()
+            params = set(site['value'].unconstrained() for site in param_capture.trace.nodes.values())
+            svi.optim(params)
+            for param in params:
+                param.grad = None
+            losses.append(loss.detach())
+        return ops.stack(losses)
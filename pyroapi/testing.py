@@ -7,22 +7,138 @@ Models for testing the generic interface.
 For specifying the arguments to model functions, the convention followed is
 that positional arguments are inputs to the model and keyword arguments denote
 observed data.
+
+Models registered with :func:`register_scalable` take size parameters as
+keyword arguments, whose defaults are listed in :data:`MODEL_SIZES` .
+
+Use :func:`load_model` to memoize the data generated by model factories.
 """
 
+import functools
+import hashlib
+import inspect
+import os
+import shutil
 from collections import OrderedDict
+from contextlib import ExitStack
 
-from pyroapi.dispatch import distributions as dist, handlers, ops, pyro
+from pyroapi.dispatch import _current_backends, distributions as dist, handlers, ops, pyro
+from pyroapi.interchange import to_backend
 
 MODELS = OrderedDict()
+MODEL_SIZES = OrderedDict()
+MODEL_CACHE_SIZE = 32
+_MODEL_CACHE = OrderedDict()
+_FACTORIES = {}
+
+
+def _seeded(fn, rng_seed):
+    # Resolves the seed handler when called, in the backend current at call time.
+    @functools.wraps(fn)
+    def seeded_fn(*args, **kwargs):
+        return handlers.seed(fn, rng_seed)(*args, **kwargs)
+
+    return seeded_fn
 
 
 def register(rng_seed=None):
     def _register_fn(fn):
-        MODELS[fn.__name__] = handlers.seed(fn, rng_seed)
+        MODELS[fn.__name__] = _seeded(fn, rng_seed)
+        _FACTORIES[fn.__name__] = fn, rng_seed
 
     return _register_fn
 
 
+def register_scalable(rng_seed=None):
+    """
+    Registers a model factory whose keyword arguments are problem sizes, such
+    as data size, latent dimension, plate nesting depth or number of sample
+    sites. The defaults of these arguments are recorded in :data:`MODEL_SIZES` .
+    """
+    def _register_fn(fn):
+        register(rng_seed)(fn)
+        MODEL_SIZES[fn.__name__] = OrderedDict(
+            (name, param.default) for name, param in inspect.signature(fn).parameters.items())
+
+    return _register_fn
+
+
+def load_model(name, rng_seed=None, cache_dir=None, **sizes):
+    """
+    Returns the output of the model factory ``MODELS[name]`` , memoized per
+    model, current backends, ``rng_seed`` and sizes in an LRU cache whose size
+    is the current value of :data:`MODEL_CACHE_SIZE` (None for unbounded).
+
+    :param str name: Name of a registered model.
+    :param int rng_seed: Seed for data generation. Defaults to the seed the
+        model was registered with.
+    :param str cache_dir: Optional directory in which the values of the
+        factory's sample sites are stored as ``.npy`` files. Later loads
+        memory-map these files, shared without copies where the backend
+        supports it (e.g. by torch), and condition the factory on them. The
+        factory still runs to build the model, but draws no random data.
+        Requires numpy.
+    :param sizes: Size parameters of models registered with
+        :func:`register_scalable` .
+    :rtype: dict
+    """
+    if rng_seed is None:
+        rng_seed = _FACTORIES[name][1]
+    key = name, _current_backends(), rng_seed, cache_dir, tuple(sorted(sizes.items()))
+    try:
+        f = _MODEL_CACHE.pop(key)
+    except KeyError:
+        f = _load_model(*key)
+    _MODEL_CACHE[key] = f
+    while MODEL_CACHE_SIZE is not None and len(_MODEL_CACHE) > max(MODEL_CACHE_SIZE, 0):
+        _MODEL_CACHE.popitem(last=False)
+
+    f = f.copy()
+    if 'model_kwargs' in f:
+        f['model_kwargs'] = f['model_kwargs'].copy()
+    return f
+
+
+def _load_model(name, backends, rng_seed, cache_dir, sizes):
+    fn = functools.partial(_FACTORIES[name][0], **dict(sizes))
+    if cache_dir is None:
+        return handlers.seed(fn, rng_seed)()
+
+    import numpy as np
+
+    key = hashlib.sha1(repr((backends, rng_seed, sizes)).encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, '{}-{}'.format(name, key))
+    if os.path.isdir(path):
+        # Copy-on-write maps are writable, so backends can share them without copies.
+        data = {filename[:-len('.npy')]: to_backend(np.load(os.path.join(path, filename), mmap_mode='c'))
+                for filename in os.listdir(path) if filename.endswith('.npy')}
+        return handlers.condition(handlers.seed(fn, rng_seed), data=data)()
+
+    result = {}
+
+    def _fn():
+        result.update(fn())
+
+    trace = handlers.trace(handlers.seed(_fn, rng_seed)).get_trace()
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    os.makedirs(tmp_path)
+    for site in getattr(trace, 'nodes', trace).values():
+        if site['type'] == 'sample':
+            np.save(os.path.join(tmp_path, site['name'] + '.npy'), np.asarray(site['value']))
+    try:
+        os.rename(tmp_path, path)
+    except OSError:  # written concurrently by another process
+        shutil.rmtree(tmp_path)
+    return result
+
+
+def clear_model_cache():
+    """
+    Clears the in-memory cache of :func:`load_model` .
+    """
+    _MODEL_CACHE.clear()
+
+
 @register(rng_seed=1)
 def logistic_regression():
     N, dim = 3000, 3
@@ -86,3 +202,50 @@ def beta_binomial():
                     pyro.sample("binomial", dist.Binomial(probs=probs, total_count=total_count), obs=data)
 
     return {'model': model, 'model_args': (N, D1, D2), 'model_kwargs': {'data': data}}
+
+
+@register_scalable(rng_seed=1)
+def scalable_logistic_regression(N=100, dim=3):
+    data = pyro.sample('data', dist.Normal(0., 1.), sample_shape=(N, dim))
+    true_coefs = ops.arange(1., dim + 1.)
+    logits = ops.sum(true_coefs * data, axis=-1)
+    labels = pyro.sample('labels', dist.Bernoulli(logits=logits))
+
+    def model(N, x, y=None):
+        coefs = pyro.sample('coefs', dist.Normal(ops.zeros(dim), ops.ones(dim)))
+        intercept = pyro.sample('intercept', dist.Normal(0., 1.))
+        with pyro.plate('data', N):
+            logits = ops.sum(coefs * x, axis=-1) + intercept
+            return pyro.sample('obs', dist.Bernoulli(logits=logits), obs=y)
+
+    return {'model': model, 'model_args': (N, data), 'model_kwargs': {'y': labels}}
+
+
+@register_scalable(rng_seed=1)
+def nested_plates(N=10, depth=2, width=2):
+    data = pyro.sample('data', dist.Normal(0., 1.), sample_shape=(N,) + (width,) * depth)
+
+    def model(N, depth, width, data=None):
+        with ExitStack() as stack:
+            loc = pyro.sample('loc', dist.Normal(0., 1.))
+            for i in range(depth):
+                stack.enter_context(pyro.plate('plate_{}'.format(i), width, dim=i - depth))
+                loc = pyro.sample('loc_{}'.format(i), dist.Normal(loc, 1.))
+            with pyro.plate('data', N, dim=-depth - 1):
+                pyro.sample('obs', dist.Normal(loc, 1.), obs=data)
+
+    return {'model': model, 'model_args': (N, depth, width), 'model_kwargs': {'data': data}}
+
+
+@register_scalable(rng_seed=1)
+def random_walk(N=10, num_sites=5):
+    data = pyro.sample('data', dist.Normal(0., 1.), sample_shape=(N,))
+
+    def model(N, num_sites, data=None):
+        x = pyro.sample('x_0', dist.Normal(0., 1.))
+        for i in range(1, num_sites):
+            x = pyro.sample('x_{}'.format(i), dist.Normal(x, 1.))
+        with pyro.plate('data', N):
+            pyro.sample('obs', dist.Normal(x, 1.), obs=data)
+
+    return {'model': model, 'model_args': (N, num_sites), 'model_kwargs': {'data': data}}
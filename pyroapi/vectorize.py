@@ -0,0 +1,167 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Vectorized execution of a model under many random seeds. For example:
+
+.. code-block:: python
+
+    from pyroapi.vectorize import vectorized_sample
+
+    with pyro_backend("pyro"):
+        samples = vectorized_sample(model, 1000, model_args=(data,))
+    samples["x"].shape  # (1000,) + the shape of site "x"
+
+Three methods are available:
+
+- ``"plate"`` runs the model once inside an outermost batch
+  :func:`~pyroapi.dispatch.pyro.plate` . This is the default except on NumPyro.
+- ``"vmap"`` maps the seeded model over a batch of PRNG keys with
+  :func:`jax.vmap` . This is the default on NumPyro.
+- ``"loop"`` runs the model once per seed and stacks the results. This is used
+  when the backend does not implement the default method or the model does not
+  broadcast over the batch dim.
+
+The minipyro and funsor backends are not supported: minipyro's sample sites
+are not recorded by the Pyro handlers it dispatches to, and funsor
+distributions have no batch shape nor stackable samples.
+"""
+
+from collections import OrderedDict
+
+from pyroapi.dispatch import _current_backends, handlers, ops, pyro
+
+METHODS = ('plate', 'vmap', 'loop')
+# Backends whose sample sites cannot be traced and stacked, see above.
+_UNSUPPORTED = ('pyro.contrib.minipyro', 'funsor.minipyro')
+
+
+def _sample_sites(trace):
+    # Pyro records plate subsample indices as sample sites of type _Subsample.
+    return [site for site in getattr(trace, 'nodes', trace).values()
+            if site['type'] == 'sample' and not site.get('is_observed', False)
+            and type(site['fn']).__name__ != '_Subsample']
+
+
+def _trace(model, rng_seed, args, kwargs):
+    return handlers.trace(handlers.seed(model, rng_seed=rng_seed)).get_trace(*args, **kwargs)
+
+
+def _sample_plate(model, num_samples, args, kwargs, rng_seed, max_plate_nesting, data):
+    sites = _sample_sites(_trace(model, rng_seed, args, kwargs))
+    if max_plate_nesting is None:
+        max_plate_nesting = max([len(site['fn'].batch_shape) for site in sites], default=0)
+
+    def vectorized_model(*args, **kwargs):
+        with pyro.plate('_num_samples', num_samples, dim=-max_plate_nesting - 1):
+            return model(*args, **kwargs)
+
+    if data:
+        # Align batched values with the batch plate, left of any plate dims.
+        reshaped_data = {}
+        for site in sites:
+            if site['name'] in data:
+                shape = tuple(site['value'].shape)
+                append_ndim = max_plate_nesting - len(site['fn'].batch_shape)
+                reshaped_data[site['name']] = data[site['name']].reshape((num_samples,) + (1,) * append_ndim + shape)
+        vectorized_model = handlers.condition(vectorized_model, data=reshaped_data)
+
+    trace = _trace(vectorized_model, rng_seed, args, kwargs)
+    nodes = getattr(trace, 'nodes', trace)
+    samples = OrderedDict()
+    for site in sites:
+        if site['name'] in data:
+            continue
+        value = nodes[site['name']]['value']
+        shape = tuple(site['value'].shape)
+        # Sites batched over dims other than the declared plates do not line up
+        # with the batch plate, e.g. latent vectors with an unplated batch dim.
+        expected_shape = (num_samples,) + (1,) * (max_plate_nesting - len(site['fn'].batch_shape)) + shape
+        if tuple(value.shape) != expected_shape:
+            raise ValueError('Site {} has vectorized shape {}, expected {}'.format(
+                site['name'], tuple(value.shape), expected_shape))
+        samples[site['name']] = value.reshape((num_samples,) + shape)
+    return samples
+
+
+def _sample_vmap(model, num_samples, args, kwargs, rng_seed, data):
+    import jax
+
+    def single(rng_key, data):
+        conditioned_model = handlers.condition(model, data=data) if data else model
+        return OrderedDict((site['name'], site['value'])
+                           for site in _sample_sites(_trace(conditioned_model, rng_key, args, kwargs))
+                           if site['name'] not in data)
+
+    rng_keys = jax.random.split(jax.random.PRNGKey(rng_seed), num_samples)
+    return jax.vmap(single)(rng_keys, data)
+
+
+def _sample_loop(model, num_samples, args, kwargs, rng_seed, data):
+    samples = OrderedDict()
+    for i in range(num_samples):
+        conditioned_model = model
+        if data:
+            conditioned_model = handlers.condition(model, data={name: value[i] for name, value in data.items()})
+        for site in _sample_sites(_trace(conditioned_model, rng_seed + i, args, kwargs)):
+            if site['name'] not in data:
+                samples.setdefault(site['name'], []).append(site['value'])
+    return OrderedDict((name, ops.stack(values)) for name, values in samples.items())
+
+
+def default_method():
+    """
+    Returns the default vectorization method of the current backend.
+
+    :rtype: str
+    """
+    return 'vmap' if dict(_current_backends())['pyro'].startswith('numpyro') else 'plate'
+
+
+def vectorized_sample(model, num_samples, model_args=(), model_kwargs=None, rng_seed=0, method=None,
+                      max_plate_nesting=None, data=None):
+    """
+    Draws the latent sample sites of ``model`` under ``num_samples``
+    independent random seeds in a single vectorized call.
+
+    If ``data`` is provided, the ``i`` th run is conditioned on the ``i`` th
+    value of each of its entries, and these sites are omitted from the output.
+
+    :param callable model: A backend-agnostic model.
+    :param int num_samples: Number of independent runs of the model.
+    :param tuple model_args: Positional arguments to the model.
+    :param dict model_kwargs: Keyword arguments to the model.
+    :param int rng_seed: Base random seed.
+    :param str method: One of :data:`METHODS` . Defaults to
+        :func:`default_method` , falling back to "loop" if the backend raises
+        :class:`NotImplementedError` or the model does not vectorize, e.g.
+        raises a shape error.
+    :param int max_plate_nesting: Number of plate dims in the model, used by the
+        "plate" method. Defaults to the largest batch rank of any sample site.
+    :param dict data: An optional dict mapping site names to values with
+        leading dimension ``num_samples`` .
+    :returns: A dict mapping site names to values with leading dimension
+        ``num_samples`` .
+    :rtype: dict
+    """
+    backend = dict(_current_backends())['pyro']
+    if backend in _UNSUPPORTED:
+        raise NotImplementedError('vectorized_sample is not supported by the {} backend'.format(backend))
+    model_kwargs = model_kwargs or {}
+    data = data or {}
+    if method is None:
+        method = default_method()
+        try:
+            return vectorized_sample(model, num_samples, model_args, model_kwargs, rng_seed, method,
+                                     max_plate_nesting, data)
+        except (NotImplementedError, RuntimeError, TypeError, ValueError):
+            # Models that do not broadcast over the batch dim fail with shape
+            # errors. Genuine errors of the model are raised again by "loop".
+            method = 'loop'
+    if method == 'plate':
+        return _sample_plate(model, num_samples, model_args, model_kwargs, rng_seed, max_plate_nesting, data)
+    if method == 'vmap':
+        return _sample_vmap(model, num_samples, model_args, model_kwargs, rng_seed, data)
+    if method == 'loop':
+        return _sample_loop(model, num_samples, model_args, model_kwargs, rng_seed, data)
+    raise ValueError('Unknown method {}, expected one of {}'.format(method, METHODS))
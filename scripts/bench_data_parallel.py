@@ -0,0 +1,57 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark of data-parallel SVI throughput against the number of workers, on
+a logistic regression over synthetic data.
+
+Usage::
+
+    python scripts/bench_data_parallel.py --backend pyro --num-data 100000 --workers 1 2 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from pyroapi import distributions as dist
+from pyroapi import ops, pyro, pyro_backend
+from pyroapi.minibatch import subsample_plate
+from pyroapi.parallel import DataParallelSVI
+
+
+def model(size, x=None, y=None):
+    coefs = pyro.param('coefs', ops.zeros(x.shape[-1]))
+    with subsample_plate('data', size, len(y)):
+        pyro.sample('obs', dist.Bernoulli(logits=ops.sum(coefs * x, -1)), obs=y)
+
+
+def guide(size, x=None, y=None):
+    pass
+
+
+def main(args):
+    rng = np.random.RandomState(0)
+    x = rng.randn(args.num_data, args.dim).astype(np.float32)
+    y = (rng.rand(args.num_data) < 1 / (1 + np.exp(-x.sum(-1)))).astype(np.float32)
+    for num_workers in args.workers:
+        with pyro_backend(args.backend):
+            with DataParallelSVI(model, guide, 'Adam', {'lr': 1e-2}, data={'x': x, 'y': y}, plate='data',
+                                 model_args=(args.num_data,), num_workers=num_workers) as svi:
+                svi.run(5)  # compile and warm up
+                start = time.perf_counter()
+                svi.run(args.num_steps)
+                elapsed = time.perf_counter() - start
+        print('{: <8} {: >2} workers {: >8.1f} steps/s'.format(args.backend, num_workers, args.num_steps / elapsed))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Data-parallel SVI benchmark')
+    parser.add_argument('-b', '--backend', default='pyro')
+    parser.add_argument('-n', '--num-data', default=100000, type=int)
+    parser.add_argument('-d', '--dim', default=50, type=int)
+    parser.add_argument('-s', '--num-steps', default=100, type=int)
+    parser.add_argument('-w', '--workers', default=[1, 2, 4], nargs='+', type=int)
+    args = parser.parse_args()
+    main(args)
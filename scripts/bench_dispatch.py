@@ -0,0 +1,47 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Microbenchmark of per-attribute dispatch overhead in :class:`GenericModule`.
+
+Usage::
+
+    python scripts/bench_dispatch.py --num-calls 1000000
+"""
+
+import argparse
+import math
+import timeit
+
+from pyroapi.dispatch import BackendNamespace, GenericModule, _BackendCache
+
+
+def main(args):
+    generic = GenericModule('bench_math', 'math')
+    scratch = _BackendCache('math')
+    api = BackendNamespace([('bench_math', 'math')])
+
+    def native():
+        math.sqrt
+
+    def uncached():
+        GenericModule._resolve(generic, scratch, 'sqrt')
+
+    def cached():
+        generic.sqrt
+
+    def namespace():
+        api.bench_math.sqrt
+
+    baseline = timeit.timeit(lambda: None, number=args.num_calls)
+    for name, fn in [('native', native), ('uncached', uncached), ('cached', cached),
+                     ('namespace', namespace)]:
+        elapsed = timeit.timeit(fn, number=args.num_calls) - baseline
+        print('{: <10} {: >8.1f} ns/attr'.format(name, 1e9 * elapsed / args.num_calls))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Dispatch overhead microbenchmark')
+    parser.add_argument('-n', '--num-calls', default=1000000, type=int)
+    args = parser.parse_args()
+    main(args)
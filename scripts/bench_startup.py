@@ -0,0 +1,52 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Benchmark of cold-start time for a short-lived worker that only uses
+``distributions`` and ``ops`` . With ``--verbose`` , the import report of
+each backend shows which first use imported which backend module.
+
+Usage::
+
+    python scripts/bench_startup.py --backend pyro --backend numpy --repeats 3
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+WORKER = """
+from pyroapi import distributions as dist
+from pyroapi import import_report, ops, pyro_backend
+
+with pyro_backend({alias!r}):
+    dist.Normal(ops.zeros(3), 1.)
+if {verbose!r}:
+    print(import_report())
+"""
+
+
+def run_worker(alias, verbose=False):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', WORKER.format(alias=alias, verbose=verbose)], check=True)
+    return time.perf_counter() - start
+
+
+def main(args):
+    for alias in args.backends:
+        run_worker(alias)  # warm the filesystem cache
+        elapsed = min(run_worker(alias) for _ in range(args.repeats))
+        print('{: <10} {: >8.0f} ms'.format(alias, 1e3 * elapsed))
+        if args.verbose:
+            run_worker(alias, verbose=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Worker cold-start benchmark')
+    parser.add_argument('-b', '--backend', action='append', dest='backends')
+    parser.add_argument('-r', '--repeats', default=3, type=int)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+    args.backends = args.backends or ['pyro', 'numpy']
+    main(args)
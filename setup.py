@@ -30,6 +30,7 @@ setup(
     url='https://github.com/pyro-ppl/pyro-api',
     author='Uber AI Labs',
     author_email='npradhan@uber.com',
+    python_requires='>=3.8',
     install_requires=[],
     extras_require={
         # PyPi does not like @ versions,
@@ -59,6 +60,6 @@ setup(
         'License :: OSI Approved :: Apache Software License',
         'Operating System :: POSIX :: Linux',
         'Operating System :: MacOS :: MacOS X',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.8',
     ],
 )
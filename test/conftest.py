@@ -3,6 +3,31 @@
 
 import pytest
 
+# Packages required by each backend.
+PACKAGE_NAME = {
+    "pyro": "pyro",
+    "minipyro": "pyro",
+    "numpy": "numpyro",
+    "funsor": "funsor",
+    "mock": "pyroapi",
+}
+
+
+@pytest.fixture
+def isolated_registry(monkeypatch):
+    """
+    Drops the backend aliases and generic modules registered by a test.
+    """
+    from pyroapi.dispatch import _ALIASES, GenericModule
+
+    # GenericModule.current_backend is a view of _backend_vars.
+    monkeypatch.setattr(GenericModule, "_backend_vars", GenericModule._backend_vars.copy())
+    # Other modules import the _ALIASES dict itself, so it is restored in place.
+    aliases = _ALIASES.copy()
+    yield
+    _ALIASES.clear()
+    _ALIASES.update(aliases)
+
 
 def pytest_configure(config):
     try:
@@ -0,0 +1,95 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import time
+
+import pytest
+from conftest import PACKAGE_NAME
+
+from pyroapi import distributions as dist
+from pyroapi import infer, ops, optim, pyro, pyro_backend
+from pyroapi.aio import AsyncStream, mcmc_samples, svi_steps
+from pyroapi.dispatch import _current_backends
+
+
+def test_backpressure_and_cancel():
+    produced = []
+
+    def run(emit):
+        for i in range(100):
+            produced.append(i)
+            emit(i)
+
+    async def consume():
+        stream = AsyncStream(run, buffer_size=2)
+        async with stream:
+            assert await stream.__anext__() == 0
+            await asyncio.sleep(0.2)
+            # The worker is blocked after filling the buffer.
+            assert len(produced) == 4
+        assert len(produced) == 4
+        async for _ in stream:
+            pass
+
+    asyncio.run(consume())
+
+
+def test_error():
+    def run(emit):
+        emit(0)
+        raise ValueError("boom")
+
+    async def consume():
+        stream = AsyncStream(run)
+        assert [value async for value in _take(stream, 1)] == [0]
+        with pytest.raises(ValueError, match="boom"):
+            await stream.__anext__()
+
+    asyncio.run(consume())
+
+
+async def _take(stream, n):
+    for _ in range(n):
+        yield await stream.__anext__()
+
+
+def model(data):
+    loc = pyro.sample("loc", dist.Normal(0., 1.))
+    with pyro.plate("data", data.shape[0], dim=-1):
+        pyro.sample("obs", dist.Normal(loc, 1.), obs=data)
+
+
+def guide(data):
+    loc = pyro.param("loc_q", ops.tensor(0.))
+    pyro.sample("loc", dist.Normal(loc, 1.))
+
+
+@pytest.mark.parametrize("backend", ["pyro", "numpy"])
+def test_concurrent_jobs(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    num_steps, num_samples = 5, 4
+
+    async def fit():
+        with pyro_backend(backend):
+            expected = dict(_current_backends())
+            data = ops.zeros(3)
+            pyro.get_param_store().clear()
+            svi = infer.SVI(model, guide, optim.Adam({"lr": 1e-3}), infer.Trace_ELBO())
+            steps = svi_steps(svi, num_steps, model_args=(data,))
+            samples = mcmc_samples(infer.NUTS(model), num_samples, 2, model_args=(data,))
+        assert dict(_current_backends()) != expected or backend == "pyro"
+        losses, draws = await asyncio.gather(_collect(steps), _collect(samples))
+        assert len(losses) == num_steps
+        assert len(draws) == num_samples
+        assert all(set(draw) == {"loc"} for draw in draws)
+
+    asyncio.run(fit())
+
+
+async def _collect(stream):
+    start = time.perf_counter()
+    async with stream:
+        values = [value async for value in stream]
+    assert time.perf_counter() - start < 60
+    return values
@@ -0,0 +1,70 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from pyroapi import distributions as dist
+from pyroapi import ops, pyro, pyro_backend
+from pyroapi.autoselect import _SELECTED, autoselect_backend, probe_backends, select_backend
+from pyroapi.dispatch import _ALIASES, _current_backends, register_backend
+
+
+def model(data):
+    loc = pyro.param("loc", ops.tensor(0.0))
+    with pyro.plate("data", data.shape[0], dim=-1):
+        pyro.sample("x", dist.Normal(loc, 1.), obs=data)
+
+
+def test_autoselect_backend():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pyro")
+    data = np.zeros(10, dtype=np.float32)
+    candidates = ["pyro", "minipyro", "numpy"]
+
+    with pyro_backend("pyro"):
+        pyro.get_param_store().clear()
+        pyro.param("scale", ops.tensor(2.0), constraint=dist.constraints.positive)
+        times = probe_backends(model, (data,), candidates=candidates, num_steps=2)
+        # The caller's params are kept.
+        assert list(pyro.get_param_store().keys()) == ["scale"]
+        assert pyro.param("scale").item() == 2.0
+        pyro.get_param_store().clear()
+    assert list(times) == candidates
+    assert isinstance(times["pyro"], float)
+    assert all(isinstance(t, (float, Exception)) for t in times.values())
+
+    _SELECTED.clear()
+    alias = select_backend(model, (data,), candidates=candidates, num_steps=2)
+    assert isinstance(times[alias], float)
+    assert len(_SELECTED) == 1
+    # Same input shapes hit the cache.
+    assert select_backend(model, (np.ones(10, dtype=np.float32),), candidates=candidates, num_steps=2) == alias
+    assert len(_SELECTED) == 1
+
+    with autoselect_backend(model, (data,), candidates=candidates, num_steps=2):
+        assert dict(_current_backends())["pyro"] == _ALIASES[alias]["pyro"]
+
+
+def test_no_candidates():
+    with pytest.raises(NotImplementedError):
+        select_backend(model, (), candidates=[])
+
+
+def test_model_errors_are_raised():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pyro")
+
+    def buggy_model(data):
+        return undefined_name  # noqa: F821
+
+    with pytest.raises(NameError):
+        probe_backends(buggy_model, (np.zeros(10, dtype=np.float32),), candidates=["pyro"])
+
+
+def test_unsupported_causes(isolated_registry):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pyro")
+    register_backend("autoselect_test", {"infer": "pyroapi.mock.nonexistent"})
+    with pytest.raises(NotImplementedError, match="autoselect_test: ") as info:
+        select_backend(model, (np.zeros(10, dtype=np.float32),), candidates=["autoselect_test"])
+    assert isinstance(info.value.__cause__, ImportError)
@@ -0,0 +1,65 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+
+import pytest
+
+from pyroapi import pyro, pyro_backend
+from pyroapi.benchmarks import run_benchmarks
+from pyroapi.benchmarks.suite import STAGES, benchmark_model
+from pyroapi.testing import MODELS
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_run_benchmarks(model):
+    pytest.importorskip('pyro')
+    results = run_benchmarks(models=[model], backends=['pyro'], num_steps=1, num_warmup=1,
+                             num_samples=1, repeats=1, isolate=False)
+    json.dumps(results)
+    stages = [record['stage'] for record in results['results']]
+    assert stages == list(STAGES)
+    for record in results['results']:
+        assert record['model'] == model
+        assert record['backend'] == 'pyro'
+        assert 'times' in record or 'error' in record
+    timed = [record['stage'] for record in results['results'] if 'times' in record]
+    assert {'model', 'trace', 'svi', 'mcmc_warmup', 'mcmc_sample'} <= set(timed), results['results']
+
+
+def test_benchmark_stages():
+    pytest.importorskip('pyro')
+    results = benchmark_model('eight_schools', 'pyro', num_steps=2, num_warmup=2, num_samples=2, repeats=2,
+                              stages=('svi', 'mcmc_warmup', 'mcmc_sample'))
+    for stage in ['svi', 'mcmc_warmup', 'mcmc_sample']:
+        assert len(results[stage]['times']) == 2, results[stage]
+    with pyro_backend('pyro'):
+        assert {'mu_map', 'tau_map', 'theta_map'} <= set(pyro.get_param_store().keys())
+        pyro.get_param_store().clear()
+
+
+def test_isolate():
+    pytest.importorskip('pyro')
+    results = run_benchmarks(models=['eight_schools', 'neals_funnel'], backends=['pyro'], num_steps=1,
+                             num_warmup=1, num_samples=1, repeats=1, stages=('model',))
+    assert [record['model'] for record in results['results']] == ['eight_schools', 'neals_funnel']
+    assert all(record['max_rss'] > 0 for record in results['results'])
+
+
+def test_benchmark_cache_dir(tmpdir):
+    pytest.importorskip('pyro')
+    pytest.importorskip('numpy')
+    results = run_benchmarks(models=['eight_schools'], backends=['pyro'], repeats=1, stages=('model',),
+                             isolate=False, cache_dir=str(tmpdir))
+    assert 'times' in results['results'][0]
+    assert results['options']['cache_dir'] == str(tmpdir)
+    assert [path.startswith('eight_schools-') for path in os.listdir(str(tmpdir))] == [True]
+
+
+def test_benchmark_mcmc_numpy():
+    pytest.importorskip('numpyro')
+    results = benchmark_model('eight_schools', 'numpy', num_warmup=2, num_samples=2, repeats=2,
+                              stages=('mcmc_warmup', 'mcmc_sample'))
+    for stage in ['mcmc_warmup', 'mcmc_sample']:
+        assert len(results[stage]['times']) == 2, results[stage]
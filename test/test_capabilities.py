@@ -0,0 +1,59 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+
+import pytest
+
+from pyroapi import capabilities as caps
+from pyroapi import infer, pyro_backend
+from pyroapi.dispatch import GenericModule, register_backend
+
+
+def test_supports(monkeypatch, tmpdir, isolated_registry):
+    monkeypatch.setenv('PYROAPI_CACHE_DIR', str(tmpdir))
+    monkeypatch.setattr(caps, '_CAPABILITIES', {})
+    GenericModule('capabilities_test', 'math')
+    register_backend('capabilities_test', {'capabilities_test': 'cmath', 'ops': 'nonexistent_backend'})
+
+    assert caps.supports('capabilities_test', 'capabilities_test.sqrt')
+    assert not caps.supports('capabilities_test', 'capabilities_test.nonexistent_primitive')
+    assert not caps.supports('capabilities_test', 'ops.tensor')
+    assert not caps.capabilities('capabilities_test')['ops.zeros']
+    assert 'capabilities_test' in caps.capable_aliases('capabilities_test.sqrt')
+
+    # Results are persisted, including names probed on demand.
+    with open(os.path.join(str(tmpdir), 'capabilities.json')) as f:
+        cache = json.load(f)
+    (result,) = [value for key, value in cache.items() if json.loads(key)['alias'] == 'capabilities_test']
+    assert result['capabilities_test.sqrt'] is True
+
+    # A new process reads the disk cache instead of probing.
+    with monkeypatch.context() as m:  # conftest.py may run the test body twice
+        m.setattr(caps, '_CAPABILITIES', {})
+        m.setattr(caps, '_probe', None)
+        assert caps.supports('capabilities_test', 'capabilities_test.sqrt')
+
+
+def test_supports_submodules(monkeypatch, tmpdir):
+    pytest.importorskip('pyro')
+    monkeypatch.setenv('PYROAPI_CACHE_DIR', str(tmpdir))
+    monkeypatch.setattr(caps, '_CAPABILITIES', {})
+
+    # Submodules not imported by their package are resolved as by dispatch.
+    assert caps.supports('pyro', 'infer.reparam')
+    assert caps.supports('pyro', 'infer.reparam.LocScaleReparam')
+    with pyro_backend('pyro'):
+        assert infer.reparam.LocScaleReparam
+
+
+def test_supports_broken_backend(monkeypatch, tmpdir, isolated_registry):
+    monkeypatch.setenv('PYROAPI_CACHE_DIR', str(tmpdir))
+    monkeypatch.setattr(caps, '_CAPABILITIES', {})
+    tmpdir.join('capabilities_broken_backend.py').write('raise RuntimeError("broken")\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    register_backend('capabilities_broken', {'ops': 'capabilities_broken_backend'})
+
+    assert not caps.supports('capabilities_broken', 'ops.tensor')
+    assert not caps.capabilities('capabilities_broken')['ops.zeros']
@@ -0,0 +1,16 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from pyroapi.conformance import collect_tests, run_conformance
+
+
+def test_run_conformance():
+    pytest.importorskip('pyro')
+    test_ids = collect_tests()
+    report = run_conformance(['pyro', 'minipyro'], workers_per_backend=2)
+    for alias in ['pyro', 'minipyro']:
+        results = [result for result in report['results'] if result['backend'] == alias]
+        assert len(results) == len(test_ids)
+        assert 'error' not in report['summary'][alias]
@@ -1,17 +1,14 @@
 # Copyright Contributors to the Pyro project.
 # SPDX-License-Identifier: Apache-2.0
 
-import pytest
+import importlib
 
-from pyroapi import handlers, infer, pyro, pyro_backend, register_backend
-from pyroapi.testing import MODELS
+import pytest
+from conftest import PACKAGE_NAME
 
-PACKAGE_NAME = {
-    "pyro": "pyro",
-    "minipyro": "pyro",
-    "numpy": "numpyro",
-    "funsor": "funsor",
-}
+from pyroapi import handlers, infer, pyro, pyro_backend, register_backend, testing
+from pyroapi.dispatch import _ALIASES
+from pyroapi.testing import MODEL_SIZES, MODELS, clear_model_cache, load_model
 
 
 @pytest.mark.filterwarnings("ignore", category=UserWarning)
@@ -41,6 +38,15 @@ def test_not_implemented(backend):
             pyro.nonexistent_primitive
 
 
+@pytest.mark.parametrize('backend', ['funsor', 'minipyro', 'numpy', 'pyro'])
+def test_backend_namespace(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    with pyro_backend(backend) as api:
+        assert api.pyro is importlib.import_module(_ALIASES[backend]['pyro'])
+        assert api.dist is importlib.import_module(_ALIASES[backend]['distributions'])
+        assert api.pyro.sample is pyro.sample
+
+
 @pytest.mark.parametrize('model', MODELS)
 @pytest.mark.parametrize("backend", ["pyro", "minipyro", "numpy", "funsor"])
 @pytest.mark.xfail(reason='Not supported by backend.')
@@ -69,7 +75,7 @@ def test_trace_handler(model, backend):
 
 
 @pytest.mark.parametrize('model', MODELS)
-def test_register_backend(model):
+def test_register_backend(model, isolated_registry):
     pytest.importorskip("pyro")
     register_backend("foo", {
         "infer": "pyro.contrib.minipyro",
@@ -80,3 +86,65 @@ def test_register_backend(model):
         f = MODELS[model]()
         model, model_args, model_kwargs = f['model'], f.get('model_args', ()), f.get('model_kwargs', {})
         handlers.trace(model).get_trace(*model_args, **model_kwargs)
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_load_model(model, tmpdir):
+    pytest.importorskip("pyro")
+    clear_model_cache()
+    with pyro_backend("pyro"):
+        expected = MODELS[model]()
+        actual = load_model(model)
+        assert load_model(model)['model_args'] is actual['model_args']  # memoized
+        assert len(actual['model_args']) == len(expected['model_args'])
+        for key, value in expected.get('model_kwargs', {}).items():
+            assert (actual['model_kwargs'][key] == value).all()
+
+        pytest.importorskip("numpy")
+        clear_model_cache()
+        load_model(model, cache_dir=str(tmpdir))
+        clear_model_cache()
+        cached = load_model(model, cache_dir=str(tmpdir))
+        for key, value in expected.get('model_kwargs', {}).items():
+            assert (cached['model_kwargs'][key] == value).all()
+        handlers.trace(cached['model']).get_trace(*cached['model_args'], **cached.get('model_kwargs', {}))
+
+
+def test_load_model_memory_mapped(tmpdir, monkeypatch):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("torch")
+    maps = []
+    load = np.load
+    monkeypatch.setattr(np, "load", lambda *args, **kwargs: maps.append(load(*args, **kwargs)) or maps[-1])
+
+    clear_model_cache()
+    with pyro_backend("pyro"):
+        load_model("logistic_regression", cache_dir=str(tmpdir))
+        clear_model_cache()
+        cached = load_model("logistic_regression", cache_dir=str(tmpdir))
+    clear_model_cache()
+    assert all(isinstance(x, np.memmap) for x in maps)
+    assert cached["model_kwargs"]["y"].data_ptr() in [x.ctypes.data for x in maps]
+
+
+def test_model_cache_size(monkeypatch):
+    pytest.importorskip("pyro")
+    monkeypatch.setattr(testing, "MODEL_CACHE_SIZE", 1)
+    clear_model_cache()
+    with pyro_backend("pyro"):
+        f = load_model("eight_schools")
+        assert load_model("eight_schools")["model_args"] is f["model_args"]
+        load_model("neals_funnel")  # evicts eight_schools
+        assert load_model("eight_schools")["model_args"] is not f["model_args"]
+    clear_model_cache()
+
+
+@pytest.mark.parametrize('model', MODEL_SIZES)
+@pytest.mark.parametrize('scale', [1, 3])
+def test_scalable_model(model, scale):
+    pytest.importorskip("pyro")
+    sizes = {name: default * scale for name, default in MODEL_SIZES[model].items()}
+    with pyro_backend("pyro"):
+        f = load_model(model, **sizes)
+        trace = handlers.trace(f['model']).get_trace(*f['model_args'], **f['model_kwargs'])
+    assert trace.nodes['obs']['value'].shape[0] == sizes['N']
@@ -0,0 +1,196 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import cmath
+import importlib
+import math
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyroapi import dispatch
+from pyroapi.dispatch import (
+    BackendNamespace,
+    GenericModule,
+    _current_backends,
+    _set_backends,
+    clear_cache,
+    import_report,
+    import_times,
+    prewarm,
+    register_backend,
+)
+
+pytestmark = pytest.mark.usefixtures("isolated_registry")
+
+
+def test_cache_invalidation():
+    generic = GenericModule('cache_test', 'math')
+    assert generic.sqrt is math.sqrt
+    assert generic.sqrt is math.sqrt
+
+    with _set_backends({'cache_test': 'cmath'}):
+        assert generic.sqrt is cmath.sqrt
+    assert generic.sqrt is math.sqrt
+
+    cached = GenericModule._caches['math']
+    register_backend('cache_test_alias', {'cache_test': 'cmath'})  # bumps the epoch
+    assert 'sqrt' not in cached
+    assert generic.sqrt is math.sqrt
+
+
+def test_clear_cache(monkeypatch):
+    generic = GenericModule('cache_test', 'math')
+    assert generic.sqrt is math.sqrt
+
+    def sqrt(x):
+        return x
+
+    with monkeypatch.context() as m:  # undo() would also undo isolated_registry
+        m.setattr(math, 'sqrt', sqrt)
+        assert generic.sqrt is not sqrt  # cached
+        clear_cache()
+        assert generic.sqrt is sqrt
+    clear_cache()
+    assert generic.sqrt is math.sqrt
+
+
+def test_not_implemented_is_not_cached():
+    generic = GenericModule('cache_test', 'math')
+    for _ in range(2):
+        with pytest.raises(NotImplementedError):
+            generic.nonexistent_primitive
+
+
+def test_prewarm():
+    register_backend('prewarm_test', {'prewarm_test': 'json'})
+    prewarm('prewarm_test')
+    assert 'json' in GenericModule._modules
+    assert import_times()['json'] >= 0
+
+    register_backend('prewarm_test', {'prewarm_test': 'csv'})
+    thread = prewarm('prewarm_test', background=True)
+    thread.join()
+    assert 'csv' in GenericModule._modules
+
+
+def _check_backend(generic, backend, expected, num_iters=1000):
+    with _set_backends({'concurrency_test': backend}):
+        for _ in range(num_iters):
+            assert generic.sqrt is expected
+    return True
+
+
+def test_threads_use_separate_backends():
+    generic = GenericModule('concurrency_test', 'math')
+    jobs = [('math', math.sqrt), ('cmath', cmath.sqrt)] * 16
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(_check_backend, generic, backend, expected)
+                   for backend, expected in jobs]
+        assert all(future.result() for future in futures)
+    assert generic.sqrt is math.sqrt
+
+
+def test_tasks_use_separate_backends():
+    generic = GenericModule('concurrency_test', 'math')
+
+    async def check(backend, expected):
+        with _set_backends({'concurrency_test': backend}):
+            for _ in range(100):
+                assert generic.sqrt is expected
+                await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(*[check(backend, expected)
+                               for backend, expected in [('math', math.sqrt), ('cmath', cmath.sqrt)] * 8])
+
+    asyncio.run(main())
+    assert generic.sqrt is math.sqrt
+
+
+def test_current_backend():
+    GenericModule('current_test', 'math')
+    assert GenericModule.current_backend['current_test'] == 'math'
+    with _set_backends({'current_test': 'cmath'}):
+        assert GenericModule.current_backend['current_test'] == 'cmath'
+        assert dict(_current_backends()) == GenericModule.current_backend.copy()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(GenericModule.current_backend.get, 'current_test').result() == 'math'
+    assert GenericModule.current_backend['current_test'] == 'math'
+    with pytest.raises(TypeError):
+        GenericModule.current_backend['current_test'] = 'cmath'
+
+
+def _trace_model(backend, barrier, num_iters=20):
+    from pyroapi import distributions as dist
+    from pyroapi import handlers, ops, pyro, pyro_backend
+
+    def model():
+        loc = pyro.sample('loc', dist.Normal(0., 1.))
+        with pyro.plate('plate', 3, dim=-1):
+            pyro.sample('x', dist.Normal(loc, 1.), obs=ops.zeros(3))
+
+    barrier.wait()
+    types = set()
+    with pyro_backend(backend):
+        for i in range(num_iters):
+            trace = handlers.trace(handlers.seed(model, rng_seed=i)).get_trace()
+            nodes = getattr(trace, 'nodes', trace)
+            assert [name for name, site in nodes.items() if site['type'] == 'sample'
+                    and type(site['fn']).__name__ != '_Subsample'] == ['loc', 'x']
+            types.add(type(nodes['loc']['value']).__module__.split('.')[0])
+    return types
+
+
+def test_threads_trace_different_backends():
+    # Each backend has its own global handler stack, so a pyro and a numpy
+    # model can be traced at the same time, though two pyro models cannot.
+    pytest.importorskip('pyro')
+    pytest.importorskip('numpyro')
+    barrier = threading.Barrier(2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pyro_types = executor.submit(_trace_model, 'pyro', barrier)
+        numpy_types = executor.submit(_trace_model, 'numpy', barrier)
+        assert pyro_types.result() == {'torch'}
+        assert numpy_types.result() <= {'jax', 'jaxlib'}
+
+
+def test_backend_namespace():
+    GenericModule('namespace_test', 'math')
+    with _set_backends({'namespace_test': 'cmath'}):
+        api = BackendNamespace(_current_backends())
+    assert api.namespace_test is cmath
+    assert 'namespace_test' in vars(api)  # bound after first access
+    with pytest.raises(AttributeError):
+        api.nonexistent_module
+    with pytest.raises(AttributeError):
+        api.namespace_test = math
+
+
+def test_lazy_submodules():
+    generic = GenericModule('submodule_test', 'xml')
+    assert generic.dom is sys.modules['xml.dom']
+    assert 'xml.dom' in import_report()
+    with pytest.raises(NotImplementedError):
+        generic.nonexistent_submodule
+
+
+def test_missing_attributes_not_imported(monkeypatch):
+    monkeypatch.setattr(dispatch, '_MISSING_SUBMODULES', set())
+    imported = []
+    import_module = importlib.import_module
+    monkeypatch.setattr(importlib, 'import_module', lambda name: imported.append(name) or import_module(name))
+
+    generic = GenericModule('missing_test', 'xml')
+    for _ in range(2):
+        with pytest.raises(NotImplementedError):
+            generic.missing_submodule
+    assert imported.count('xml.missing_submodule') == 1
+
+    generic = GenericModule('missing_test', 'math')  # not a package
+    with pytest.raises(NotImplementedError):
+        generic.missing_submodule
+    assert 'math.missing_submodule' not in imported
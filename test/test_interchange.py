@@ -0,0 +1,68 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+from collections import OrderedDict, namedtuple
+
+import pytest
+
+from pyroapi import pyro_backend
+from pyroapi.interchange import to_backend
+
+Point = namedtuple("Point", ["x", "y"])
+
+
+def test_torch_to_numpy_zero_copy():
+    np = pytest.importorskip("numpy")
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("numpyro")
+
+    x = torch.arange(6.).reshape(2, 3)
+    y = to_backend(x, "numpy")
+    assert type(y).__module__.split(".")[0] in ("jax", "jaxlib")
+    assert np.allclose(np.asarray(y), x.numpy())
+    assert y.unsafe_buffer_pointer() == x.data_ptr()
+
+
+def test_read_only_copied(tmpdir):
+    np = pytest.importorskip("numpy")
+    torch = pytest.importorskip("torch")
+
+    path = str(tmpdir.join("x.npy"))
+    np.save(path, np.arange(3.))
+    x = np.load(path, mmap_mode="r")
+    y = to_backend(x, "pyro")
+    assert isinstance(y, torch.Tensor)
+    assert y.data_ptr() != x.ctypes.data
+    y.add_(1.)  # would write to read-only pages if shared
+    assert np.array_equal(x, np.arange(3.))
+
+
+def test_nested_structure():
+    np = pytest.importorskip("numpy")
+    torch = pytest.importorskip("torch")
+
+    x = np.arange(3.)
+    value = OrderedDict([("args", (x, 10)), ("kwargs", {"y": [x, "label"]}), ("point", Point(x, None))])
+    with pyro_backend("pyro"):
+        result = to_backend(value)
+    assert isinstance(result, OrderedDict)
+    assert isinstance(result["args"][0], torch.Tensor)
+    assert result["args"][1] == 10
+    assert isinstance(result["kwargs"]["y"][0], torch.Tensor)
+    assert result["kwargs"]["y"][1] == "label"
+    assert isinstance(result["point"], Point)
+    assert result["point"].y is None
+
+    # Memory is shared with the numpy array.
+    x[0] = 5.
+    assert result["args"][0][0].item() == 5.
+
+
+def test_gradients_detached():
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("numpyro")
+
+    x = torch.ones(3, requires_grad=True)
+    assert to_backend(x, "pyro") is x
+    y = to_backend({"x": x}, "numpy")
+    assert type(y["x"]).__module__.split(".")[0] in ("jax", "jaxlib")
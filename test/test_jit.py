@@ -0,0 +1,83 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from conftest import PACKAGE_NAME
+
+from pyroapi import distributions as dist
+from pyroapi import ops, optim, pyro, pyro_backend
+from pyroapi.svi import SVI, make_elbo
+
+# Recent torch versions deprecate torch.jit.trace, used by the Jit* ELBOs.
+pytestmark = pytest.mark.filterwarnings("ignore:`torch.jit.trace` is deprecated:FutureWarning")
+
+EXPECTED_JIT_PATH = {
+    ("pyro", False): None,
+    ("pyro", True): "torch.jit",
+    ("minipyro", False): None,
+    ("minipyro", True): "torch.jit",
+    ("numpy", False): "jax.jit",
+    ("numpy", True): "jax.jit",
+}
+
+
+@pytest.mark.parametrize("jit", [False, True], ids=["py", "jit"])
+@pytest.mark.parametrize("backend", ["pyro", "minipyro", "numpy"])
+def test_jit_path(backend, jit):
+    pytest.importorskip(PACKAGE_NAME[backend])
+
+    def model(data):
+        loc = pyro.param("loc", ops.tensor(0.0))
+        pyro.sample("x", dist.Normal(loc, 1.), obs=data)
+
+    def guide(data):
+        pass
+
+    with pyro_backend(backend):
+        pyro.get_param_store().clear()
+        svi = SVI(model, guide, optim.Adam({"lr": 1e-3}), "Trace_ELBO", jit=jit, ignore_jit_warnings=True)
+        assert svi.jit_path == EXPECTED_JIT_PATH[backend, jit]
+        for _ in range(2):
+            svi.step(ops.tensor(2.))
+
+
+def test_jit_path_fallback():
+    pytest.importorskip("pyro")
+    with pyro_backend("pyro"):
+        with pytest.warns(RuntimeWarning, match="RenyiELBO"):
+            elbo, jit_path = make_elbo("RenyiELBO", jit=True)
+    assert type(elbo).__name__ == "RenyiELBO"
+    assert jit_path is None
+
+
+@pytest.mark.parametrize("jit", [False, True], ids=["py", "jit"])
+@pytest.mark.parametrize("backend", ["pyro", "minipyro", "numpy"])
+def test_run(backend, jit):
+    pytest.importorskip(PACKAGE_NAME[backend])
+
+    def model(data):
+        loc = pyro.param("loc", ops.tensor(0.0))
+        with pyro.plate("data", data.shape[0], dim=-1):
+            pyro.sample("x", dist.Normal(loc, 1.), obs=data)
+
+    def guide(data):
+        pass
+
+    with pyro_backend(backend):
+        data = ops.ones(10) * 2.
+        pyro.get_param_store().clear()
+        svi = SVI(model, guide, optim.Adam({"lr": 0.1}), "Trace_ELBO", jit=jit, ignore_jit_warnings=True)
+        expected = [float(svi.step(data)) for _ in range(10)]
+
+        pyro.get_param_store().clear()
+        svi = SVI(model, guide, optim.Adam({"lr": 0.1}), "Trace_ELBO", jit=jit, ignore_jit_warnings=True)
+        steps = []
+        losses = svi.run(10, data, chunk_size=4, callback=lambda step, losses: steps.append(step))
+        assert steps == [4, 8, 10]
+        assert tuple(losses.shape) == (10,)
+        assert ops.allclose(losses, ops.tensor(expected), rtol=1e-4)
+        assert float(losses[-1]) < float(losses[0])
+
+        losses = svi.run(10, data, chunk_size=3, callback=lambda step, losses: step >= 6)
+        assert tuple(losses.shape) == (6,)
+        pyro.get_param_store().clear()
@@ -0,0 +1,94 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import math
+
+import pytest
+from conftest import PACKAGE_NAME
+
+from pyroapi import distributions as dist
+from pyroapi import handlers, infer, ops, optim, pyro, pyro_backend
+from pyroapi.minibatch import Minibatches, subsample_plate
+
+
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_minibatches_array(shuffle):
+    x = list(range(10))
+    y = [-i for i in x]
+    batches = Minibatches((x, y), batch_size=4, shuffle=shuffle, rng_seed=0, convert=False)
+    assert batches.size == 10
+    assert len(batches) == 3
+    seen = []
+    for x_batch, y_batch in batches:
+        assert [-i for i in x_batch] == y_batch
+        seen.extend(x_batch)
+    assert sorted(seen) == x
+
+
+def test_minibatches_iterable():
+    batches = Minibatches(iter([[0, 1], [2]]), size=3, convert=False)
+    assert list(batches) == [[0, 1], [2]]
+    with pytest.raises(ValueError):
+        Minibatches(iter([]))
+
+
+@pytest.mark.parametrize('backend', ['pyro', 'numpy'])
+def test_subsample_plate_scale(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    size = 10
+    batches = Minibatches([float(i) for i in range(size)], batch_size=4)
+
+    def model(batch):
+        with subsample_plate('data', size, len(batch)):
+            pyro.sample('obs', dist.Normal(0., 1.), obs=batch)
+
+    with pyro_backend(backend):
+        for batch in batches:
+            trace = handlers.trace(model).get_trace(batch)
+            site = getattr(trace, 'nodes', trace)['obs']
+            assert float(site['scale']) == pytest.approx(size / len(batch))
+
+
+@pytest.mark.parametrize('backend', ['pyro', 'numpy'])
+def test_streaming_svi(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    size = 10
+    data = [0.5 * i for i in range(size)]
+    batches = Minibatches(data, batch_size=4)
+
+    def model(batch):
+        loc = pyro.param('loc', ops.tensor(0.))
+        with subsample_plate('data', size, len(batch)):
+            pyro.sample('obs', dist.Normal(loc, 1.), obs=batch)
+
+    def guide(batch):
+        pass
+
+    with pyro_backend(backend):
+        pyro.get_param_store().clear()
+        svi = infer.SVI(model, guide, optim.Adam({'lr': 1e-3}), infer.Trace_ELBO())
+        losses = [float(svi.step(batch)) for batch in batches]
+
+    # The first step is evaluated at the initial loc = 0.
+    expected = size / 4 * sum(0.5 * x ** 2 + 0.5 * math.log(2 * math.pi) for x in data[:4])
+    assert losses[0] == pytest.approx(expected, rel=1e-5)
+
+
+@pytest.mark.parametrize('backend', ['minipyro', 'funsor'])
+def test_subsample_plate_unsupported(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+
+    with pyro_backend(backend):
+        with pytest.raises(NotImplementedError, match='subsample_size'):
+            with subsample_plate('data', 10, 4):
+                pass
+
+
+def test_subsample_plate_user_errors():
+    pytest.importorskip('pyro')
+
+    # Errors of bad arguments are not mistaken for unsupported backends.
+    with pyro_backend('pyro'):
+        with pytest.raises(TypeError):
+            with subsample_plate('data', 10, 4, dim='-1'):
+                pass
@@ -0,0 +1,58 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import subprocess
+import sys
+
+import pytest
+
+from pyroapi import distributions as dist
+from pyroapi import handlers, ops, pyro, pyro_backend
+from pyroapi.testing import MODELS
+
+
+def get_shapes(name):
+    f = MODELS[name]()
+    trace = handlers.trace(f["model"]).get_trace(*f.get("model_args", ()), **f.get("model_kwargs", {}))
+    return {name: tuple(site["value"].shape) for name, site in getattr(trace, "nodes", trace).items()
+            if site["type"] == "sample" and type(site["fn"]).__name__ != "_Subsample"}
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_shapes_match_pyro(model):
+    pytest.importorskip("pyro")
+    with pyro_backend("mock"):
+        actual = get_shapes(model)
+    with pyro_backend("pyro"):
+        expected = get_shapes(model)
+    assert actual == expected
+
+
+def test_no_heavy_imports():
+    script = "\n".join([
+        "import sys",
+        "from pyroapi import pyro_backend",
+        "from pyroapi.testing import MODELS",
+        "with pyro_backend('mock'):",
+        "    for f in MODELS.values():",
+        "        f()",
+        "print(sorted({m.split('.')[0] for m in sys.modules} & {'jax', 'numpy', 'pyro', 'torch'}))",
+    ])
+    output = subprocess.check_output([sys.executable, "-c", script], universal_newlines=True)
+    assert output.strip() == "[]"
+
+
+def test_shape_errors():
+    with pyro_backend("mock"):
+        with pytest.raises(ValueError):
+            dist.Normal(ops.zeros(3), ops.ones(4))
+        with pytest.raises(ValueError):
+            with pyro.plate("data", 5):
+                pyro.sample("x", dist.Normal(ops.zeros(3), 1.))
+        x = ops.zeros((2, 3))
+        assert (x[:, None] + ops.ones(3)).shape == (2, 1, 3)
+        assert ops.sum(x, axis=-1, keepdims=True).shape == (2, 1)
+        assert ops.cat([x, x], -1).shape == (2, 6)
+        assert x.reshape(-1).shape == (6,)
+        with pytest.raises(TypeError):
+            bool(x > 0)
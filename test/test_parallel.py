@@ -0,0 +1,74 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from conftest import PACKAGE_NAME
+
+from pyroapi import distributions as dist
+from pyroapi import ops, optim, pyro, pyro_backend
+from pyroapi.minibatch import subsample_plate
+from pyroapi.parallel import DataParallelSVI
+from pyroapi.params import snapshot_params
+from pyroapi.svi import SVI
+
+SIZE = 101  # a constant, since NumPyro's SVI.step traces all model arguments
+
+
+def model(x=None, y=None):
+    coef = pyro.param("coef", ops.tensor(0.))
+    scale = pyro.param("scale", ops.tensor(1.), constraint=dist.constraints.positive)
+    with subsample_plate("data", SIZE, len(y)):
+        pyro.sample("obs", dist.Normal(coef * x, scale), obs=y)
+
+
+def guide(x=None, y=None):
+    pass
+
+
+def unscaled_model(x=None, y=None):
+    coef = pyro.param("coef", ops.tensor(0.))
+    with pyro.plate("data", len(y)):
+        pyro.sample("obs", dist.Normal(coef * x, 1.), obs=y)
+
+
+@pytest.mark.parametrize("backend", ["pyro", "numpy"])
+def test_matches_single_process(backend):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip(PACKAGE_NAME[backend])
+    rng = np.random.RandomState(0)
+    x = rng.randn(SIZE).astype(np.float32)
+    y = (2. * x + rng.randn(SIZE)).astype(np.float32)
+
+    with pyro_backend(backend):
+        pyro.get_param_store().clear()
+        svi = SVI(model, guide, optim.Adam({"lr": 0.1}), "Trace_ELBO")
+        expected_losses = [float(svi.step(x=ops.tensor(x), y=ops.tensor(y))) for _ in range(20)]
+        expected_params = snapshot_params()
+        pyro.get_param_store().clear()
+
+        with DataParallelSVI(model, guide, "Adam", {"lr": 0.1}, data={"x": x, "y": y}, plate="data",
+                             num_workers=2) as svi:
+            assert len(svi.weights) == 2
+            losses = list(svi.run(15))
+            losses.append(svi.step())
+            losses.extend(svi.run(4))
+            params = svi.get_params()
+
+    assert np.allclose(losses, expected_losses, rtol=1e-4)
+    assert set(params) == set(expected_params)
+    for name, value in params.items():
+        assert np.allclose(value, expected_params[name], rtol=1e-4)
+
+
+def test_checks_plate_scale():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pyro")
+    x = np.zeros(SIZE, np.float32)
+    with pyro_backend("pyro"):
+        with pytest.raises(ValueError, match="subsample_plate"):
+            DataParallelSVI(unscaled_model, guide, "Adam", {"lr": 0.1}, data={"x": x, "y": x}, plate="data",
+                            num_workers=2)
+        with pytest.raises(ValueError, match="no sample sites in plate"):
+            DataParallelSVI(model, guide, "Adam", {"lr": 0.1}, data={"x": x, "y": x}, plate="batch",
+                            num_workers=2)
+        pyro.get_param_store().clear()
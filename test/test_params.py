@@ -0,0 +1,93 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import tempfile
+from collections import OrderedDict
+
+import pytest
+
+from pyroapi import distributions as dist
+from pyroapi import infer, ops, optim, pyro, pyro_backend
+from pyroapi.params import load_params, restore_params, save_params, snapshot_params
+
+
+def test_incremental_checkpoint(tmpdir):
+    np = pytest.importorskip("numpy")
+    path = tempfile.mkdtemp(dir=str(tmpdir))
+    snapshot = OrderedDict([("a", np.zeros(3)), ("b/c", np.ones((2, 2), dtype=np.float32))])
+
+    assert save_params(path, snapshot) == ["a", "b/c"]
+    assert save_params(path, snapshot) == []
+    snapshot["a"] = np.arange(3.)
+    assert save_params(path, snapshot) == ["a"]
+    assert save_params(path, snapshot, incremental=False) == ["a", "b/c"]
+
+    loaded = load_params(path)
+    assert list(loaded) == ["a", "b/c"]
+    assert isinstance(loaded["a"], np.memmap)
+    assert np.array_equal(loaded["a"], snapshot["a"])
+    assert loaded["b/c"].dtype == np.float32
+
+    # Readers of the previous checkpoint keep seeing its contents.
+    snapshot["a"] = np.arange(3.) + 10.
+    assert save_params(path, snapshot) == ["a"]
+    assert np.array_equal(loaded["a"], np.arange(3.))
+    assert np.array_equal(load_params(path)["a"], snapshot["a"])
+
+    del snapshot["a"]
+    save_params(path, snapshot)
+    assert list(load_params(path, mmap=False)) == ["b/c"]
+    assert len(os.listdir(path)) == 2
+
+
+def test_checkpoint_reshape(tmpdir):
+    np = pytest.importorskip("numpy")
+    path = tempfile.mkdtemp(dir=str(tmpdir))
+
+    # Equal bytes with a new shape or dtype are still rewritten.
+    assert save_params(path, {"a": np.zeros(4)}) == ["a"]
+    assert save_params(path, {"a": np.zeros((2, 2))}) == ["a"]
+    assert load_params(path)["a"].shape == (2, 2)
+    assert save_params(path, {"a": np.zeros(2, dtype=np.float32)}) == ["a"]
+    assert save_params(path, {"a": np.zeros(1)}) == ["a"]
+    loaded = load_params(path)["a"]
+    assert loaded.shape == (1,) and loaded.dtype == np.float64
+
+
+@pytest.mark.parametrize("backend", ["pyro", "minipyro"])
+def test_snapshot_restore(backend, tmpdir):
+    pytest.importorskip("numpy")
+    pytest.importorskip("pyro")
+    path = tempfile.mkdtemp(dir=str(tmpdir))
+
+    with pyro_backend(backend):
+        pyro.get_param_store().clear()
+        pyro.param("loc", ops.tensor([0.5, 1.5]))
+        pyro.param("scale", ops.tensor(2.0), constraint=dist.constraints.positive)
+        save_params(path)
+        expected = snapshot_params()
+
+        pyro.get_param_store().clear()
+        pyro.param("scale", ops.tensor(1.0), constraint=dist.constraints.positive)
+        restore_params(load_params(path))
+        actual = snapshot_params()
+        assert sorted(actual) == ["loc", "scale"]
+        for name in expected:
+            assert ops.allclose(ops.tensor(actual[name]), ops.tensor(expected[name]))
+        assert ops.allclose(pyro.param("scale"), ops.tensor(2.0))
+
+        # Warm start: in-place optimizer updates must not touch the checkpoint.
+        def model():
+            loc = pyro.param("loc")
+            scale = pyro.param("scale", constraint=dist.constraints.positive)
+            pyro.sample("x", dist.Normal(loc, scale).to_event(1), obs=ops.zeros(2))
+
+        def guide():
+            pass
+
+        svi = infer.SVI(model, guide, optim.Adam({"lr": 0.1}), infer.Trace_ELBO())
+        svi.step()
+        assert not ops.allclose(ops.tensor(snapshot_params()["loc"]), ops.tensor(expected["loc"]))
+        assert ops.allclose(ops.tensor(load_params(path)["loc"]), ops.tensor(expected["loc"]))
+        pyro.get_param_store().clear()
@@ -0,0 +1,82 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from conftest import PACKAGE_NAME
+
+from pyroapi import distributions as dist
+from pyroapi import handlers, ops, pyro, pyro_backend
+from pyroapi.predictive import Predictive
+from pyroapi.testing import MODELS
+
+
+def model(data=None):
+    loc = pyro.sample('loc', dist.Normal(0., 1.))
+    with pyro.plate('plate', 3, dim=-1):
+        x = pyro.sample('x', dist.Normal(loc, 1.))
+        pyro.sample('obs', dist.Normal(x, 1.), obs=data)
+
+
+def guide(data=None):
+    loc = pyro.param('loc_loc', ops.tensor(0.))
+    pyro.sample('loc', dist.Normal(loc, 1.))
+    with pyro.plate('plate', 3, dim=-1):
+        pyro.sample('x', dist.Normal(loc, 1.))
+
+
+@pytest.mark.parametrize('chunk_size', [None, 4])
+@pytest.mark.parametrize('method', [None, 'loop'])
+@pytest.mark.parametrize('backend', ['pyro', 'numpy'])
+def test_predictive_shapes(backend, method, chunk_size):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    num_samples = 10
+    with pyro_backend(backend):
+        pyro.get_param_store().clear()
+        posterior_samples = {'loc': ops.zeros(num_samples)}
+        predictive = Predictive(model, posterior_samples, chunk_size=chunk_size, method=method)
+        samples = predictive()
+        assert set(samples) == {'x', 'obs'}
+        assert samples['x'].shape == (num_samples, 3)
+        assert samples['obs'].shape == (num_samples, 3)
+
+        predictive = Predictive(model, guide=guide, num_samples=num_samples, chunk_size=chunk_size,
+                                return_sites=['loc', 'obs'], method=method)
+        samples = predictive()
+        assert samples['loc'].shape == (num_samples,)
+        assert samples['obs'].shape == (num_samples, 3)
+        if chunk_size:
+            chunks = list(predictive.iter_chunks())
+            assert [chunk['obs'].shape[0] for chunk in chunks] == [4, 4, 2]
+
+
+@pytest.mark.parametrize('backend', ['minipyro', 'funsor'])
+def test_predictive_unsupported(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    with pyro_backend(backend):
+        predictive = Predictive(model, {'loc': ops.zeros(10)})
+        with pytest.raises(NotImplementedError, match=backend):
+            predictive()
+
+
+@pytest.mark.parametrize('name', list(MODELS))
+@pytest.mark.parametrize('backend', ['pyro', 'numpy'])
+def test_predictive_models(backend, name):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    num_samples = 3
+    with pyro_backend(backend):
+        f = MODELS[name]()
+        model, args, kwargs = f['model'], f.get('model_args', ()), f.get('model_kwargs', {})
+        trace = handlers.trace(handlers.seed(model, rng_seed=0)).get_trace(*args)
+        sites = [site for site in getattr(trace, 'nodes', trace).values()
+                 if site['type'] == 'sample' and type(site['fn']).__name__ != '_Subsample']
+        prior = Predictive(model, num_samples=num_samples)(*args)
+        assert set(prior) == set(site['name'] for site in sites)
+        for site in sites:
+            assert prior[site['name']].shape == (num_samples,) + tuple(site['value'].shape)
+
+        # Observed sites are predicted from samples of the latent sites.
+        latent = {site['name']: prior[site['name']] for site in sites if site['name'] not in kwargs}
+        samples = Predictive(model, latent)(*args)
+        assert set(samples) == set(prior) - set(latent)
+        for name, value in samples.items():
+            assert value.shape == prior[name].shape
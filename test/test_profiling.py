@@ -0,0 +1,29 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import math
+
+from pyroapi.dispatch import GenericModule
+from pyroapi.profiling import _GENERIC_GETATTRIBUTE, profile_dispatch
+
+
+def test_profile_dispatch(isolated_registry):
+    generic = GenericModule('profile_test', 'math')
+    generic.sqrt  # not recorded
+
+    with profile_dispatch(time_calls=True) as prof:
+        for _ in range(3):
+            assert generic.sqrt(4.) == 2.
+        assert generic.pi == math.pi
+    generic.sqrt  # not recorded
+
+    stats = {row['attribute']: row for row in prof.rows()}
+    assert stats['sqrt']['module'] == 'profile_test'
+    assert stats['sqrt']['backend'] == 'math'
+    assert stats['sqrt']['count'] == 3
+    assert stats['sqrt']['call_count'] == 3
+    assert stats['pi']['count'] == 1
+    assert stats['pi']['call_count'] == 0
+    assert prof.backend_totals()['math']['count'] == 4
+    assert 'sqrt' in prof.report()
+    assert GenericModule.__getattribute__ is _GENERIC_GETATTRIBUTE
@@ -0,0 +1,30 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+
+import pytest
+
+from pyroapi import testing
+from pyroapi.runner import run_job, run_models
+from pyroapi.testing import MODELS
+
+
+def test_run_models():
+    pytest.importorskip('pyro')
+    jobs = [(name, backend, seed) for name in MODELS for backend in ['pyro', 'minipyro'] for seed in range(2)]
+    results = list(run_models(jobs, num_workers=2))
+    assert sorted((r['model'], r['backend'], r['seed']) for r in results) == sorted(jobs)
+    for result in results:
+        assert result['status'] in ('ok', 'not_implemented'), result.get('error')
+
+
+def test_run_job_cache(monkeypatch, tmpdir):
+    pytest.importorskip('pyro')
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(testing, '_MODEL_CACHE', testing._MODEL_CACHE.__class__())
+    assert run_job('eight_schools', 'pyro', 0, cache_dir=str(tmpdir))['status'] == 'ok'
+    assert [path.startswith('eight_schools-') for path in os.listdir(str(tmpdir))] == [True]
+    assert len(testing._MODEL_CACHE) == 1
+    assert run_job('eight_schools', 'pyro', 1, cache_dir=str(tmpdir))['status'] == 'ok'
+    assert len(testing._MODEL_CACHE) == 1
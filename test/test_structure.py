@@ -0,0 +1,91 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from conftest import PACKAGE_NAME
+
+from pyroapi import distributions as dist
+from pyroapi import ops, pyro, pyro_backend
+from pyroapi.structure import _STRUCTURES, analyze, clear_structure_cache, trace_structure
+
+
+def model(data):
+    loc = pyro.sample("loc", dist.Normal(0., 1.))
+    with pyro.plate("outer", 2, dim=-2):
+        with pyro.plate("inner", data.shape[-1], dim=-1):
+            x = pyro.sample("x", dist.Normal(loc, 1.))
+            pyro.sample("obs", dist.Normal(x, 1.), obs=data)
+
+
+def guide(data):
+    loc = pyro.param("loc_loc", ops.tensor(0.))
+    scale = pyro.param("loc_scale", ops.tensor(1.), constraint=dist.constraints.positive)
+    pyro.sample("loc", dist.Normal(loc, scale))
+    with pyro.plate("inner", data.shape[-1], dim=-1):
+        pyro.sample("x", dist.Normal(0., 1.))
+
+
+@pytest.mark.parametrize("backend", ["pyro", "numpy", "mock"])
+def test_trace_structure(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    clear_structure_cache()
+    with pyro_backend(backend):
+        pyro.get_param_store().clear()
+        data = ops.zeros((2, 3))
+        structure = trace_structure(model, data)
+        assert trace_structure(model, ops.ones((2, 3))) is structure
+        assert trace_structure(model, ops.ones((2, 4))) is not structure
+        assert len(_STRUCTURES) == 2
+
+        assert structure.latent_sites() == ["loc", "x"]
+        assert structure.observed_sites() == ["obs"]
+        assert structure.sites["x"].shape == (2, 3)
+        assert structure.sites["x"].plates == ("outer", "inner")
+        assert structure.sites["x"].dist_type == "Normal"
+        assert structure.plates["inner"].size == 3
+        assert structure.plates["outer"].dim == -2
+
+        assert structure.check_shapes({"loc": ops.zeros(5), "x": ops.zeros((5, 2, 3))}, batch_ndim=1) == []
+        assert len(structure.check_shapes({"x": ops.zeros((5, 3)), "y": ops.zeros(5)}, batch_ndim=1)) == 2
+
+        guide_structure = trace_structure(guide, data)
+        assert guide_structure.params["loc_scale"].constraint is not None
+        assert guide_structure.params["loc_loc"].constraint is None
+        errors = structure.check_guide(guide_structure)
+        assert len(errors) == 2  # x has the wrong shape and plates
+        assert all("Site x" in error for error in errors)
+        pyro.get_param_store().clear()
+
+
+def enum_model(data):
+    with pyro.plate("data", data.shape[0], dim=-1):
+        z = pyro.sample("z", dist.Categorical(ops.ones(4) / 4.), infer={"enumerate": "parallel"})
+        pyro.sample("obs", dist.Normal(ops.tensor([0., 1., 2., 3.])[z], 1.), obs=data)
+
+
+def bad_guide(data):
+    scale = pyro.param("scale", ops.tensor(1.), constraint=dist.constraints.positive)
+    with pyro.plate("data", data.shape[0], dim=-2):
+        pyro.sample("extra", dist.Normal(0., scale))
+
+
+@pytest.mark.parametrize("backend", ["pyro", "numpy", "mock"])
+def test_analyze(backend):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    with pyro_backend(backend):
+        pyro.get_param_store().clear()
+        data = ops.zeros(5)
+        analysis = analyze(enum_model, model_args=(data,))
+        assert analysis.errors == []
+        assert analysis.cost["enumerated_sites"] == ["z"]
+        assert analysis.cost["enumeration_size"] == 4
+        assert analysis.cost["batch_sizes"] == {"data": 5}
+        assert analysis.cost["num_observed_elements"] == 5
+
+        analysis = analyze(enum_model, bad_guide, model_args=(data,))
+        errors = "\n".join(analysis.errors)
+        assert "Latent site z is missing from the guide" in errors
+        assert "Guide site extra is not in the model" in errors
+        assert "Plate data has size 5 and dim -2 in the guide" in errors
+        assert "no errors" not in analysis.report()
+        pyro.get_param_store().clear()
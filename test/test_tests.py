@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import pytest
+from conftest import PACKAGE_NAME
 
 from pyroapi import pyro_backend
 from pyroapi.tests import *  # noqa F401
@@ -15,13 +16,6 @@ pytestmark = pytest.mark.filterwarnings(
     "ignore:.*floordiv.* is deprecated, and its behavior will change in a future version:UserWarning",
 )
 
-PACKAGE_NAME = {
-    "pyro": "pyro",
-    "minipyro": "pyro",
-    "numpy": "numpyro",
-    "funsor": "funsor",
-}
-
 
 @pytest.fixture(params=["pyro", "minipyro", "numpy", "funsor"])
 def backend(request):
@@ -0,0 +1,58 @@
+# Copyright Contributors to the Pyro project.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from conftest import PACKAGE_NAME
+
+from pyroapi import distributions as dist
+from pyroapi import handlers, ops, pyro, pyro_backend
+from pyroapi.testing import MODELS
+from pyroapi.vectorize import vectorized_sample
+
+
+def model(data):
+    loc = pyro.sample('loc', dist.Normal(0., 1.))
+    with pyro.plate('plate', 3, dim=-1):
+        x = pyro.sample('x', dist.Normal(loc, 1.))
+        pyro.sample('obs', dist.Normal(x, 1.), obs=data)
+
+
+@pytest.mark.parametrize('method', [None, 'plate', 'loop'])
+@pytest.mark.parametrize('backend', ['pyro', 'numpy'])
+def test_vectorized_sample(backend, method):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    num_samples = 5
+    with pyro_backend(backend):
+        data = ops.zeros(3)
+        samples = vectorized_sample(model, num_samples, model_args=(data,), method=method)
+    assert set(samples) == {'loc', 'x'}
+    assert samples['loc'].shape == (num_samples,)
+    assert samples['x'].shape == (num_samples, 3)
+
+
+@pytest.mark.parametrize('method', [None, 'plate', 'loop'])
+@pytest.mark.parametrize('backend', ['minipyro', 'funsor'])
+def test_vectorized_sample_unsupported(backend, method):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    with pyro_backend(backend):
+        data = ops.zeros(3)
+        with pytest.raises(NotImplementedError, match=backend):
+            vectorized_sample(model, 5, model_args=(data,), method=method)
+
+
+@pytest.mark.parametrize('name', list(MODELS))
+@pytest.mark.parametrize('backend', ['pyro', 'numpy'])
+def test_vectorized_sample_models(backend, name):
+    pytest.importorskip(PACKAGE_NAME[backend])
+    num_samples = 3
+    with pyro_backend(backend):
+        f = MODELS[name]()
+        model, args, kwargs = f['model'], f.get('model_args', ()), f.get('model_kwargs', {})
+        trace = handlers.trace(handlers.seed(model, rng_seed=0)).get_trace(*args, **kwargs)
+        samples = vectorized_sample(model, num_samples, model_args=args, model_kwargs=kwargs)
+    sites = [site for site in getattr(trace, 'nodes', trace).values()
+             if site['type'] == 'sample' and not site['is_observed']
+             and type(site['fn']).__name__ != '_Subsample']
+    assert set(samples) == set(site['name'] for site in sites)
+    for site in sites:
+        assert samples[site['name']].shape == (num_samples,) + tuple(site['value'].shape)